@@ -0,0 +1,46 @@
+# app_loader.py
+
+# Uygulama modülleri göreli import kullanır (`from . import crud`) ve iki dizine dağılmıştır:
+# docker-fastapi/ (main, models, schemas, ...) ve depo kökü (crud, crud_async). Kıyaslama
+# betikleri bu iki dizini tek bir `app` paketi olarak yükler; böylece uygulama kodu
+# değiştirilmeden süreç içinde çalıştırılabilir.
+
+import importlib
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "app"
+
+DEFAULT_DATABASE_URL = "sqlite:///" + os.path.join(ROOT, "bench", "bench.db")
+DEFAULT_SEARCH_INDEX_PATH = os.path.join(ROOT, "bench", "bench_search.db")
+
+
+def configure(database_url=None):
+    """
+    Uygulama modülleri import edilmeden önce çağrılmalıdır; ayarlar import anında okunur.
+    Açıkça verilmeyen ayarlar için kıyaslama varsayılanları kullanılır (geliştirme
+    veritabanına ve arama indeksine dokunulmaz).
+    """
+    os.environ["DATABASE_URL"] = database_url or os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL)
+    # SQLite'ta /async rotaları aynı dosyaya aiosqlite ile bağlanır (senkron/asenkron kıyaslama için).
+    if os.environ["DATABASE_URL"].startswith("sqlite:///"):
+        os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///" + os.environ["DATABASE_URL"][len("sqlite:///"):])
+    os.environ.setdefault("SEARCH_INDEX_PATH", DEFAULT_SEARCH_INDEX_PATH)
+    register()
+
+
+def register():
+    """`app` paketini ayarlara dokunmadan kaydeder."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [os.path.join(ROOT, "docker-fastapi"), ROOT]
+        sys.modules[PACKAGE] = package
+
+
+def load(module="main"):
+    """`app.<module>` modülünü döndürür (ör. `load("models")`)."""
+    if PACKAGE not in sys.modules:
+        configure()
+    return importlib.import_module(f"{PACKAGE}.{module}")
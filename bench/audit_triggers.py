@@ -0,0 +1,69 @@
+# audit_triggers.py
+
+# Denetim kaydı karşılaştırması için proje.sql'deki eski yaklaşım: denetlenen her tabloda satır
+# başına AFTER INSERT/UPDATE trigger'ı, audit_logs'a aynı işlem içinde JSON satırı yazar.
+# `bench.run --audit-mode trigger` trigger'ları kurar ve uygulama tarafı yakalamayı (audit.py'nin
+# oturum olayları) kapatır; böylece aynı senaryolar iki yaklaşımla ölçülüp `bench.compare` ile
+# karşılaştırılabilir. Kıyaslama bitince trigger'lar kaldırılır ve olaylar geri takılır.
+#
+# Trigger gövdeleri SQLite ve MySQL'de aynıdır (BEGIN ... END ve json_object iki motorda da
+# vardır). Eski trigger'lardaki gibi güncellemede tüm kolonların eski/yeni değerleri yazılır;
+# istek yapan kullanıcı trigger'a aktarılamadığından user_id boş kalır.
+
+import contextlib
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from . import app_loader
+
+PREFIX = "bench_audit_"
+
+
+def _json_object(table, row):
+    columns = [c.name for c in table.columns if c.name not in app_loader.load("audit").EXCLUDED_COLUMNS]
+    return "json_object(%s)" % ", ".join(f"'{name}', {row}.{name}" for name in columns)
+
+
+def _ddl(table):
+    insert = (
+        f"CREATE TRIGGER {PREFIX}{table.name}_insert AFTER INSERT ON {table.name} FOR EACH ROW BEGIN "
+        f"INSERT INTO audit_logs (user_id, action, table_name, record_id, new_values) "
+        f"VALUES (NULL, 'INSERT', '{table.name}', NEW.id, {_json_object(table, 'NEW')}); END"
+    )
+    update = (
+        f"CREATE TRIGGER {PREFIX}{table.name}_update AFTER UPDATE ON {table.name} FOR EACH ROW BEGIN "
+        f"INSERT INTO audit_logs (user_id, action, table_name, record_id, old_values, new_values) "
+        f"VALUES (NULL, 'UPDATE', '{table.name}', NEW.id, {_json_object(table, 'OLD')}, {_json_object(table, 'NEW')}); END"
+    )
+    return insert, update
+
+
+def _tables():
+    return [model.__table__ for model in app_loader.load("audit").AUDITED_MODELS]
+
+
+def uninstall(engine):
+    with engine.begin() as conn:
+        for table in _tables():
+            for kind in ("insert", "update"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {PREFIX}{table.name}_{kind}"))
+
+
+@contextlib.contextmanager
+def enabled(engine):
+    """Trigger'ları kurar ve uygulama tarafı denetim yakalamasını blok süresince kapatır."""
+    audit = app_loader.load("audit")
+    uninstall(engine)  # yarıda kalmış bir önceki çalıştırmadan kalanlar
+    with engine.begin() as conn:
+        for table in _tables():
+            for statement in _ddl(table):
+                conn.execute(text(statement))
+    event.remove(Session, "after_flush", audit._capture)
+    event.remove(Session, "after_commit", audit._enqueue)
+    try:
+        yield
+    finally:
+        event.listen(Session, "after_flush", audit._capture)
+        event.listen(Session, "after_commit", audit._enqueue)
+        uninstall(engine)
@@ -0,0 +1,57 @@
+# compare.py
+
+# İki `bench.run` sonuç dosyasını senaryo bazında karşılaştırır.
+#   python -m bench.compare bench/results/<eski>.json bench/results/<yeni>.json
+# Farklar yeni/eski oranı olarak yazılır: verimde artış, gecikmelerde azalış iyileşmedir.
+
+import argparse
+import json
+import sys
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old, new):
+    if not old or new is None:
+        return "—"
+    return "%+.1f%%" % ((new - old) / old * 100)
+
+
+def compare(old, new):
+    lines = []
+    for side, report in (("eski", old), ("yeni", new)):
+        git = report.get("git") or {}
+        lines.append(f"{side}: {(git.get('commit') or '?')[:10]}{' (kirli)' if git.get('dirty') else ''} "
+                     f"{git.get('subject') or ''}")
+    for key in ("dataset", "config"):
+        if old.get(key) != new.get(key):
+            lines.append(f"UYARI: '{key}' farklı; sonuçlar doğrudan karşılaştırılamayabilir.")
+    header = f"{'senaryo':26}" + "".join(f"{metric:>24}" for metric in METRICS)
+    lines += ["", header, "-" * len(header)]
+    for name in dict.fromkeys([*old["results"], *new["results"]]):
+        before, after = old["results"].get(name), new["results"].get(name)
+        if before is None or after is None:
+            lines.append(f"{name:26}  {'yalnızca yeni' if before is None else 'yalnızca eski'}")
+            continue
+        cells = []
+        for metric in METRICS:
+            b, a = before.get(metric), after.get(metric)
+            cells.append(f"{b or 0:.1f} → {a or 0:.1f} {_change(b, a):>7}".rjust(24))
+        lines.append(f"{name:26}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İki kıyaslama sonucunu karşılaştırır.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args(argv)
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    print(compare(old, new))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
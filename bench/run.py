@@ -0,0 +1,487 @@
+# run.py
+
+# Süreç içi (in-process) kıyaslama: uygulama httpx'in ASGI taşıyıcısıyla ağ katmanı olmadan
+# çağrılır, her endpoint senaryosu için verim (istek/sn) ve p50/p95/p99 gecikmeleri ölçülür ve
+# sonuçlar commit bilgisiyle birlikte JSON olarak yazılır. İki sonuç dosyası `bench.compare`
+# ile karşılaştırılır.
+#
+# Önce veritabanı doldurulmalıdır:
+#   python -m bench.seed --preset small
+#   python -m bench.run --concurrency 8 --requests 500
+#   python -m bench.run --only users_list,jobs_list --trace-allocations
+#   python -m bench.run --only jobs_offset_p1,jobs_offset_p10000,jobs_cursor_p1,jobs_cursor_p10000
+#
+# `<tablo>_offset_p<N>` / `<tablo>_cursor_p<N>` senaryoları /users/ ve /jobs/'un N. sayfasını
+# (PAGE_DEPTHS, DEPTH_PAGE_SIZE satırlık sayfalar) OFFSET ve keyset sayfalamayla ister; keyset
+# gecikmesi sayfa derinliğinden bağımsız kalmalıdır. Tablo o derinliğe yetmiyorsa senaryo atlanır
+# (10.000. sayfa için jobs'ta `--preset medium`, users'ta `--preset full` gerekir).
+#
+# `async_<senaryo>` senaryoları ASYNC_PAIRS'teki senaryoların aynı isteklerini /async altındaki
+# asenkron rotalara gönderir; senkron ve asenkron yol aynı veriyle yan yana ölçülür. SQLite'ta
+# ASYNC_DATABASE_URL, kıyaslama veritabanının aiosqlite adresine kendiliğinden ayarlanır.
+#   python -m bench.run --only job_detail,async_job_detail,job_create,async_job_create
+#
+# `jobs_page_under_signup` GET /jobs/ (cursor) okumalarını, aynı anda `--flood-writers` istemcinin
+# POST /users/ ile kayıt yağdırdığı sırada ölçer; p99 okumalara aittir, yazmalar `writes` altında
+# raporlanır. HASH_POOL_WORKERS=0 (bcrypt istek thread'inde) ile varsayılan süreç havuzu arasındaki
+# farkı görmek için iki kez çalıştırılıp `bench.compare` ile karşılaştırılır:
+#   HASH_POOL_WORKERS=0 python -m bench.run --only jobs_page_under_signup -o inline.json
+#   python -m bench.run --only jobs_page_under_signup -o pool.json
+#
+# `--audit-mode trigger` denetim kayıtlarını uygulama tarafındaki toplu yazıcı yerine proje.sql'deki
+# gibi satır başına trigger'larla üretir (bkz. bench/audit_triggers.py); yazma senaryoları iki
+# yaklaşımla ölçülüp karşılaştırılır:
+#   python -m bench.run --only user_create,job_create,offer_create,offer_accept_contention -o app.json
+#   python -m bench.run --only user_create,job_create,offer_create,offer_accept_contention --audit-mode trigger -o trigger.json
+#   python -m bench.compare app.json trigger.json
+#
+# Ayarlar (FAST_SERIALIZATION, BCRYPT_ROUNDS, DB_POOL_SIZE, ...) ortam değişkenleriyle verilir ve
+# sonuç dosyasına kaydedilir; aynı veri ve ayarlarla farklı commit'lerin sonuçları karşılaştırılabilir.
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+
+from sqlalchemy import func, insert, select
+
+from . import app_loader, audit_triggers
+
+RESULTS_DIR = os.path.join(app_loader.ROOT, "bench", "results")
+
+# Sonuç dosyasına kaydedilen, ölçümü etkileyen ortam değişkenleri
+RECORDED_SETTINGS = (
+    "FAST_SERIALIZATION", "BCRYPT_ROUNDS", "HASH_POOL_WORKERS", "HASH_QUEUE_LIMIT", "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW", "PROVIDER_AREA_CACHE_TTL", "REFERENCE_CACHE_TTL", "AUDIT_BATCH_SIZE",
+    "SLOW_QUERY_THRESHOLD_MS", "PROFILE_THRESHOLD_MS",
+)
+
+# /async altında senkron karşılığıyla aynı isteklerle ölçülen senaryolar
+ASYNC_PAIRS = (
+    "users_list", "users_page", "user_detail", "user_create", "jobs_list", "jobs_page", "job_detail",
+    "job_create", "offer_detail", "offer_create",
+)
+
+# Sabit derinlikli sayfalama senaryolarının sayfa numaraları ve sayfa boyutu
+PAGE_DEPTHS = (1, 100, 10_000)
+DEPTH_PAGE_SIZE = 20
+
+
+class Fixtures:
+    """Senaryoların istek üretirken kullandığı, veritabanından örneklenmiş kimlikler."""
+
+    def __init__(self, engine, models, crud, rng, sample_size=2000):
+        self.rng = rng
+
+        random_order = func.rand() if engine.dialect.name == "mysql" else func.random()
+
+        def sample(*columns, where=()):
+            with engine.connect() as conn:
+                stmt = select(*columns).where(*where).order_by(random_order).limit(sample_size)
+                result = conn.execute(stmt)
+                return result.all() if len(columns) > 1 else result.scalars().all()
+
+        Job, Offer, Area = models.Job, models.Offer, models.ProviderServiceArea
+        customer_role = select(models.Role.id).where(models.Role.role_name == models.RoleNameEnum.customer)
+        self.user_ids = sample(models.User.id)
+        self.customer_ids = sample(models.User.id, where=[models.User.role_id.in_(customer_role)])
+        self.job_ids = sample(Job.id)
+        self.open_job_ids = sample(Job.id, where=[Job.status == models.JobStatusEnum.open])
+        self.job_cursors = [crud.encode_cursor(created_at, job_id) for created_at, job_id in sample(Job.created_at, Job.id)]
+        self.offer_ids = sample(Offer.id)
+        self.provider_ids = sample(Area.provider_id)
+        self.references = sample(Area.service_id, Area.district_id)
+        self.category_ids = sample(models.Category.id)
+        Service, City, District = models.Service, models.City, models.District
+        self.seo_city_paths = [
+            f"/seo/{city}/{service}" for service, city in sample(
+                Service.slug, City.slug,
+                where=[Service.id == models.SeoCityPage.service_id, City.id == models.SeoCityPage.city_id],
+            )
+        ]
+        self.seo_district_paths = [
+            f"/seo/{city}/{district}/{service}" for service, city, district in sample(
+                Service.slug, City.slug, District.slug,
+                where=[Service.id == models.SeoDistrictPage.service_id, District.id == models.SeoDistrictPage.district_id,
+                       City.id == District.city_id],
+            )
+        ]
+        self.service_slugs = sample(Service.slug, where=[Service.id.in_(select(models.SeoCityPage.service_id))])
+        with engine.connect() as conn:
+            self.max_offer_id = conn.execute(select(func.max(Offer.id))).scalar() or 0
+        # (tablo yolu, sayfa) -> o sayfayı isteyen cursor; ilk sayfa için boş cursor. Tablo o
+        # derinliğe yetmiyorsa anahtar eklenmez ve sayfa `skipped_depths`'e yazılır.
+        self.page_cursors, self.skipped_depths = {}, []
+        for path, model in (("users", models.User), ("jobs", Job)):
+            for depth in PAGE_DEPTHS:
+                cursor = self._page_cursor(engine, crud, model, depth)
+                if cursor is None:
+                    self.skipped_depths.append(f"{path}_p{depth}")
+                else:
+                    self.page_cursors[path, depth] = cursor
+        if not (self.user_ids and self.job_ids and self.provider_ids):
+            raise SystemExit("Kıyaslama veritabanı boş; önce `python -m bench.seed` çalıştırın.")
+        if not self.seo_city_paths:
+            raise SystemExit("SEO sayfa özetleri boş; `python -m bench.seed --reset` ile veritabanını yeniden üretin.")
+
+    @staticmethod
+    def _page_cursor(engine, crud, model, depth):
+        """`depth`. sayfanın cursor'ı: bir önceki sayfanın son satırının (created_at, id) ikilisi."""
+        if depth == 1:
+            return ""
+        # Önceki sayfanın son satırı ve istenen sayfanın ilk satırı birlikte okunur; ikincisi yoksa
+        # derin sayfa boş bir sayfa olarak ölçülürdü.
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(model.created_at, model.id).order_by(model.created_at, model.id)
+                .offset((depth - 1) * DEPTH_PAGE_SIZE - 1).limit(2)
+            ).all()
+        return crud.encode_cursor(*rows[0]) if len(rows) == 2 else None
+
+    def pick(self, values):
+        return self.rng.choice(values)
+
+    def reference(self):
+        """Gerçek bir hizmet bölgesine ait (service_id, district_id) çifti."""
+        return tuple(self.pick(self.references))
+
+
+SEARCH_TERMS = ["boya", "temizlik", "nakliyat ankara", "kombi", "avukat istanbul", "klima", "ders", "tamir"]
+
+
+def scenarios(f: Fixtures, async_routes=False):
+    """
+    Senaryo adı -> (beklenen durum kodları, istek üreteci). Adlar sonuç dosyalarında anahtar
+    olarak kullanıldığından değiştirilmemelidir. `async_routes` ise ASYNC_PAIRS'in /async eşleri eklenir.
+    """
+    def job_body():
+        service_id, district_id = f.reference()
+        return {"title": "Kıyaslama iş ilanı", "description": "Kıyaslama için oluşturulan iş ilanı açıklaması.",
+                "service_id": service_id, "district_id": district_id}
+
+    def depth_scenarios():
+        for (path, depth), cursor in f.page_cursors.items():
+            skip = (depth - 1) * DEPTH_PAGE_SIZE
+            yield f"{path}_offset_p{depth}", ({200}, lambda path=path, skip=skip: (
+                "GET", f"/{path}/?skip={skip}&limit={DEPTH_PAGE_SIZE}", None))
+            yield f"{path}_cursor_p{depth}", ({200}, lambda path=path, cursor=cursor: (
+                "GET", f"/{path}/?cursor={cursor}&limit={DEPTH_PAGE_SIZE}", None))
+
+    def async_pair(make_request):
+        method, url, body = make_request()
+        return method, "/async" + url, body
+
+    available = {
+        "root": ({200}, lambda: ("GET", "/", None)),
+        "users_list": ({200}, lambda: ("GET", f"/users/?skip={f.rng.randrange(1000)}&limit=100", None)),
+        "users_page": ({200}, lambda: ("GET", "/users/?cursor=&limit=100", None)),
+        "user_detail": ({200}, lambda: ("GET", f"/users/{f.pick(f.user_ids)}", None)),
+        "jobs_list": ({200}, lambda: ("GET", f"/jobs/?skip={f.rng.randrange(1000)}&limit=100", None)),
+        "jobs_page": ({200}, lambda: ("GET", f"/jobs/?cursor={f.pick(f.job_cursors)}&limit=100", None)),
+        "job_detail": ({200}, lambda: ("GET", f"/jobs/{f.pick(f.job_ids)}", None)),
+        "jobs_open": ({200}, lambda: ("GET", f"/jobs/open?provider_id={f.pick(f.provider_ids)}&limit=50", None)),
+        "offer_detail": ({200}, lambda: ("GET", f"/offers/{f.pick(f.offer_ids)}", None)),
+        "categories": ({200}, lambda: ("GET", "/categories/", None)),
+        "services": ({200}, lambda: ("GET", f"/services/?category_id={f.pick(f.category_ids)}", None)),
+        "locations": ({200}, lambda: ("GET", "/locations/", None)),
+        "search": ({200}, lambda: ("GET", f"/search?q={f.pick(SEARCH_TERMS)}", None)),
+        "providers_top": ({200}, lambda: ("GET", "/providers/?limit=20", None)),
+        "export_offers_tail": ({200}, lambda: ("GET", f"/export/offers?after_id={max(0, f.max_offer_id - 1000)}", None)),
+        "seo_city_page": ({200}, lambda: ("GET", f.pick(f.seo_city_paths), None)),
+        "seo_district_page": ({200}, lambda: ("GET", f.pick(f.seo_district_paths), None)),
+        "seo_sitemap": ({200}, lambda: ("GET", f"/sitemaps/seo/{f.pick(f.service_slugs)}.xml", None)),
+        "metrics": ({200}, lambda: ("GET", "/metrics", None)),
+        "job_create": ({201}, lambda: ("POST", f"/jobs/?customer_id={f.pick(f.customer_ids)}", job_body())),
+        "offer_create": ({201}, lambda: (
+            "POST", f"/offers/?provider_id={f.pick(f.provider_ids)}",
+            {"job_id": f.pick(f.open_job_ids), "offer_price": "1500.00", "message": "Kıyaslama teklifi"},
+        )),
+        "user_create": ({201, 503}, lambda: ("POST", "/users/", {
+            "email": f"bench-{uuid.uuid4().hex}@bench.example.com", "password": "benchmark",
+            "first_name": "Kıyas", "last_name": "Kullanıcı", "role_id": 3,
+        })),
+        **dict(depth_scenarios()),
+    }
+    if async_routes:
+        for name in ASYNC_PAIRS:
+            expected, make_request = available[name]
+            available[f"async_{name}"] = (expected, lambda make_request=make_request: async_pair(make_request))
+    return available
+
+
+def percentile(sorted_values, p):
+    """En yakın sıra (nearest-rank) yöntemiyle yüzdelik."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, statuses, expected, wall_time):
+    latencies = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in statuses.items() if code not in expected),
+        "status_counts": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+
+async def run_scenario(client, make_request, expected, total, concurrency, warmup):
+    for _ in range(warmup):
+        method, url, body = make_request()
+        await client.request(method, url, json=body)
+
+    latencies, statuses = [], Counter()
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            method, url, body = make_request()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, expected, time.perf_counter() - started)
+
+
+async def run_mixed(client, read, write, total, concurrency, writers, warmup):
+    """
+    `read` senaryosunun `total` isteğini `concurrency` istemciyle ölçer; bu sırada `writers`
+    istemci, okumalar bitene kadar durmadan `write` senaryosunun isteklerini gönderir.
+    Sonuç okumaların özetidir; yazmaların özeti `writes` anahtarındadır.
+    """
+    (read_expected, make_read), (write_expected, make_write) = read, write
+    for _ in range(warmup):
+        method, url, body = make_read()
+        await client.request(method, url, json=body)
+
+    reads_done = asyncio.Event()
+    write_latencies, write_statuses = [], Counter()
+
+    async def flood():
+        while not reads_done.is_set():
+            method, url, body = make_write()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            write_latencies.append(time.perf_counter() - start)
+            write_statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    flooders = [asyncio.ensure_future(flood()) for _ in range(writers)]
+    try:
+        result = await run_scenario(client, make_read, read_expected, total, concurrency, warmup=0)
+    finally:
+        reads_done.set()
+        await asyncio.gather(*flooders)
+    result["writes"] = summarize(write_latencies, write_statuses, write_expected, time.perf_counter() - started)
+    result["writers"] = writers
+    return result
+
+
+def _setup_contention(engine, models, jobs, bidders, fixtures):
+    """Her birine `bidders` farklı sağlayıcıdan bekleyen teklif verilmiş `jobs` açık iş oluşturur."""
+    providers = list(dict.fromkeys(fixtures.provider_ids))[:bidders]
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0, tzinfo=None)
+    with engine.begin() as conn:
+        next_job = (conn.execute(select(func.max(models.Job.id))).scalar() or 0) + 1
+        next_offer = (conn.execute(select(func.max(models.Offer.id))).scalar() or 0) + 1
+        service_id, district_id = fixtures.reference()
+        job_rows, offer_rows, plan = [], [], []
+        for job_id in range(next_job, next_job + jobs):
+            job_rows.append({
+                "id": job_id, "customer_id": fixtures.pick(fixtures.customer_ids), "service_id": service_id,
+                "district_id": district_id, "title": "Çekişme testi", "description": "Eşzamanlı kabul testi ilanı",
+                "status": models.JobStatusEnum.open, "is_active": True, "created_at": now,
+            })
+            offer_ids = []
+            for provider_id in providers:
+                offer_rows.append({
+                    "id": next_offer, "job_id": job_id, "provider_id": provider_id, "offer_price": 100,
+                    "status": models.OfferStatusEnum.pending, "is_active": True, "created_at": now,
+                })
+                offer_ids.append(next_offer)
+                next_offer += 1
+            plan.append((job_id, offer_ids))
+        conn.execute(insert(models.Job.__table__), job_rows)
+        conn.execute(insert(models.Offer.__table__), offer_rows)
+    return plan
+
+
+async def run_contention(client, engine, models, fixtures, jobs, bidders):
+    """
+    Aynı işe ait tüm teklifler aynı anda kabul edilmeye çalışılır. İş başına tam bir 200 ve
+    geri kalanı 409 beklenir; birden fazla kabul edilmiş teklifi olan iş `double_assigned` sayılır.
+    """
+    plan = _setup_contention(engine, models, jobs, bidders, fixtures)
+    latencies, statuses = [], Counter()
+
+    async def accept(offer_id):
+        start = time.perf_counter()
+        response = await client.patch(f"/offers/{offer_id}/accept")
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    for _, offer_ids in plan:
+        await asyncio.gather(*(accept(offer_id) for offer_id in offer_ids))
+    result = summarize(latencies, statuses, {200, 409}, time.perf_counter() - started)
+
+    job_ids = [job_id for job_id, _ in plan]
+    Offer = models.Offer
+    with engine.connect() as conn:
+        accepted = conn.execute(
+            select(Offer.job_id, func.count())
+            .where(Offer.job_id.in_(job_ids), Offer.status == models.OfferStatusEnum.accepted)
+            .group_by(Offer.job_id)
+        ).all()
+    result.update(
+        jobs=jobs, bidders=bidders,
+        double_assigned=sum(1 for _, count in accepted if count > 1),
+        unassigned=jobs - len(accepted),
+    )
+    return result
+
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=app_loader.ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "subject": git("log", "-1", "--format=%s"),
+            "dirty": bool(status) if status is not None else None}
+
+
+async def run(args):
+    import httpx
+
+    app_loader.configure(args.database_url)
+    main = app_loader.load("main")
+    database, models, crud = app_loader.load("database"), app_loader.load("models"), app_loader.load("crud")
+    engine = database.engine
+
+    rng = random.Random(args.seed)
+    fixtures = Fixtures(engine, models, crud, rng)
+    available = scenarios(fixtures, async_routes=database.async_engine is not None)
+    special = ("offer_accept_contention", "jobs_page_under_signup")
+    selected = args.only.split(",") if args.only else [*available, *special]
+    if fixtures.skipped_depths:
+        print(f"Tablo yeterince büyük olmadığı için atlanan sayfa derinlikleri: {', '.join(fixtures.skipped_depths)}",
+              file=sys.stderr)
+    unknown = [name for name in selected if name not in available and name not in special]
+    if unknown:
+        raise SystemExit(f"Bilinmeyen senaryo: {', '.join(unknown)}")
+
+    with engine.connect() as conn:
+        dataset = {
+            table: conn.execute(select(func.count()).select_from(models.Base.metadata.tables[table])).scalar()
+            for table in ("users", "providers", "provider_service_areas", "jobs", "offers", "reviews")
+        }
+
+    results = {}
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    audit_mode = audit_triggers.enabled(engine) if args.audit_mode == "trigger" else contextlib.nullcontext()
+    with audit_mode:
+        async with main.app.router.lifespan_context(main.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for name in selected:
+                    if args.trace_allocations:
+                        tracemalloc.start()
+                    if name == "offer_accept_contention":
+                        result = await run_contention(
+                            client, engine, models, fixtures, args.contention_jobs, args.contention_bidders
+                        )
+                    elif name == "jobs_page_under_signup":
+                        result = await run_mixed(
+                            client, available["jobs_page"], available["user_create"],
+                            args.requests, args.concurrency, args.flood_writers, args.warmup,
+                        )
+                    else:
+                        expected, make_request = available[name]
+                        result = await run_scenario(
+                            client, make_request, expected, args.requests, args.concurrency, args.warmup
+                        )
+                    if args.trace_allocations:
+                        current, peak = tracemalloc.get_traced_memory()
+                        tracemalloc.stop()
+                        result["alloc_peak_kib"] = round(peak / 1024, 1)
+                    results[name] = result
+                    print(
+                        f"{name:26} {result['throughput_rps'] or 0:9.1f} rps  p50 {result['p50_ms']:8.2f} ms  "
+                        f"p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  hata {result['errors']}",
+                        file=sys.stderr,
+                    )
+
+    return {
+        "git": git_info(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": engine.dialect.name,
+        "dataset": dataset,
+        "config": {
+            "requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup,
+            "seed": args.seed, "trace_allocations": args.trace_allocations, "flood_writers": args.flood_writers,
+            "async_routes": database.async_engine is not None, "audit_mode": args.audit_mode,
+            "settings": {key: os.environ[key] for key in RECORDED_SETTINGS if key in os.environ},
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Endpoint kıyaslamalarını süreç içinde çalıştırır.")
+    parser.add_argument("--database-url", help=f"Varsayılan: {app_loader.DEFAULT_DATABASE_URL}")
+    parser.add_argument("--requests", type=int, default=300, help="Senaryo başına ölçülen istek sayısı.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="Virgülle ayrılmış senaryo adları.")
+    parser.add_argument("--contention-jobs", type=int, default=20)
+    parser.add_argument("--contention-bidders", type=int, default=8)
+    parser.add_argument("--flood-writers", type=int, default=8,
+                        help="jobs_page_under_signup'ta aynı anda kayıt gönderen istemci sayısı.")
+    parser.add_argument("--audit-mode", choices=("app", "trigger"), default="app",
+                        help="Denetim kayıtları: uygulama tarafı toplu yazıcı veya satır başına trigger.")
+    parser.add_argument("--trace-allocations", action="store_true",
+                        help="Senaryo başına tepe bellek ayırmasını ölçer (gecikmeleri artırır).")
+    parser.add_argument("-o", "--output", help="Sonuç dosyası (varsayılan: bench/results/<commit>-<zaman>.json).")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = (report["git"]["commit"] or "unknown")[:10]
+        stamp = report["timestamp"].replace(":", "").replace("-", "")
+        output = os.path.join(RESULTS_DIR, f"{commit}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
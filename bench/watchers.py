@@ -0,0 +1,212 @@
+# watchers.py
+
+# Anlık bildirimlerin (WebSocket) veritabanı yükünü yoklamayla (polling) karşılaştırır.
+# Açık işlere çok sayıda izleyici (/ws/jobs/{job_id}) bağlanır, bu işlere teklifler verilir ve
+# ölçülür:
+# - İzleyiciler bağlıyken boşta geçen sürede ve teklifler verilirken çalışan SQL ifadeleri
+#   (izleyici sayısından bağımsız olmalıdır),
+# - teklif isteği başlangıcından izleyiciye iletilene kadar geçen süre (p50/p95/p99),
+# - aynı izleyicilerin GET /jobs/{job_id}'yi `--poll-interval` saniyede bir yoklaması durumunda
+#   saniyede çalışacak SQL ifadesi sayısı (yoklama başına ölçülen ifade sayısından hesaplanır).
+#
+#   python -m bench.seed --preset small
+#   python -m bench.watchers --watchers 10000 --jobs 200 --offers 200
+#
+# İzleyiciler ağ katmanı olmadan, ASGI websocket kapsamıyla doğrudan uygulamaya bağlanır.
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from sqlalchemy import select
+
+from . import app_loader
+from .run import RESULTS_DIR, git_info, percentile
+
+
+class Watcher:
+    """Tek bir websocket bağlantısı; ASGI `receive`/`send` çiftini uygulama adına sağlar."""
+
+    def __init__(self, app, path, on_message):
+        self.path = path
+        self.accepted = asyncio.Event()
+        self.closed = False
+        self.close_code = None
+        self._inbox = asyncio.Queue()
+        self._inbox.put_nowait({"type": "websocket.connect"})
+        self._on_message = on_message
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+            "subprotocols": [],
+        }
+        self.task = asyncio.ensure_future(app(scope, self._inbox.get, self._send))
+
+    async def _send(self, message):
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.send":
+            self._on_message(self, json.loads(message["text"]))
+        elif message["type"] == "websocket.close":
+            self.closed, self.close_code = True, message.get("code")
+            self.accepted.set()
+
+    async def close(self):
+        self._inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await self.task
+
+
+async def run(args):
+    import httpx
+
+    app_loader.configure(args.database_url)
+    main = app_loader.load("main")
+    database, models = app_loader.load("database"), app_loader.load("models")
+    engine = database.engine
+    rng = random.Random(args.seed)
+
+    with engine.connect() as conn:
+        job_ids = conn.execute(
+            select(models.Job.id).where(models.Job.status == models.JobStatusEnum.open, models.Job.is_active.is_(True))
+            .order_by(models.Job.id).limit(args.jobs)
+        ).scalars().all()
+        provider_ids = conn.execute(
+            select(models.Provider.id).where(models.Provider.is_active.is_(True)).limit(1000)
+        ).scalars().all()
+    if not job_ids or not provider_ids:
+        raise SystemExit("Kıyaslama veritabanında açık iş veya sağlayıcı yok; önce `python -m bench.seed` çalıştırın.")
+
+    started_at = {}  # job_id -> teklif isteğinin başlangıcı
+    latencies = []
+    delivered = 0
+
+    def on_message(watcher, event):
+        nonlocal delivered
+        if event.get("type") == "offer.created":
+            delivered += 1
+            latencies.append((time.perf_counter() - started_at[event["job_id"]]) * 1000)
+
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            # Yoklama başına çalışan SQL ifadesi sayısı
+            with database.count_statements() as statements:
+                for _ in range(args.poll_samples):
+                    response = await client.get(f"/jobs/{rng.choice(job_ids)}")
+                    response.raise_for_status()
+            statements_per_poll = len(statements) / args.poll_samples
+
+            connect_start = time.perf_counter()
+            watchers = [Watcher(main.app, f"/ws/jobs/{job_ids[i % len(job_ids)]}", on_message)
+                        for i in range(args.watchers)]
+            await asyncio.gather(*(w.accepted.wait() for w in watchers))
+            connect_time = time.perf_counter() - connect_start
+            watchers_per_job = {}
+            for i in range(args.watchers):
+                job_id = job_ids[i % len(job_ids)]
+                watchers_per_job[job_id] = watchers_per_job.get(job_id, 0) + 1
+
+            with database.count_statements() as idle_statements:
+                await asyncio.sleep(args.idle)
+
+            expected = 0
+            offer_start = time.perf_counter()
+            with database.count_statements() as offer_statements:
+                for _ in range(args.offers):
+                    job_id = rng.choice(job_ids)
+                    started_at[job_id] = time.perf_counter()
+                    response = await client.post(
+                        "/offers/", params={"provider_id": rng.choice(provider_ids)},
+                        json={"job_id": job_id, "offer_price": "100.00", "message": "bench.watchers"},
+                    )
+                    response.raise_for_status()
+                    expected += watchers_per_job[job_id]
+                    # Teklif, sıradakinden önce izleyicilerine ulaşsın (gecikme iş başına ölçülür).
+                    deadline = time.perf_counter() + 5
+                    while delivered < expected and time.perf_counter() < deadline:
+                        await asyncio.sleep(0)
+            offer_time = time.perf_counter() - offer_start
+
+            dropped = sum(w.closed for w in watchers)
+            await asyncio.gather(*(w.close() for w in watchers))
+
+    latencies.sort()
+    result = {
+        "watchers": args.watchers,
+        "jobs": len(job_ids),
+        "connect_s": round(connect_time, 3),
+        "idle_s": args.idle,
+        "idle_statements": len(idle_statements),
+        "offers": args.offers,
+        "offer_statements": len(offer_statements),
+        "offer_statements_per_offer": round(len(offer_statements) / args.offers, 2) if args.offers else None,
+        "offers_s": round(offer_time, 3),
+        "deliveries_expected": expected,
+        "deliveries": delivered,
+        "watchers_dropped": dropped,
+        "delivery_p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+        "delivery_p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+        "delivery_p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        "statements_per_poll": round(statements_per_poll, 2),
+        "poll_interval_s": args.poll_interval,
+        "polling_statements_per_s": round(args.watchers / args.poll_interval * statements_per_poll, 1),
+        "push_statements_per_s": round(len(idle_statements) / args.idle, 1) if args.idle else None,
+    }
+    return {
+        "git": git_info(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": engine.dialect.name,
+        "config": {
+            "watchers": args.watchers, "jobs": args.jobs, "offers": args.offers, "idle": args.idle,
+            "poll_interval": args.poll_interval, "poll_samples": args.poll_samples, "seed": args.seed,
+            "settings": {key: os.environ[key] for key in ("EVENTS_QUEUE_SIZE", "EVENTS_REDIS_URL") if key in os.environ},
+        },
+        "result": result,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WebSocket bildirimlerinin veritabanı yükünü yoklamayla karşılaştırır.")
+    parser.add_argument("--database-url", help=f"Varsayılan: {app_loader.DEFAULT_DATABASE_URL}")
+    parser.add_argument("--watchers", type=int, default=10000, help="Bağlı izleyici sayısı.")
+    parser.add_argument("--jobs", type=int, default=200, help="İzleyicilerin dağıtıldığı açık iş sayısı.")
+    parser.add_argument("--offers", type=int, default=200, help="İzleyiciler bağlıyken verilen teklif sayısı.")
+    parser.add_argument("--idle", type=float, default=5.0, help="Boşta ölçüm süresi (sn).")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Karşılaştırılan yoklama aralığı (sn).")
+    parser.add_argument("--poll-samples", type=int, default=50, help="Yoklama maliyeti için örnek istek sayısı.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", help="Sonuç dosyası (varsayılan: bench/results/watchers-<commit>-<zaman>.json).")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    result = report["result"]
+    print(
+        f"{result['watchers']} izleyici / {result['jobs']} iş: boşta {result['idle_statements']} SQL ifadesi "
+        f"({result['push_statements_per_s']}/sn), yoklamada ~{result['polling_statements_per_s']}/sn; "
+        f"teklif başına {result['offer_statements_per_offer']} ifade, "
+        f"{result['deliveries']}/{result['deliveries_expected']} iletim, "
+        f"p50 {result['delivery_p50_ms']} ms p99 {result['delivery_p99_ms']} ms, düşen {result['watchers_dropped']}",
+        file=sys.stderr,
+    )
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = (report["git"]["commit"] or "unknown")[:10]
+        stamp = report["timestamp"].replace(":", "").replace("-", "")
+        output = os.path.join(RESULTS_DIR, f"watchers-{commit}-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
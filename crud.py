@@ -1,19 +1,118 @@
 # crud.py
 
-from sqlalchemy.orm import Session
-from . import models, schemas
-from passlib.context import CryptContext
+import base64
+from datetime import datetime
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+from . import audit, events, matching, models, ratings, schemas, search, security, seo, transitions
 
-# Şifreleme için context oluşturuluyor. 'bcrypt' algoritması kullanılacak.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt hash'leme ve doğrulama, istek thread'lerini ve GIL'i meşgul etmemesi için
+# security modülündeki sınırlı süreç havuzunda yapılır. Havuz doluysa
+# `security.HashingBusyError` fırlatılır.
 
 def get_password_hash(password):
     """Verilen şifreyi hash'ler."""
-    return pwd_context.hash(password)
+    return security.hash_password(password)
 
 def verify_password(plain_password, hashed_password):
     """Verilen düz metin şifre ile hash'lenmiş şifreyi karşılaştırır."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return security.verify_password(plain_password, hashed_password)
+
+
+# --- Keyset (cursor) sayfalama yardımcıları ---
+# OFFSET ile sayfalama, atlanan tüm satırları tarayıp çöpe attığı için derin sayfalarda
+# yavaşlar. Bunun yerine son görülen (created_at, id) ikilisi opak bir cursor olarak
+# istemciye verilir ve sonraki sayfa doğrudan (created_at, id) indeksinden okunur.
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """(created_at, id) ikilisini URL-güvenli, opak bir cursor metnine çevirir."""
+    raw = f"{created_at.isoformat()}|{record_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """
+    `encode_cursor` ile üretilmiş cursor'ı (created_at, id) ikilisine geri çevirir.
+    Cursor bozuksa `ValueError` fırlatır.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception as exc:
+        raise ValueError("Geçersiz cursor.") from exc
+
+def _keyset_select(model, cursor: str = None, limit: int = 100, descending: bool = False, stmt=None):
+    """
+    Verilen model için (created_at, id) sırasına göre bir sonraki sayfanın SELECT ifadesini kurar.
+    Sonraki sayfanın olup olmadığını ek sorgu olmadan anlamak için bir fazla satır istenir.
+    `descending=True` ile en yeni kayıtlar önce gelir. Ek filtreler için hazır bir `stmt` verilebilir.
+    Senkron ve asenkron CRUD katmanları aynı ifadeyi kullanır.
+    """
+    stmt = select(model) if stmt is None else stmt
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        # (created_at, id) > (:created_at, :id) koşulunun açık yazımı. MySQL, satır
+        # karşılaştırmasından çok bu biçimi bileşik indeks üzerinde aralık taramasına çevirir.
+        if descending:
+            stmt = stmt.where(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < record_id),
+            ))
+        else:
+            stmt = stmt.where(or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > record_id),
+            ))
+    if descending:
+        return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    return stmt.order_by(model.created_at, model.id).limit(limit + 1)
+
+def _split_page(rows, limit: int):
+    """`_keyset_select` sonucunu (kayıtlar, next_cursor) ikilisine çevirir; son sayfada next_cursor None olur."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+def _keyset_page(db: Session, model, cursor: str = None, limit: int = 100):
+    """Verilen model için keyset sayfalama ile bir sayfa getirir: (kayıtlar, next_cursor)."""
+    rows = db.execute(_keyset_select(model, cursor=cursor, limit=limit)).scalars().all()
+    return _split_page(rows, limit)
+
+def get_column_rows(db: Session, columns, skip: int = 0, limit: int = 100):
+    """
+    `get_users`/`get_jobs`'un yalnızca verilen kolonları tuple olarak döndüren hali
+    (ORM nesnesi oluşturulmaz; hızlı serileştirme yolu için).
+    """
+    return db.execute(select(*columns).offset(skip).limit(limit)).all()
+
+def get_column_rows_page(db: Session, model, columns, cursor: str = None, limit: int = 100):
+    """`_keyset_page`'in kolon tuple'ları döndüren hali. Kolonlar `created_at` ve `id`'yi içermelidir."""
+    stmt = _keyset_select(model, cursor=cursor, limit=limit, stmt=select(*columns))
+    return _split_page(db.execute(stmt).all(), limit)
+
+
+# --- Tek satırlık yazma yardımcısı ---
+
+def _insert_one(db: Session, obj):
+    """
+    Nesneyi tek bir INSERT ile ekleyip commit eder.
+    - Benzersizlik (ör. users.email) önceden SELECT ile kontrol edilmez; veritabanının unique
+      indeksine güvenilir ve ihlalde `IntegrityError` çağırana iletilir (API katmanında 400).
+      Böylece kontrol-sonra-ekle yarışı (race) da ortadan kalkar.
+    - Modeller `eager_defaults` ile tanımlıdır: RETURNING destekleyen veritabanlarında id ve
+      created_at gibi sunucu değerleri INSERT ile birlikte döner, ayrıca `refresh` gerekmez.
+      Oturumlar `expire_on_commit=False` olduğundan commit sonrası nesne yeniden yüklenmez.
+    """
+    db.add(obj)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+    return obj
 
 
 # --- User CRUD Fonksiyonları ---
@@ -30,53 +129,360 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
     """Belirli bir aralıktaki kullanıcıları liste olarak getirir."""
     return db.query(models.User).offset(skip).limit(limit).all()
 
+def get_users_page(db: Session, cursor: str = None, limit: int = 100):
+    """Kullanıcıları keyset (cursor) sayfalama ile getirir: (kullanıcılar, next_cursor)."""
+    return _keyset_page(db, models.User, cursor=cursor, limit=limit)
+
+def authenticate_user(db: Session, email: str, password: str):
+    """
+    E-posta ve şifre ile kullanıcıyı doğrular; başarısızsa None döner.
+    Kayıtlı hash, yapılandırılmış bcrypt maliyetiyle üretilmemişse şifre yeni maliyetle
+    yeniden hash'lenip kaydedilir.
+    """
+    db_user = get_user_by_email(db, email=email)
+    if db_user is None:
+        return None
+    verified, new_hash = security.verify_and_update_password(password, db_user.password_hash)
+    if not verified:
+        return None
+    if new_hash:
+        db_user.password_hash = new_hash
+        db.commit()
+    return db_user
+
 def create_user(db: Session, user: schemas.UserCreate):
     """Yeni bir kullanıcı oluşturur."""
     hashed_password = get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
-        hashed_password=hashed_password,
+        password_hash=hashed_password,
         first_name=user.first_name,
         last_name=user.last_name,
         phone_number=user.phone_number,
         role_id=user.role_id
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user) # Veritabanından gelen yeni verilerle (id, created_at vb.) nesneyi günceller
-    return db_user
+    return _insert_one(db, db_user)
 
 
 # --- Job CRUD Fonksiyonları ---
 
 def get_job(db: Session, job_id: int):
-    """ID'ye göre tek bir iş ilanını getirir."""
-    return db.query(models.Job).filter(models.Job.id == job_id).first()
+    """
+    ID'ye göre tek bir iş ilanını, teklifleriyle birlikte getirir.
+    `offers` ilişkisi lazy olduğundan serileştirme sırasında ayrı bir sorgu tetiklenir;
+    selectinload ile teklifler tek bir `IN` sorgusuyla önceden yüklenir.
+    """
+    return (
+        db.query(models.Job)
+        .options(selectinload(models.Job.offers))
+        .filter(models.Job.id == job_id)
+        .first()
+    )
 
 def get_jobs(db: Session, skip: int = 0, limit: int = 100):
     """Belirli bir aralıktaki iş ilanlarını liste olarak getirir."""
     return db.query(models.Job).offset(skip).limit(limit).all()
 
+def get_jobs_page(db: Session, cursor: str = None, limit: int = 100):
+    """İş ilanlarını keyset (cursor) sayfalama ile getirir: (ilanlar, next_cursor)."""
+    return _keyset_page(db, models.Job, cursor=cursor, limit=limit)
+
+def get_open_jobs_for_provider(db: Session, provider_id: int, cursor: str = None, limit: int = 100):
+    """
+    Sağlayıcının hizmet bölgelerine (service_id, district_id) uyan açık iş ilanlarını en yeniden
+    eskiye keyset sayfalama ile getirir: (ilanlar, next_cursor).
+    Bölgeler her istekte join ile değil, `matching.provider_areas` önbelleğinden okunur; sorgu
+    jobs(status, service_id, district_id, created_at) indeksi üzerinde her çift için bir aralık
+    taramasına dönüşür.
+    """
+    pairs = matching.provider_areas.get(db, provider_id)
+    if not pairs:
+        return [], None
+    districts_by_service = {}
+    for service_id, district_id in pairs:
+        districts_by_service.setdefault(service_id, []).append(district_id)
+    stmt = select(models.Job).where(
+        models.Job.status == models.JobStatusEnum.open,
+        models.Job.is_active.is_(True),
+        or_(*(
+            and_(models.Job.service_id == service_id, models.Job.district_id.in_(district_ids))
+            for service_id, district_ids in districts_by_service.items()
+        )),
+    )
+    stmt = _keyset_select(models.Job, cursor=cursor, limit=limit, descending=True, stmt=stmt)
+    return _split_page(db.execute(stmt).scalars().all(), limit)
+
 def create_customer_job(db: Session, job: schemas.JobCreate, customer_id: int):
-    """Belirli bir müşteri için yeni bir iş ilanı oluşturur."""
-    db_job = models.Job(**job.model_dump(), customer_id=customer_id)
-    db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    """Belirli bir müşteri için yeni bir iş ilanı oluşturur ve bölgeyi izleyen sağlayıcılara bildirir."""
+    db_job = _insert_one(db, models.Job(**job.model_dump(), customer_id=customer_id))
+    _publish_job_created(db_job)
     return db_job
 
+def _publish_job_created(db_job):
+    """Commit edilen işi bölgeyi izleyen sağlayıcılara bildirir (crud_async ile paylaşılır)."""
+    events.broker.publish(events.area_topic(db_job.service_id, db_job.district_id), {
+        "type": "job.created",
+        "job": schemas.Job.model_validate(db_job).model_dump(mode="json"),
+    })
+
 # --- Offer CRUD Fonksiyonları ---
 
+def get_offer(db: Session, offer_id: int):
+    """
+    ID'ye göre tek bir teklifi, `OfferDetails` şemasının ihtiyaç duyduğu iş ve sağlayıcı
+    bilgisiyle birlikte getirir. Her ikisi de çoka-bir ilişki olduğundan joinedload ile
+    tek bir sorguda yüklenir.
+    """
+    return (
+        db.query(models.Offer)
+        .options(joinedload(models.Offer.job), joinedload(models.Offer.provider))
+        .filter(models.Offer.id == offer_id)
+        .first()
+    )
+
 def create_provider_offer(db: Session, offer: schemas.OfferCreate, provider_id: int):
     """
     Belirli bir sağlayıcı için bir iş ilanına yeni bir teklif oluşturur.
     Not: Bu fonksiyon, teklif veren kullanıcının gerçekten bir 'provider' rolüne
     sahip olup olmadığını kontrol etmelidir. Bu kontrol API katmanında yapılabilir.
     """
-    db_offer = models.Offer(**offer.model_dump(), provider_id=provider_id)
-    db.add(db_offer)
-    db.commit()
-    db.refresh(db_offer)
+    db_offer = _insert_one(db, models.Offer(**offer.model_dump(), provider_id=provider_id))
+    # İşi izleyen müşteriye bildirim; commit sonrasında yayınlanır.
+    _publish_offer_created(db_offer)
     return db_offer
 
+def _publish_offer_created(db_offer):
+    """Commit edilen teklifi işi izleyen müşteriye bildirir (crud_async ile paylaşılır)."""
+    events.broker.publish(events.job_topic(db_offer.job_id), {
+        "type": "offer.created",
+        "job_id": db_offer.job_id,
+        "offer": schemas.Offer.model_validate(db_offer).model_dump(mode="json"),
+    })
+
+def accept_offer(db: Session, offer_id: int):
+    """
+    Teklifi kabul eder: iş ilanı 'open' -> 'assigned', teklif 'pending' -> 'accepted' ve işin
+    bekleyen diğer teklifleri tek bir UPDATE ile 'rejected' olur; hepsi tek işlemde commit edilir.
+    - Teklif bulunamazsa None döner.
+    - İş artık açık değilse (ör. eşzamanlı başka bir kabul önce commit ettiyse) veya teklif
+      beklemede değilse `transitions.TransitionConflictError` fırlatılır.
+    Aynı işe gelen eşzamanlı kabuller, işin satırındaki koşullu UPDATE'te sıraya girer;
+    ilki commit edince diğerlerinin koşulu tutmaz ve çakışma olarak döner.
+    Commit sonrasında işi ve işin bölgesini izleyen istemcilere bildirim gönderilir.
+    """
+    job = db.execute(
+        select(models.Offer.job_id, models.Job.service_id, models.Job.district_id)
+        .join(models.Job, models.Job.id == models.Offer.job_id)
+        .where(models.Offer.id == offer_id, models.Offer.is_active.is_(True))
+    ).one_or_none()
+    if job is None:
+        return None
+    job_id = job.job_id
+    try:
+        transitions.transition(db, models.Job, job_id, models.JobStatusEnum.open, models.JobStatusEnum.assigned)
+        transitions.transition(
+            db, models.Offer, offer_id, models.OfferStatusEnum.pending, models.OfferStatusEnum.accepted,
+            models.Offer.job_id == job_id,
+        )
+        transitions.transition_all(
+            db, models.Offer, models.OfferStatusEnum.pending, models.OfferStatusEnum.rejected,
+            models.Offer.job_id == job_id, models.Offer.id != offer_id,
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    events.broker.publish(events.job_topic(job_id), {"type": "offer.accepted", "job_id": job_id, "offer_id": offer_id})
+    # İş artık açık değil; bölgeyi izleyen sağlayıcılar listelerinden çıkarır.
+    events.broker.publish(events.area_topic(job.service_id, job.district_id), {"type": "job.assigned", "job_id": job_id})
+    return db.get(models.Offer, offer_id, populate_existing=True)
+
+
+# --- Referans Veri CRUD Fonksiyonları ---
+# Okumalar reference_cache üzerinden yapılır; yazmalardan sonra API katmanı ilgili tabloyu
+# önbellekte geçersiz kılar.
+
+def create_category(db: Session, category: schemas.CategoryCreate):
+    """Yeni bir kategori oluşturur."""
+    return _insert_one(db, models.Category(**category.model_dump()))
+
+def create_service(db: Session, service: schemas.ServiceCreate):
+    """Yeni bir hizmet oluşturur."""
+    return _insert_one(db, models.Service(**service.model_dump()))
+
+# --- Review CRUD Fonksiyonları ---
+
+def create_review(db: Session, review: schemas.ReviewCreate, customer_id: int):
+    """
+    Yeni bir yorum oluşturur ve sağlayıcının puan özetini aynı işlem içinde günceller.
+    Not: İşin 'completed' durumda ve müşteriye ait olduğu kontrolü API katmanında yapılabilir.
+    """
+    db_review = models.Review(**review.model_dump(), customer_id=customer_id)
+    db.add(db_review)
+    try:
+        db.flush()
+        ratings.apply_review(db, db_review.provider_id, db_review.rating, delta=1)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+    return db_review
+
+def soft_delete_review(db: Session, review_id: int):
+    """
+    Yorumu pasife çeker (soft delete) ve puan özetinden düşer. Koşullu UPDATE sayesinde aynı
+    yorum eşzamanlı olarak iki kez silinse bile özet yalnızca bir kez güncellenir.
+    Yorum bulunamazsa veya zaten pasifse False döner.
+    """
+    row = db.execute(
+        select(models.Review.provider_id, models.Review.rating).where(models.Review.id == review_id)
+    ).first()
+    if row is None:
+        return False
+    result = db.execute(
+        update(models.Review)
+        .where(models.Review.id == review_id, models.Review.is_active.is_(True))
+        .values(is_active=False)
+    )
+    if result.rowcount == 0:
+        db.rollback()
+        return False
+    ratings.apply_review(db, row.provider_id, row.rating, delta=-1)
+    db.commit()
+    return True
+
+
+# --- Provider CRUD Fonksiyonları ---
+
+def get_top_rated_providers(db: Session, limit: int = 100, min_reviews: int = 1):
+    """
+    Sağlayıcıları ortalama puana (eşitlikte yorum sayısına) göre azalan sırada getirir.
+    Sıralama reviews üzerinde gruplu tarama yerine özet tablosunun (rating_avg, review_count)
+    indeksinden okunur.
+    """
+    return (
+        db.query(models.Provider)
+        .join(models.Provider.rating_summary)
+        .options(contains_eager(models.Provider.rating_summary))
+        .filter(
+            models.Provider.is_active.is_(True),
+            models.ProviderRatingSummary.review_count >= min_reviews,
+        )
+        .order_by(
+            models.ProviderRatingSummary.rating_avg.desc(),
+            models.ProviderRatingSummary.review_count.desc(),
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+# --- Toplu (Bulk) CRUD Fonksiyonları ---
+# Toplu fonksiyonlar (sıra_no, şema) ikililerinden oluşan bir grubu (chunk) tek işlemde yazar ve
+# (eklenen_sayısı, [schemas.BulkRowError]) döner. Satırlar tek tek add/commit/refresh yerine
+# tek bir çok satırlı INSERT (executemany) ile gönderilir.
+
+def _insert_many(db: Session, model, rows):
+    """
+    Satırları tek seferde ekler ve eklenen id'leri satır sırasıyla döndürür.
+    - RETURNING'i executemany ile destekleyen veritabanlarında (SQLite 3.35+, MariaDB) id'ler
+      INSERT ile birlikte döner.
+    - MySQL'de grup tek bir çok satırlı INSERT olarak gönderilir. Satır sayısı önceden bilinen bu
+      ifade için InnoDB id'leri tek seferde ayırır; id'ler LAST_INSERT_ID()'den başlayarak ardışıktır.
+    """
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        return db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows).scalars().all()
+    first_id = db.execute(insert(model).values(rows)).lastrowid
+    return list(range(first_id, first_id + len(rows)))
+
+def _bulk_insert(db: Session, model, indexed_values, mark_changed=None):
+    """
+    (sıra_no, kolon_değerleri) listesini tek işlemde ekler. Grup bir bütünlük hatasına takılırsa
+    işlem geri alınır ve satırlar SAVEPOINT'ler içinde tek tek denenerek hatalı satırlar raporlanır.
+    Core INSERT ORM flush'ından geçmediği için eklenen her satırın denetim kaydı aynı işleme
+    açıkça iliştirilir (commit'te yazılır); `mark_changed(db, ids)` verilmişse yalnızca eklenen
+    satırların id'leriyle commit'ten önce çağrılır. Geriye (eklenen_id'ler, hatalar) döner.
+    """
+    if not indexed_values:
+        return [], []
+    try:
+        ids = _insert_many(db, model, [values for _, values in indexed_values])
+        audit.record_inserts_in_session(db, model, zip(ids, (values for _, values in indexed_values)))
+        if mark_changed:
+            mark_changed(db, ids)
+        db.commit()
+        return ids, []
+    except IntegrityError:
+        db.rollback()
+
+    inserted, errors = [], []
+    for index, values in indexed_values:
+        try:
+            with db.begin_nested():
+                record_id = _insert_many(db, model, [values])[0]
+            inserted.append((record_id, values))
+        except IntegrityError as exc:
+            errors.append(schemas.BulkRowError(index=index, detail=str(exc.orig)))
+    audit.record_inserts_in_session(db, model, inserted)
+    ids = [record_id for record_id, _ in inserted]
+    if mark_changed and ids:
+        mark_changed(db, ids)
+    db.commit()
+    return ids, errors
+
+def bulk_create_users(db: Session, users):
+    """
+    Bir grup kullanıcıyı toplu olarak oluşturur. `users`: [(sıra_no, schemas.UserCreate)].
+    Kayıtlı e-postalar, satır başına `get_user_by_email` yerine grup başına tek bir `IN` sorgusuyla bulunur.
+    """
+    emails = {user.email for _, user in users}
+    existing = set(db.execute(select(models.User.email).where(models.User.email.in_(emails))).scalars())
+
+    errors, accepted = [], []
+    for index, user in users:
+        if user.email in existing:
+            errors.append(schemas.BulkRowError(index=index, detail="Bu e-posta adresi zaten kayıtlı."))
+            continue
+        existing.add(user.email)  # Aynı grupta tekrar eden e-postalar
+        accepted.append((index, user))
+
+    hashes = security.hash_passwords([user.password for _, user in accepted])
+    values = [
+        (index, {
+            "email": user.email,
+            "password_hash": password_hash,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "phone_number": user.phone_number,
+            "role_id": user.role_id,
+        })
+        for (index, user), password_hash in zip(accepted, hashes)
+    ]
+    ids, insert_errors = _bulk_insert(db, models.User, values)
+    return len(ids), errors + insert_errors
+
+def bulk_create_customer_jobs(db: Session, jobs, customer_id: int):
+    """Bir müşteri için bir grup iş ilanını toplu olarak oluşturur. `jobs`: [(sıra_no, schemas.JobCreate)]."""
+    values = [(index, {**job.model_dump(), "customer_id": customer_id}) for index, job in jobs]
+    # Core INSERT ORM olaylarını tetiklemez; tek satırlık yoldaki gibi yalnızca eklenen satırlar
+    # arama indeksi ve SEO sayfaları için işaretlenir ve bölgeyi izleyenlere bildirilir.
+    ids, errors = _bulk_insert(db, models.Job, values, _mark_jobs_changed)
+    if ids:
+        for db_job in db.scalars(select(models.Job).where(models.Job.id.in_(ids))):
+            _publish_job_created(db_job)
+    return len(ids), errors
+
+def _mark_jobs_changed(db: Session, job_ids):
+    search.mark_jobs_changed(db, job_ids)
+    seo.mark_jobs_changed(db, job_ids)
+
+def bulk_create_provider_offers(db: Session, offers, provider_id: int):
+    """Bir sağlayıcı için bir grup teklifi toplu olarak oluşturur. `offers`: [(sıra_no, schemas.OfferCreate)]."""
+    values = [(index, {**offer.model_dump(), "provider_id": provider_id}) for index, offer in offers]
+    ids, errors = _bulk_insert(db, models.Offer, values)
+    if ids:
+        for db_offer in db.scalars(select(models.Offer).where(models.Offer.id.in_(ids))):
+            _publish_offer_created(db_offer)
+    return len(ids), errors
+
 # Diğer modeller (Category, Service, Review vb.) için de benzer CRUD fonksiyonları eklenebilir.
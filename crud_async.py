@@ -0,0 +1,102 @@
+# crud_async.py
+
+# crud.py içindeki fonksiyonların AsyncSession ile çalışan karşılıkları.
+# Sorgu ifadeleri mümkün olduğunca crud.py ile paylaşılır; böylece iki yol aynı SQL'i üretir.
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from . import crud, models, schemas, security
+
+
+async def _insert_one(db: AsyncSession, obj):
+    """`crud._insert_one`'ın asenkron karşılığı: tek INSERT, refresh yok, ihlalde `IntegrityError`."""
+    db.add(obj)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise
+    return obj
+
+
+# --- User CRUD Fonksiyonları ---
+
+async def get_user(db: AsyncSession, user_id: int):
+    """ID'ye göre tek bir kullanıcıyı getirir."""
+    return await db.get(models.User, user_id)
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    """E-posta adresine göre tek bir kullanıcıyı getirir."""
+    result = await db.execute(select(models.User).where(models.User.email == email).limit(1))
+    return result.scalars().first()
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    """Belirli bir aralıktaki kullanıcıları liste olarak getirir."""
+    result = await db.execute(select(models.User).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_users_page(db: AsyncSession, cursor: str = None, limit: int = 100):
+    """Kullanıcıları keyset (cursor) sayfalama ile getirir: (kullanıcılar, next_cursor)."""
+    result = await db.execute(crud._keyset_select(models.User, cursor=cursor, limit=limit))
+    return crud._split_page(result.scalars().all(), limit)
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
+    """Yeni bir kullanıcı oluşturur."""
+    hashed_password = await security.hash_password_async(user.password)
+    db_user = models.User(
+        email=user.email,
+        password_hash=hashed_password,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        phone_number=user.phone_number,
+        role_id=user.role_id
+    )
+    return await _insert_one(db, db_user)
+
+
+# --- Job CRUD Fonksiyonları ---
+
+async def get_job(db: AsyncSession, job_id: int):
+    """ID'ye göre tek bir iş ilanını, teklifleriyle birlikte getirir."""
+    result = await db.execute(
+        select(models.Job)
+        .options(selectinload(models.Job.offers))
+        .where(models.Job.id == job_id)
+    )
+    return result.scalars().first()
+
+async def get_jobs(db: AsyncSession, skip: int = 0, limit: int = 100):
+    """Belirli bir aralıktaki iş ilanlarını liste olarak getirir."""
+    result = await db.execute(select(models.Job).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_jobs_page(db: AsyncSession, cursor: str = None, limit: int = 100):
+    """İş ilanlarını keyset (cursor) sayfalama ile getirir: (ilanlar, next_cursor)."""
+    result = await db.execute(crud._keyset_select(models.Job, cursor=cursor, limit=limit))
+    return crud._split_page(result.scalars().all(), limit)
+
+async def create_customer_job(db: AsyncSession, job: schemas.JobCreate, customer_id: int):
+    """Belirli bir müşteri için yeni bir iş ilanı oluşturur ve bölgeyi izleyen sağlayıcılara bildirir."""
+    db_job = await _insert_one(db, models.Job(**job.model_dump(), customer_id=customer_id))
+    crud._publish_job_created(db_job)
+    return db_job
+
+
+# --- Offer CRUD Fonksiyonları ---
+
+async def get_offer(db: AsyncSession, offer_id: int):
+    """ID'ye göre tek bir teklifi, iş ve sağlayıcı bilgisiyle birlikte getirir."""
+    result = await db.execute(
+        select(models.Offer)
+        .options(joinedload(models.Offer.job), joinedload(models.Offer.provider))
+        .where(models.Offer.id == offer_id)
+    )
+    return result.scalars().first()
+
+async def create_provider_offer(db: AsyncSession, offer: schemas.OfferCreate, provider_id: int):
+    """Belirli bir sağlayıcı için bir iş ilanına yeni bir teklif oluşturur ve işi izleyen müşteriye bildirir."""
+    db_offer = await _insert_one(db, models.Offer(**offer.model_dump(), provider_id=provider_id))
+    crud._publish_offer_created(db_offer)
+    return db_offer
@@ -0,0 +1,32 @@
+# __main__.py
+
+# Uygulamanın komut satırı araçları. Modüller göreli import kullandığından (`from . import models`)
+# paket olarak çalıştırılır: imajda uygulama dizininin bir üstünden (/usr/src) `python -m app ...`.
+# Komut, paketteki ilgili modülün `main()`'ine yönlendirilir; modüller yalnızca istenen komut için
+# import edilir. Ayarlar (DATABASE_URL vb.) API sunucusundaki gibi ortam değişkenlerinden okunur.
+#
+#   python -m app export jobs --format csv --status open --since 2025-01-01 --gzip -o jobs.csv.gz
+#   python -m app seo build --workers 8
+#   python -m app audit_archive archive --retention-months 6
+
+import importlib
+import sys
+
+# komut -> paketteki modül
+COMMANDS = {
+    "export": "export",
+    "seo": "seo",
+    "audit_archive": "audit_archive",
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"Kullanım: python -m {__package__} {{{','.join(COMMANDS)}}} ...", file=sys.stderr)
+        return 2
+    return importlib.import_module(f"{__package__}.{COMMANDS[argv[0]]}").main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
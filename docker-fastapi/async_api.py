@@ -0,0 +1,90 @@
+# async_api.py
+
+# main.py'deki rotaların `async def` karşılıkları. Bu rotalar Starlette'in thread havuzunu
+# kullanmaz; eşzamanlılık, bekleyen MySQL istekleri sırasında olay döngüsünde serbest kalan
+# bağlantı sayısıyla (havuz boyutu) sınırlanır.
+# Yalnızca ASYNC_DATABASE_URL tanımlıysa main.py tarafından /async önekiyle eklenir.
+# ASYNC_DATABASE_URL, DATABASE_URL ile aynı veritabanını göstermelidir.
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+
+from . import crud_async, instrumentation, schemas
+from .database import get_async_db
+from .reference_cache import check_job_references
+
+router = APIRouter(prefix="/async", route_class=instrumentation.InstrumentedRoute)
+
+
+# --- Kullanıcı Endpoint'leri ---
+
+@router.post("/users/", response_model=schemas.User, status_code=status.HTTP_201_CREATED, tags=["Async"])
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Yeni bir kullanıcı oluşturur (asenkron)."""
+    return await crud_async.create_user(db=db, user=user)
+
+@router.get("/users/", response_model=Union[List[schemas.User], schemas.UserPage], tags=["Async"])
+async def read_users(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Sistemdeki kullanıcıların bir listesini döndürür (asenkron)."""
+    if cursor is not None:
+        try:
+            users, next_cursor = await crud_async.get_users_page(db, cursor=cursor, limit=limit)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return schemas.UserPage(items=users, next_cursor=next_cursor)
+    return await crud_async.get_users(db, skip=skip, limit=limit)
+
+@router.get("/users/{user_id}", response_model=schemas.User, tags=["Async"])
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Belirtilen ID'ye sahip kullanıcıyı döndürür (asenkron)."""
+    db_user = await crud_async.get_user(db, user_id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı.")
+    return db_user
+
+
+# --- İş İlanı (Job) Endpoint'leri ---
+
+@router.post("/jobs/", response_model=schemas.Job, status_code=status.HTTP_201_CREATED, tags=["Async"])
+async def create_job(job: schemas.JobCreate, customer_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Yeni bir iş ilanı oluşturur (asenkron)."""
+    detail = check_job_references(job)
+    if detail:
+        raise HTTPException(status_code=400, detail=detail)
+    return await crud_async.create_customer_job(db=db, job=job, customer_id=customer_id)
+
+@router.get("/jobs/", response_model=Union[List[schemas.Job], schemas.JobPage], tags=["Async"])
+async def read_jobs(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Sistemdeki iş ilanlarının bir listesini döndürür (asenkron)."""
+    if cursor is not None:
+        try:
+            jobs, next_cursor = await crud_async.get_jobs_page(db, cursor=cursor, limit=limit)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return schemas.JobPage(items=jobs, next_cursor=next_cursor)
+    return await crud_async.get_jobs(db, skip=skip, limit=limit)
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobWithOffers, tags=["Async"])
+async def read_job_details(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Belirtilen ID'ye sahip iş ilanını, teklifleriyle birlikte döndürür (asenkron)."""
+    db_job = await crud_async.get_job(db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="İş ilanı bulunamadı.")
+    return db_job
+
+
+# --- Teklif (Offer) Endpoint'leri ---
+
+@router.post("/offers/", response_model=schemas.Offer, status_code=status.HTTP_201_CREATED, tags=["Async"])
+async def create_offer(offer: schemas.OfferCreate, provider_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Bir iş ilanına yeni bir teklif oluşturur (asenkron)."""
+    return await crud_async.create_provider_offer(db=db, offer=offer, provider_id=provider_id)
+
+@router.get("/offers/{offer_id}", response_model=schemas.OfferDetails, tags=["Async"])
+async def read_offer_details(offer_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Belirtilen ID'ye sahip teklifi, iş ilanı ve sağlayıcı bilgisiyle döndürür (asenkron)."""
+    db_offer = await crud_async.get_offer(db, offer_id=offer_id)
+    if db_offer is None:
+        raise HTTPException(status_code=404, detail="Teklif bulunamadı.")
+    return db_offer
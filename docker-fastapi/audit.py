@@ -0,0 +1,279 @@
+# audit.py
+
+# Uygulama tarafında denetim kaydı (audit log).
+# proje.sql'deki satır başına AFTER INSERT/UPDATE trigger'larının yerine geçer: her yazma
+# işleminin içinde JSON_OBJECT üretip audit_logs'a eşzamanlı INSERT yapmak yerine,
+# - değişiklikler SQLAlchemy oturum olaylarıyla yakalanır (UPDATE'lerde yalnızca değişen kolonlar),
+# - commit sonrasında bellekteki sınırlı bir kuyruğa eklenir,
+# - arka plandaki bir thread kuyruğu gruplar halinde çok satırlı INSERT'lerle audit_logs'a yazar.
+#
+# Kuyruk doluysa yazma yapan istek AUDIT_ENQUEUE_TIMEOUT kadar bekletilir (backpressure); yine
+# yer açılmazsa kayıt kaybolmasın diye istek thread'inde doğrudan yazılır. Olay döngüsünde
+# (AsyncSession commit'i) beklenmez: sığmayan kayıtlar döngüyü durdurmamak için varsayılan
+# executor'da yazılır. Uygulama kapanırken kuyrukta kalan kayıtlar boşaltılır.
+#
+# İşlemi yapan kullanıcı `current_user_id` bağlam değişkeninden okunur (main.py'de istek
+# başlığından atanır). ORM dışı Core UPDATE/INSERT'ler olayları tetiklemez; bu yollar
+# gerekiyorsa `record()` ile açıkça kayıt bırakır.
+
+import asyncio
+import contextvars
+import datetime
+import decimal
+import enum
+import logging
+import os
+import queue
+import threading
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.orm import Session
+from . import metrics, models
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "2.0"))
+
+current_user_id = contextvars.ContextVar("current_user_id", default=None)
+
+# Denetlenen modeller ve kayda alınmayacak kolonlar.
+AUDITED_MODELS = (
+    models.User, models.Provider, models.ProviderServiceArea, models.Category, models.Service,
+    models.Job, models.Offer, models.Review, models.PortfolioItem,
+)
+EXCLUDED_COLUMNS = {"password_hash", "created_at", "updated_at"}
+
+ENTRIES_ENQUEUED = metrics.Counter("audit_entries_enqueued_total", "Kuyruğa eklenen denetim kaydı sayısı.")
+ENTRIES_WRITTEN = metrics.Counter("audit_entries_written_total", "audit_logs tablosuna yazılan denetim kaydı sayısı.")
+ENTRIES_FAILED = metrics.Counter("audit_entries_failed_total", "Yazılamayan denetim kaydı sayısı.")
+ENTRIES_INLINE = metrics.Counter(
+    "audit_entries_inline_total",
+    "Kuyruk dolu olduğu için kuyruğa alınmadan doğrudan yazılan denetim kaydı sayısı.",
+)
+
+
+def _json_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def _entry(action, obj, old_values, new_values):
+    return {
+        "user_id": current_user_id.get(),
+        "action": action,
+        "table_name": obj.__tablename__,
+        "record_id": "-".join(str(v) for v in inspect(obj).mapper.primary_key_from_instance(obj)),
+        "old_values": old_values,
+        "new_values": new_values,
+        # Zaman damgası yazma anında değil yakalama anında alınır; toplu yazma gecikmesi yansımaz.
+        # UTC'dir; MySQL oturumları da UTC'ye sabitlenir (bkz. database.use_utc_sessions).
+        "action_timestamp": datetime.datetime.now(datetime.timezone.utc),
+    }
+
+
+def _insert_entry(obj):
+    state = inspect(obj)
+    values = {
+        attr.key: _json_value(getattr(obj, attr.key))
+        for attr in state.mapper.column_attrs
+        if attr.key not in EXCLUDED_COLUMNS
+    }
+    return _entry(models.AuditActionEnum.INSERT, obj, None, values)
+
+
+def _update_entry(obj):
+    state = inspect(obj)
+    old_values, new_values = {}, {}
+    for attr in state.mapper.column_attrs:
+        if attr.key in EXCLUDED_COLUMNS:
+            continue
+        history = state.attrs[attr.key].history
+        if not history.has_changes():
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        if old == new:
+            continue
+        old_values[attr.key] = _json_value(old)
+        new_values[attr.key] = _json_value(new)
+    if not new_values:
+        return None
+    action = models.AuditActionEnum.UPDATE
+    if old_values.get("is_active") is True and new_values.get("is_active") is False:
+        action = models.AuditActionEnum.SOFT_DELETE
+    return _entry(action, obj, old_values, new_values)
+
+
+class AuditWriter:
+    """Denetim kayıtlarını kuyruktan alıp gruplar halinde yazan arka plan thread'i."""
+
+    def __init__(self, bind=engine, maxsize=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE,
+                 flush_interval=AUDIT_FLUSH_INTERVAL, enqueue_timeout=AUDIT_ENQUEUE_TIMEOUT):
+        self.bind = bind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        metrics.Gauge("audit_queue_depth", "Yazılmayı bekleyen denetim kaydı sayısı.", self._queue.qsize)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Kuyruktaki tüm kayıtları yazar ve thread'i durdurur."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def enqueue(self, entries):
+        if self._thread is None:
+            self.start()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        overflow = []
+        for entry in entries:
+            if overflow:
+                overflow.append(entry)
+                continue
+            try:
+                if loop is None:
+                    self._queue.put(entry, timeout=self.enqueue_timeout)
+                else:
+                    self._queue.put_nowait(entry)
+            except queue.Full:
+                overflow.append(entry)
+                continue
+            ENTRIES_ENQUEUED.inc()
+        if overflow:
+            ENTRIES_INLINE.inc(len(overflow))
+            if loop is None:
+                self._write(overflow)
+            else:
+                loop.run_in_executor(None, self._write, overflow)
+
+    def _write(self, batch):
+        try:
+            with self.bind.begin() as conn:
+                conn.execute(insert(models.AuditLog), batch)
+            ENTRIES_WRITTEN.inc(len(batch))
+        except Exception:
+            ENTRIES_FAILED.inc(len(batch))
+            logger.exception("Denetim kayıtları yazılamadı (%d kayıt).", len(batch))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            if first is None:
+                stopping = True
+            else:
+                batch.append(first)
+            # Kuyrukta bekleyenleri bir grup dolana kadar beklemeden topla.
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+        # Durdurma sinyalinden sonra kalan kayıtlar
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            self._write(remaining[start:start + self.batch_size])
+
+
+writer = AuditWriter()
+
+
+def _explicit_entry(action, table_name, record_id, old_values, new_values):
+    return {
+        "user_id": current_user_id.get(),
+        "action": action,
+        "table_name": table_name,
+        "record_id": str(record_id),
+        "old_values": old_values,
+        "new_values": new_values,
+        "action_timestamp": datetime.datetime.now(datetime.timezone.utc),
+    }
+
+def record(action, table_name, record_id, old_values=None, new_values=None):
+    """ORM olaylarını tetiklemeyen (Core) yazmalar için açık denetim kaydı bırakır."""
+    writer.enqueue([_explicit_entry(action, table_name, record_id, old_values, new_values)])
+
+def record_in_session(session, action, table_name, record_id, old_values=None, new_values=None):
+    """`record()` gibi, ancak kayıt oturumun işlemine bağlıdır: commit'te yazılır, rollback'te atılır."""
+    entry = _explicit_entry(action, table_name, record_id, old_values, new_values)
+    session.info.setdefault(_PENDING_KEY, []).append(entry)
+
+def record_inserts_in_session(session, model, rows):
+    """
+    Core INSERT ile eklenen satırlar için `record_in_session`. `rows`: [(id, kolon_değerleri)];
+    hariç tutulan kolonlar (ör. password_hash) kayda alınmaz.
+    """
+    for record_id, values in rows:
+        new_values = {"id": record_id}
+        new_values.update((key, _json_value(value)) for key, value in values.items() if key not in EXCLUDED_COLUMNS)
+        record_in_session(session, models.AuditActionEnum.INSERT, model.__tablename__, record_id, None, new_values)
+
+
+# --- Oturum olayları ---
+# Kayıtlar flush sırasında yakalanır (id'ler atanmış, değişiklik geçmişi henüz silinmemiştir),
+# yalnızca işlem commit edilirse kuyruğa eklenir.
+
+_PENDING_KEY = "audit_pending"
+
+@event.listens_for(Session, "after_flush")
+def _capture(session, flush_context):
+    entries = []
+    for obj in session.new:
+        if isinstance(obj, AUDITED_MODELS):
+            entries.append(_insert_entry(obj))
+    for obj in session.dirty:
+        if isinstance(obj, AUDITED_MODELS) and session.is_modified(obj, include_collections=False):
+            entry = _update_entry(obj)
+            if entry is not None:
+                entries.append(entry)
+    if entries:
+        session.info.setdefault(_PENDING_KEY, []).extend(entries)
+
+@event.listens_for(Session, "after_commit")
+def _enqueue(session):
+    entries = session.info.pop(_PENDING_KEY, None)
+    if entries:
+        writer.enqueue(entries)
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_PENDING_KEY, None)
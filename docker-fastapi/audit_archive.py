@@ -0,0 +1,448 @@
+# audit_archive.py
+
+# audit_logs için saklama (retention) ve arşiv.
+# audit_logs yalnızca eklemeyle büyür; AUDIT_RETENTION_MONTHS aydan eski kayıtlar ay ay
+# gzip'li NDJSON dosyalarına taşınır ve tablodan silinir:
+# - Ayın satırları `export.stream_export` ile sunucu tarafı imleçten okunup AUDIT_ARCHIVE_DIR
+#   altına `audit_logs-YYYY-MM.ndjson.gz` olarak yazılır (aynı ay yeniden arşivlenirse
+#   `-2`, `-3`, ... ekli yeni parça dosyası açılır).
+# - Dosya geri okunup satır sayısı doğrulanmadan ve `manifest.json`'a işlenmeden sıcak veri
+#   silinmez. MySQL'de ayın bölümü DROP PARTITION ile düşürülür; bölümlenmemiş tablolarda
+#   (SQLite, eski kurulumlar) satırlar AUDIT_ARCHIVE_DELETE_BATCH'lik gruplarla silinir.
+# - `ensure_partitions` gelecek AUDIT_PARTITION_MONTHS_AHEAD ay için bölümleri `pmax`'tan ayırır.
+#
+# `history` bir kaydın veya kullanıcının geçmişini en yeniden eskiye keyset sayfalamayla döndürür;
+# sıcak tablo ile arşiv dosyaları tek bir sıralamada birleştirilir. Arşiv parçaları manifest'teki
+# zaman aralıklarına göre seçilir; sayfa sıcak tablodan dolduysa dosyalara dokunulmaz. Her parçanın
+# yanında, içerdiği (tablo, record_id) ve user_id değerlerini tutan bir anahtar dosyası
+# (`<parça>.keys.json`) bulunur; aranan kaydı veya kullanıcıyı içermeyen parçalar açılmaz.
+#
+# Komut satırından kullanım (cron ile aylık):
+#   python -m app audit_archive archive --retention-months 6
+#   python -m app audit_archive partitions --months-ahead 3
+#   python -m app audit_archive index   # anahtar dosyası olmayan eski parçalar için
+
+import argparse
+import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+from sqlalchemy import and_, delete, func, or_, select, text
+from . import crud, export, metrics, models
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "./audit_archive")
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "6"))
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+AUDIT_ARCHIVE_DELETE_BATCH = int(os.getenv("AUDIT_ARCHIVE_DELETE_BATCH", "5000"))
+
+MANIFEST = "manifest.json"
+
+ROWS_ARCHIVED = metrics.Counter("audit_rows_archived_total", "Arşiv dosyalarına taşınan denetim kaydı sayısı.")
+ARCHIVE_READS = metrics.Counter(
+    "audit_archive_reads_total", "Geçmiş sorgularında okunan arşiv dosyası sayısı."
+)
+ARCHIVE_SKIPS = metrics.Counter(
+    "audit_archive_skips_total", "Anahtar dosyasına göre açılmadan atlanan arşiv dosyası sayısı."
+)
+
+_manifest_lock = threading.Lock()
+
+
+class ArchiveError(Exception):
+    """Arşiv dosyası doğrulanamadı; sıcak veri silinmedi."""
+
+
+# --- Ay yardımcıları ---
+
+def month_start(value):
+    """Verilen zamanın ayının ilk günü (saat dilimi bilgisi atılmış, UTC)."""
+    value = _naive(value)
+    return datetime.datetime(value.year, value.month, 1)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.datetime(index // 12, index % 12 + 1, 1)
+
+def month_key(month):
+    return f"{month.year:04d}-{month.month:02d}"
+
+def partition_name(month):
+    return f"p{month.year:04d}{month.month:02d}"
+
+def _naive(value):
+    # Sıcak tablodan (sürücüye göre) ve arşivden gelen zamanlar UTC'ye çevrilip saat dilimsiz karşılaştırılır.
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# --- Manifest ---
+
+def _manifest_path(directory):
+    return os.path.join(directory, MANIFEST)
+
+def load_manifest(directory=AUDIT_ARCHIVE_DIR):
+    """{"months": {"YYYY-MM": [parça, ...]}}; arşiv yoksa boş manifest."""
+    try:
+        with open(_manifest_path(directory), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"months": {}}
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _add_to_manifest(directory, key, part):
+    with _manifest_lock:
+        manifest = load_manifest(directory)
+        manifest["months"].setdefault(key, []).append(part)
+        _write_json(_manifest_path(directory), manifest)
+
+
+# --- Parça anahtar dosyaları ---
+
+def _keys_name(part_name):
+    return part_name[:-len(".ndjson.gz")] + ".keys.json"
+
+def _scan_part(path):
+    """Parçanın satır sayısını ve anahtarlarını döndürür: (rows, {"records": {tablo: [id]}, "users": [id]})."""
+    rows, records, users = 0, {}, set()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            rows += 1
+            if row["record_id"] is not None:
+                records.setdefault(row["table_name"], set()).add(row["record_id"])
+            if row["user_id"] is not None:
+                users.add(row["user_id"])
+    return rows, {"records": {t: sorted(ids) for t, ids in records.items()}, "users": sorted(users)}
+
+_keys_cache = {}
+
+def _load_keys(directory, name):
+    # Parçalar değişmez; anahtar kümeleri süreç boyunca önbellekte tutulur.
+    path = os.path.join(directory, name)
+    keys = _keys_cache.get(path)
+    if keys is None:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        keys = _keys_cache[path] = (
+            {t: frozenset(ids) for t, ids in data["records"].items()}, frozenset(data["users"]),
+        )
+    return keys
+
+def _may_match(directory, part, table_name, record_id, user_id):
+    """Parça aranan kayıtları içerebilir mi? Anahtar dosyası olmayan parçalar her zaman okunur."""
+    if part.get("keys") is None or (table_name is None and record_id is None and user_id is None):
+        return True
+    records, users = _load_keys(directory, part["keys"])
+    if user_id is not None and user_id not in users:
+        return False
+    if record_id is not None:
+        tables = records.values() if table_name is None else [records.get(table_name, ())]
+        return any(record_id in ids for ids in tables)
+    return table_name is None or table_name in records
+
+def index_parts(directory=AUDIT_ARCHIVE_DIR):
+    """Anahtar dosyası olmayan parçalar için anahtar dosyalarını yazar; yazılan parça sayısını döndürür."""
+    with _manifest_lock:
+        manifest = load_manifest(directory)
+        missing = [part for parts in manifest["months"].values() for part in parts if part.get("keys") is None]
+        for part in missing:
+            _, keys = _scan_part(os.path.join(directory, part["file"]))
+            part["keys"] = _keys_name(part["file"])
+            _write_json(os.path.join(directory, part["keys"]), keys)
+        if missing:
+            _write_json(_manifest_path(directory), manifest)
+    return len(missing)
+
+
+# --- Arşivleme ---
+
+def _is_partitioned(conn):
+    if conn.dialect.name != "mysql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs' AND PARTITION_NAME IS NOT NULL"
+    )).scalar())
+
+def _partition_names(conn):
+    return set(conn.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs' AND PARTITION_NAME IS NOT NULL"
+    )).scalars())
+
+def _delete_hot_rows(conn, start, end, rows, max_id):
+    """
+    Arşivlenen satırları siler. Arşivlemeden sonra aya eklenmiş satırlar silinmez: bölüm ancak
+    satır sayısı değişmediyse düşürülür, aksi halde yalnızca id'si `max_id`'yi aşmayanlar silinir.
+    """
+    table = models.AuditLog.__table__
+    in_month = and_(table.c.action_timestamp >= start, table.c.action_timestamp < end)
+    if _is_partitioned(conn) and partition_name(start) in _partition_names(conn):
+        if conn.execute(select(func.count()).where(in_month)).scalar() == rows:
+            conn.execute(text(f"ALTER TABLE audit_logs DROP PARTITION `{partition_name(start)}`"))
+            return
+    while True:
+        ids = conn.execute(
+            select(table.c.id).where(in_month, table.c.id <= max_id)
+            .order_by(table.c.id).limit(AUDIT_ARCHIVE_DELETE_BATCH)
+        ).scalars().all()
+        if not ids:
+            return
+        conn.execute(delete(table).where(table.c.id.in_(ids)))
+        conn.commit()
+
+def archive_month(month, bind=engine, directory=AUDIT_ARCHIVE_DIR):
+    """
+    Ayın sıcak satırlarını bir arşiv parçasına taşır ve manifest'e eklenen parçayı döndürür;
+    ayda arşivlenecek satır yoksa None. Yazılan dosya doğrulanamazsa (ör. ölçüm sırasında aya
+    yeni satır eklendiyse) dosya silinir, ArchiveError fırlatılır ve sıcak veri olduğu gibi kalır.
+    Yeniden çalıştırılabilir: ayın manifest'teki parçalarının kapsadığı satırlar (id'si parçaların
+    en büyük `max_id`'sini aşmayanlar) yeniden arşivlenmez; önceki çalıştırma bunları silemeden
+    kaldıysa (silme hatası, çökme) yalnızca silme tamamlanır.
+    """
+    start, end = month_start(month), add_months(month_start(month), 1)
+    key = month_key(start)
+    table = models.AuditLog.__table__
+    in_month = and_(table.c.action_timestamp >= start, table.c.action_timestamp < end)
+    existing_parts = load_manifest(directory)["months"].get(key, [])
+    archived_max_id = max((part["max_id"] for part in existing_parts), default=None)
+    if archived_max_id is not None:
+        with bind.connect() as conn:
+            leftover = conn.execute(
+                select(func.count()).where(in_month, table.c.id <= archived_max_id)
+            ).scalar()
+            if leftover:
+                logger.warning("audit_logs %s: arşivlenmiş %d satır silinmemiş; silme tamamlanıyor.", key, leftover)
+                _delete_hot_rows(conn, start, end, leftover, archived_max_id)
+                conn.commit()
+        in_month = and_(in_month, table.c.id > archived_max_id)
+    with bind.connect() as conn:
+        stats = conn.execute(
+            select(func.count(), func.min(table.c.id), func.max(table.c.id),
+                   func.min(table.c.action_timestamp), func.max(table.c.action_timestamp))
+            .where(in_month)
+        ).one()
+    rows, min_id, max_id, min_ts, max_ts = stats
+    if not rows:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    existing = {part["file"] for part in existing_parts}
+    name, number = f"audit_logs-{key}.ndjson.gz", 1
+    while name in existing or os.path.exists(os.path.join(directory, name)):
+        number += 1
+        name = f"audit_logs-{key}-{number}.ndjson.gz"
+    path = os.path.join(directory, name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in export.stream_export("audit_logs", "ndjson", gzip=True, since=start, until=end,
+                                          after_id=archived_max_id, bind=bind):
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    # Doğrulama okuması anahtar dosyasını da üretir; ek bir sorgu gerekmez.
+    written, keys = _scan_part(tmp_path)
+    if written != rows:
+        os.remove(tmp_path)
+        raise ArchiveError(f"{key}: {rows} satır bekleniyordu, {written} yazıldı; ay daha sonra yeniden arşivlenmeli.")
+    os.replace(tmp_path, path)
+    _write_json(os.path.join(directory, _keys_name(name)), keys)
+
+    part = {
+        "file": name,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "min_id": min_id,
+        "max_id": max_id,
+        "min_timestamp": _naive(min_ts).isoformat(),
+        "max_timestamp": _naive(max_ts).isoformat(),
+        "keys": _keys_name(name),
+        "archived_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+    _add_to_manifest(directory, key, part)
+    with bind.connect() as conn:
+        _delete_hot_rows(conn, start, end, rows, max_id)
+        conn.commit()
+    ROWS_ARCHIVED.inc(rows)
+    logger.info("audit_logs %s arşivlendi: %d satır -> %s", key, rows, name)
+    return part
+
+def archive(retention_months=AUDIT_RETENTION_MONTHS, bind=engine, directory=AUDIT_ARCHIVE_DIR, now=None):
+    """
+    Son `retention_months` aydan (içinde bulunulan ay dahil) eski tüm ayları arşivler ve
+    arşivlenen parçaları döndürür.
+    """
+    cutoff = add_months(month_start(now or datetime.datetime.now(datetime.timezone.utc)), -(retention_months - 1))
+    table = models.AuditLog.__table__
+    with bind.connect() as conn:
+        oldest = conn.execute(
+            select(func.min(table.c.action_timestamp)).where(table.c.action_timestamp < cutoff)
+        ).scalar()
+    parts = []
+    month = month_start(oldest) if oldest is not None else cutoff
+    while month < cutoff:
+        part = archive_month(month, bind=bind, directory=directory)
+        if part is not None:
+            parts.append(part)
+        month = add_months(month, 1)
+    return parts
+
+def ensure_partitions(months_ahead=AUDIT_PARTITION_MONTHS_AHEAD, bind=engine, now=None):
+    """
+    MySQL'de içinde bulunulan ay ve sonraki `months_ahead` ay için eksik bölümleri `pmax`'tan
+    ayırır ve eklenen bölüm adlarını döndürür. Tablo bölümlenmemişse hiçbir şey yapmaz.
+    """
+    with bind.connect() as conn:
+        if not _is_partitioned(conn):
+            return []
+        existing = _partition_names(conn)
+        current = month_start(now or datetime.datetime.now(datetime.timezone.utc))
+        missing = [add_months(current, i) for i in range(months_ahead + 1)
+                   if partition_name(add_months(current, i)) not in existing]
+        if not missing:
+            return []
+        definitions = ", ".join(
+            f"PARTITION `{partition_name(month)}` VALUES LESS THAN "
+            f"(UNIX_TIMESTAMP('{add_months(month, 1):%Y-%m-%d %H:%M:%S}'))"
+            for month in missing
+        )
+        conn.execute(text(
+            f"ALTER TABLE audit_logs REORGANIZE PARTITION `pmax` INTO "
+            f"({definitions}, PARTITION `pmax` VALUES LESS THAN MAXVALUE)"
+        ))
+        conn.commit()
+    return [partition_name(month) for month in missing]
+
+
+# --- Geçmiş sorgusu ---
+
+def _entry(row, archived):
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "action": row["action"].value if isinstance(row["action"], models.AuditActionEnum) else row["action"],
+        "table_name": row["table_name"],
+        "record_id": row["record_id"],
+        "old_values": row["old_values"],
+        "new_values": row["new_values"],
+        "action_timestamp": _naive(row["action_timestamp"]),
+        "archived": archived,
+    }
+
+def _sort_key(entry):
+    return entry["action_timestamp"], entry["id"]
+
+def _matches(entry, table_name, record_id, user_id, before):
+    return ((table_name is None or entry["table_name"] == table_name)
+            and (record_id is None or entry["record_id"] == record_id)
+            and (user_id is None or entry["user_id"] == user_id)
+            and (before is None or _sort_key(entry) < before))
+
+def _read_part(path, table_name, record_id, user_id, before):
+    ARCHIVE_READS.inc()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            row["action_timestamp"] = datetime.datetime.fromisoformat(row["action_timestamp"])
+            entry = _entry(row, archived=True)
+            if _matches(entry, table_name, record_id, user_id, before):
+                yield entry
+
+def history(db, table_name=None, record_id=None, user_id=None, cursor=None, limit=100,
+            directory=AUDIT_ARCHIVE_DIR):
+    """
+    Denetim kayıtlarını en yeniden eskiye, sıcak tablo ve arşiv birlikte olmak üzere getirir:
+    (kayıtlar, next_cursor). Kayıtlar sözlüktür; arşivden gelenlerde `archived` True olur.
+    Sıcak sorgu ix_audit_logs_record / ix_audit_logs_user indeksleri üzerinde aralık taramasıdır.
+    Cursor bozuksa `ValueError` fırlatır.
+    """
+    before = None
+    if cursor:
+        created_at, last_id = crud.decode_cursor(cursor)
+        before = (_naive(created_at), last_id)
+
+    AuditLog = models.AuditLog
+    stmt = select(AuditLog.__table__)
+    if table_name is not None:
+        stmt = stmt.where(AuditLog.table_name == table_name)
+    if record_id is not None:
+        stmt = stmt.where(AuditLog.record_id == record_id)
+    if user_id is not None:
+        stmt = stmt.where(AuditLog.user_id == user_id)
+    if before is not None:
+        stmt = stmt.where(or_(
+            AuditLog.action_timestamp < before[0],
+            and_(AuditLog.action_timestamp == before[0], AuditLog.id < before[1]),
+        ))
+    stmt = stmt.order_by(AuditLog.action_timestamp.desc(), AuditLog.id.desc()).limit(limit + 1)
+    entries = [_entry(row, archived=False) for row in db.execute(stmt).mappings()]
+
+    # Arşiv parçaları en yeni kayıtlarına göre yeniden eskiye okunur; sayfa dolduktan sonra,
+    # tamamı sayfanın en eski kaydından eski olan ilk parçada durulur. Anahtar dosyasına göre
+    # aranan kaydı/kullanıcıyı içermeyen parçalar açılmaz.
+    parts = [
+        (datetime.datetime.fromisoformat(part["min_timestamp"]),
+         datetime.datetime.fromisoformat(part["max_timestamp"]), part)
+        for month_parts in load_manifest(directory)["months"].values() for part in month_parts
+    ]
+    for min_ts, max_ts, part in sorted(parts, key=lambda part: part[1], reverse=True):
+        if before is not None and min_ts > before[0]:
+            continue
+        if len(entries) > limit and max_ts < entries[limit]["action_timestamp"]:
+            break
+        if not _may_match(directory, part, table_name, record_id, user_id):
+            ARCHIVE_SKIPS.inc()
+            continue
+        entries.extend(_read_part(os.path.join(directory, part["file"]), table_name, record_id, user_id, before))
+        entries = sorted(entries, key=_sort_key, reverse=True)[:limit + 1]
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = crud.encode_cursor(entries[-1]["action_timestamp"], entries[-1]["id"])
+    return entries, next_cursor
+
+
+def _parse_datetime(value):
+    return datetime.datetime.fromisoformat(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="audit_logs bölümlerini yönetir ve eski ayları arşivler.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive_parser = commands.add_parser("archive", help="Saklama süresinden eski ayları arşivler.")
+    archive_parser.add_argument("--retention-months", type=int, default=AUDIT_RETENTION_MONTHS)
+    archive_parser.add_argument("--directory", default=AUDIT_ARCHIVE_DIR)
+    archive_parser.add_argument("--now", type=_parse_datetime, help="Varsayılan: şu an (UTC).")
+    partitions_parser = commands.add_parser("partitions", help="Gelecek aylar için bölümleri açar (MySQL).")
+    partitions_parser.add_argument("--months-ahead", type=int, default=AUDIT_PARTITION_MONTHS_AHEAD)
+    index_parser = commands.add_parser("index", help="Eski parçalar için anahtar dosyalarını yazar.")
+    index_parser.add_argument("--directory", default=AUDIT_ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "archive":
+        parts = archive(args.retention_months, directory=args.directory, now=args.now)
+        for part in parts:
+            print(f"{part['file']}: {part['rows']} satır, {part['bytes']} bayt")
+        print(f"{len(parts)} ay arşivlendi.")
+    elif args.command == "index":
+        print(f"{index_parts(args.directory)} parça için anahtar dosyası yazıldı.")
+    else:
+        added = ensure_partitions(args.months_ahead)
+        print(f"Eklenen bölümler: {', '.join(added) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
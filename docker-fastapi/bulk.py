@@ -0,0 +1,133 @@
+# bulk.py
+
+# Toplu içe aktarma (bulk ingestion) endpoint'leri için akış (stream) ayrıştırıcıları.
+# İstek gövdesi belleğe tek seferde okunmaz; parça parça gelen baytlardan kayıtlar çıkarılır
+# ve BULK_CHUNK_SIZE'lık gruplar halinde veritabanına yazılır.
+#
+# Desteklenen gövde biçimleri:
+# - NDJSON: her satırda bir JSON nesnesi. Bozuk bir satır yalnızca o kaydı etkiler.
+# - JSON dizisi: `[{...}, {...}]`. Sözdizimi hatası dizinin geri kalanını okunamaz kıldığından
+#   isteğin tamamı `ValueError` ile reddedilir.
+#
+# Parçalar arasında bölünen kayıt tamponda bekletilir; tamamlanmamış tek bir kayıt
+# BULK_MAX_RECORD_BYTES'ı aşarsa gövde reddedilir (bellek sınırsız büyümez).
+
+import codecs
+import json
+import os
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+BULK_MAX_RECORD_BYTES = int(os.getenv("BULK_MAX_RECORD_BYTES", str(1024 * 1024)))
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+# Tamponun sonunda yarım kalmış bir değişmezin (true, -Infinity, 1.5e- ...) içeremeyeceği karakterler.
+_DELIMITERS = set(_WHITESPACE + ',:[]{}"')
+_LONGEST_TOKEN = len("-Infinity")
+
+
+class RecordError:
+    """Ayrıştırılamayan tek bir kaydı temsil eder."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+
+
+async def iter_records(byte_stream):
+    """
+    Baytları parça parça veren bir async iterator'dan (ör. `request.stream()`) JSON nesnelerini
+    çıkarır. Her eleman için (sıra_no, nesne_veya_RecordError) verir.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    mode = None  # "array" | "ndjson"
+    index = 0
+    finished = False
+
+    async for chunk in byte_stream:
+        buffer += text_decoder.decode(chunk)
+        if mode is None:
+            stripped = buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                continue
+            mode = "array" if stripped[0] == "[" else "ndjson"
+            buffer = stripped[1:] if mode == "array" else stripped
+        if mode == "ndjson":
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_line(line)
+                    index += 1
+            _check_record_size(buffer)
+        elif not finished:
+            records, buffer, finished = _drain_array(buffer, final=False)
+            for record in records:
+                yield index, record
+                index += 1
+            _check_record_size(buffer)
+
+    buffer += text_decoder.decode(b"", final=True)
+    if mode == "ndjson":
+        if buffer.strip():
+            yield index, _parse_line(buffer)
+    elif mode == "array" and not finished:
+        records, buffer, finished = _drain_array(buffer, final=True)
+        for record in records:
+            yield index, record
+            index += 1
+        if not finished:
+            raise ValueError("JSON dizisi kapatılmamış.")
+
+
+def _parse_line(line: str):
+    try:
+        value = json.loads(line)
+    except ValueError as exc:
+        return RecordError(f"Geçersiz JSON: {exc}")
+    if not isinstance(value, dict):
+        return RecordError("Her kayıt bir JSON nesnesi olmalıdır.")
+    return value
+
+
+def _check_record_size(pending: str):
+    if len(pending) > BULK_MAX_RECORD_BYTES:
+        raise ValueError(f"Kayıt {BULK_MAX_RECORD_BYTES} baytı aşıyor.")
+
+
+def _is_incomplete(buffer: str, exc: json.JSONDecodeError) -> bool:
+    """
+    Ayrıştırma hatası yalnızca tamponun sonunda kesilmiş bir değerden kaynaklanıyorsa True döner:
+    hata tamponun sonunda, kapanmamış bir dizgide ya da sonda yarım kalmış bir değişmezdedir.
+    Aksi halde hata sonraki baytlardan bağımsızdır.
+    """
+    if exc.msg.startswith("Unterminated string"):
+        return True
+    tail = buffer[exc.pos:]
+    return len(tail) <= _LONGEST_TOKEN and not _DELIMITERS.intersection(tail)
+
+
+def _drain_array(buffer: str, final: bool):
+    """
+    Tampondaki tamamlanmış dizi elemanlarını ayrıştırır.
+    Geriye (kayıtlar, kalan_tampon, dizi_bitti_mi) döner.
+    """
+    records = []
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE + ",":
+            pos += 1
+        if pos >= len(buffer):
+            return records, "", False
+        if buffer[pos] == "]":
+            return records, "", True
+        if buffer[pos] != "{":
+            raise ValueError("Her kayıt bir JSON nesnesi olmalıdır.")
+        try:
+            value, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as exc:
+            if final or not _is_incomplete(buffer, exc):
+                raise ValueError(f"Geçersiz JSON dizisi: {exc}") from exc
+            # Nesne henüz tamamlanmamış; daha fazla veri bekle.
+            return records, buffer[pos:], False
+        records.append(value)
+        pos = end
@@ -0,0 +1,211 @@
+# events.py
+
+# Anlık bildirimler (WebSocket) için yayın/abone dağıtıcısı.
+# Yeni teklifleri bekleyen müşteri ve yeni işleri bekleyen sağlayıcı, GET /jobs/{job_id} veya
+# GET /jobs/open'ı birkaç saniyede bir yoklamak yerine bir konuya abone olur; yazma işlemi
+# commit edildikten sonra olay bir kez JSON'a çevrilip o konunun tüm abonelerine iletilir.
+# Bağlı izleyici sayısı veritabanı yükünü değiştirmez.
+#
+# Konular:
+# - `job:<job_id>`: işe gelen teklifler ve teklifin kabulü (offer.created, offer.accepted).
+# - `area:<service_id>:<district_id>`: bölgede açılan ve atanan işler (job.created, job.assigned).
+#
+# Yayınlama thread güvenlidir: senkron endpoint'ler thread havuzunda çalıştığından olay,
+# abonenin olay döngüsüne `call_soon_threadsafe` ile aktarılır. Her abonenin kuyruğu
+# EVENTS_QUEUE_SIZE ile sınırlıdır; yetişemeyen abone kuyruğu taşınca bağlantısı kapatılır ve
+# istemci yeniden bağlanıp güncel durumu bir kez okur.
+#
+# Arka uç (backend):
+# - Tanımsız: olaylar yalnızca aynı süreçteki abonelere iletilir (tek worker).
+# - EVENTS_REDIS_URL: olaylar Redis pub/sub üzerinden tüm worker'lara dağıtılır; her worker
+#   yalnızca kendi abonelerine iletir. `redis` paketinin kurulu olması gerekir.
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from . import metrics
+
+try:
+    import redis
+except ImportError:  # isteğe bağlı bağımlılık
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL")
+EVENTS_REDIS_CHANNEL_PREFIX = os.getenv("EVENTS_REDIS_CHANNEL_PREFIX", "events:")
+
+EVENTS_PUBLISHED = metrics.Counter("events_published_total", "Yayınlanan olay sayısı.", ["type"])
+EVENTS_DELIVERED = metrics.Counter("events_delivered_total", "Abonelere iletilen olay sayısı.")
+SUBSCRIBERS_DROPPED = metrics.Counter(
+    "events_subscribers_dropped_total", "Kuyruğu taştığı için bağlantısı kapatılan abone sayısı."
+)
+
+
+def job_topic(job_id):
+    return f"job:{job_id}"
+
+def area_topic(service_id, district_id):
+    return f"area:{service_id}:{district_id}"
+
+
+class Subscription:
+    """Bir aboneliğin kuyruğu. Olaylar, aboneliği oluşturan olay döngüsünde kuyruğa eklenir."""
+
+    def __init__(self, topics, loop, maxsize=EVENTS_QUEUE_SIZE):
+        self.topics = tuple(dict.fromkeys(topics))
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _deliver(self, payload):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Bekleyen olaylar atılır ve yerine kapanış işareti (None) konur.
+            self.overflowed = True
+            SUBSCRIBERS_DROPPED.inc()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        EVENTS_DELIVERED.inc()
+
+    async def get(self):
+        """Sıradaki olayın JSON metni; abonelik taşmışsa None."""
+        return await self.queue.get()
+
+
+def _deliver_all(subscriptions, payload):
+    for subscription in subscriptions:
+        subscription._deliver(payload)
+
+
+class LocalBackend:
+    """Olayları yalnızca bu sürecin abonelerine iletir."""
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, topic, payload):
+        self._deliver(topic, payload)
+
+    def stop(self):
+        pass
+
+
+class RedisBackend:
+    """
+    Olayları Redis kanallarına yayınlar; arka plandaki bir thread tüm kanalları dinleyip gelen
+    olayları bu sürecin abonelerine iletir (her worker kendi yayınladığı olayı da buradan alır).
+    """
+
+    def __init__(self, url, prefix=EVENTS_REDIS_CHANNEL_PREFIX):
+        if redis is None:
+            raise RuntimeError("EVENTS_REDIS_URL için `redis` paketi kurulu olmalıdır.")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._pubsub = None
+        self._thread = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{self.prefix + "*": self._on_message})
+        self._thread = self._pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True,
+            exception_handler=lambda exc, pubsub, thread: logger.error("Redis olay aboneliği hatası: %s", exc),
+        )
+
+    def _on_message(self, message):
+        channel = message["channel"].decode("utf-8")
+        self._deliver(channel[len(self.prefix):], message["data"].decode("utf-8"))
+
+    def publish(self, topic, payload):
+        self.client.publish(self.prefix + topic, payload)
+
+    def stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+
+class Broker:
+    """Konu -> abonelik eşlemesini tutan süreç içi dağıtıcı."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalBackend()
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._started = False
+        metrics.Gauge("events_subscriptions", "Bağlı abonelik sayısı.", self.subscription_count)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.backend.start(self._dispatch)
+
+    def stop(self):
+        with self._lock:
+            started, self._started = self._started, False
+        if started:
+            self.backend.stop()
+
+    def subscription_count(self):
+        with self._lock:
+            return len({id(s) for subscriptions in self._subscriptions.values() for s in subscriptions})
+
+    def subscribe(self, topics):
+        """Çalışan olay döngüsü için bir abonelik oluşturur; iş bitince `unsubscribe` çağrılmalıdır."""
+        subscription = Subscription(topics, asyncio.get_running_loop())
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscriptions = self._subscriptions.get(topic)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._subscriptions[topic]
+
+    def publish(self, topic, event):
+        """Olayı konunun abonelerine gönderir. Herhangi bir thread'den çağrılabilir."""
+        if not self._started:
+            self.start()
+        EVENTS_PUBLISHED.inc(type=event.get("type", ""))
+        try:
+            self.backend.publish(topic, json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+        except Exception:
+            # Bildirim yazma işleminin parçası değildir; iletilemezse istemci yeniden bağlanınca
+            # güncel durumu okur.
+            logger.exception("Olay yayınlanamadı (%s).", topic)
+
+    def _dispatch(self, topic, payload):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(topic, ()))
+        # Aynı olay döngüsündeki aboneler tek bir geri çağrıyla beslenir.
+        by_loop = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, group, payload)
+            except RuntimeError:  # olay döngüsü kapanmış
+                pass
+
+
+broker = Broker(RedisBackend(EVENTS_REDIS_URL) if EVENTS_REDIS_URL else None)
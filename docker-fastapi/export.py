@@ -0,0 +1,168 @@
+# export.py
+
+# jobs, offers ve audit_logs tablolarının tam dökümü (admin ve BI hattı için).
+# Satırlar ORM nesnesine veya Pydantic modeline çevrilmeden sunucu tarafı imleçten
+# (`stream_results` + `yield_per`) EXPORT_BATCH_SIZE'lık gruplar halinde okunur ve doğrudan
+# NDJSON veya CSV baytlarına kodlanır; bellek kullanımı tablo boyutundan bağımsızdır.
+#
+# - Filtreler: zaman aralığı (`since` dahil, `until` hariç) ve durum (audit_logs için işlem türü).
+# - Devam ettirme: satırlar id sırasıyla üretilir; yarıda kalan bir döküm, alınan son satırın
+#   id'si `after_id` olarak verilerek kaldığı yerden sürdürülür.
+# - `gzip=True` ise çıktı akış sırasında sıkıştırılır.
+#
+# Komut satırından kullanım:
+#   python -m app export jobs --format csv --status open --since 2025-01-01 --gzip -o jobs.csv.gz
+
+import argparse
+import csv
+import datetime
+import decimal
+import enum
+import io
+import json
+import os
+import sys
+import zlib
+from sqlalchemy import select
+from . import models
+from .database import engine
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# tablo adı -> (tablo, zaman kolonu, durum kolonu, durum enum'u)
+TABLES = {
+    "jobs": (models.Job.__table__, "created_at", "status", models.JobStatusEnum),
+    "offers": (models.Offer.__table__, "created_at", "status", models.OfferStatusEnum),
+    "audit_logs": (models.AuditLog.__table__, "action_timestamp", "action", models.AuditActionEnum),
+}
+
+
+def build_query(table_name, since=None, until=None, status=None, after_id=None):
+    """Filtrelenmiş, id sırasına göre dizilmiş SELECT. Geçersiz tablo veya durum için ValueError."""
+    if table_name not in TABLES:
+        raise ValueError(f"Desteklenmeyen tablo: {table_name}")
+    table, time_column, status_column, status_enum = TABLES[table_name]
+    stmt = select(table).order_by(table.c.id)
+    if since is not None:
+        stmt = stmt.where(table.c[time_column] >= since)
+    if until is not None:
+        stmt = stmt.where(table.c[time_column] < until)
+    if status is not None:
+        try:
+            stmt = stmt.where(table.c[status_column] == status_enum(status))
+        except ValueError:
+            allowed = ", ".join(e.value for e in status_enum)
+            raise ValueError(f"Geçersiz durum: {status} (geçerli değerler: {allowed})") from None
+    if after_id is not None:
+        stmt = stmt.where(table.c.id > after_id)
+    return stmt
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def _ndjson_chunks(columns, batches):
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+def _csv_value(value):
+    value = _plain(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip başlığıyla
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(table_name, fmt="ndjson", gzip=False, since=None, until=None, status=None,
+                  after_id=None, bind=engine, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Dökümü bayt parçaları halinde üreten generator. Filtreler, üretici ilk kez
+    çalıştırılmadan önce doğrulanır (hatalı girişte hemen ValueError).
+    Bağlantı generator'ın kendisine aittir; istek kapsamındaki oturumdan bağımsızdır.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Desteklenmeyen biçim: {fmt}")
+    stmt = build_query(table_name, since=since, until=until, status=status, after_id=after_id)
+    columns = [c.name for c in stmt.selected_columns]
+
+    def batches():
+        with bind.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+            for rows in result.partitions():
+                yield rows
+
+    chunks = (_ndjson_chunks if fmt == "ndjson" else _csv_chunks)(columns, batches())
+    return _gzip_chunks(chunks) if gzip else chunks
+
+
+def filename(table_name, fmt, gzip=False):
+    return f"{table_name}.{fmt}" + (".gz" if gzip else "")
+
+
+def _parse_datetime(value):
+    return datetime.datetime.fromisoformat(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="jobs, offers veya audit_logs tablosunu dışa aktarır.")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--since", type=_parse_datetime)
+    parser.add_argument("--until", type=_parse_datetime)
+    parser.add_argument("--status")
+    parser.add_argument("--after-id", type=int)
+    parser.add_argument("-o", "--output", help="Çıktı dosyası (verilmezse standart çıktı).")
+    args = parser.parse_args(argv)
+
+    try:
+        chunks = stream_export(
+            args.table, args.format, args.gzip,
+            since=args.since, until=args.until, status=args.status, after_id=args.after_id,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
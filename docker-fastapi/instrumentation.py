@@ -0,0 +1,226 @@
+# instrumentation.py
+
+# İstek düzeyinde performans ölçümü.
+# - `http_middleware`: her istek için rota bazında gecikme, veritabanında geçen süre, çalıştırılan
+#   SQL ifadesi sayısı ve havuz bekleme süresini metriklere yazar.
+# - `instrument_engine`: motora before/after_cursor_execute olaylarını bağlar; her ifadenin süresi
+#   o anda işlenen isteğe (bağlam değişkeni üzerinden) eklenir.
+# - Yavaş sorgu günlüğü: SLOW_QUERY_THRESHOLD_MS üzerindeki ifadeler, normalleştirilmiş SQL ve
+#   isteğin geldiği rota ile `slow_query` logger'ına yazılır.
+# - Profil örnekleme: PROFILE_THRESHOLD_MS tanımlıysa isteklerin PROFILE_SAMPLE_RATE oranındaki
+#   kısmı pyinstrument ile profillenir; eşiği aşanların profili PROFILE_DIR altına
+#   `pyinstrument --load <dosya>` ile açılabilecek şekilde kaydedilir. pyinstrument kurulu
+#   değilse profil örnekleme devre dışı kalır.
+#
+# Arka plan thread'lerinde (ör. denetim kaydı yazıcısı) çalışan ifadeler yalnızca genel
+# ifade süresi histogramına yansır; bir isteğe atfedilmez.
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import time
+from fastapi import Request
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from . import metrics
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # isteğe bağlı bağımlılık
+    Profiler = None
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+# Boş değer (.env.example'daki gibi `PROFILE_THRESHOLD_MS=`) profillemeyi kapatır.
+PROFILE_THRESHOLD_MS = float(os.getenv("PROFILE_THRESHOLD_MS")) if os.getenv("PROFILE_THRESHOLD_MS") else None
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+
+slow_query_log = logging.getLogger("slow_query")
+logger = logging.getLogger(__name__)
+
+_STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+REQUEST_DURATION = metrics.Histogram(
+    "http_request_duration_seconds", "Rota bazında istek süresi.", ["method", "route"],
+)
+REQUESTS = metrics.Counter("http_requests_total", "Rota ve durum koduna göre istek sayısı.", ["method", "route", "status"])
+REQUEST_DB_TIME = metrics.Histogram(
+    "http_request_db_seconds", "Bir isteğin SQL ifadelerinde geçirdiği toplam süre.", ["method", "route"],
+)
+REQUEST_STATEMENTS = metrics.Histogram(
+    "http_request_db_statements", "Bir istekte çalıştırılan SQL ifadesi sayısı.", ["method", "route"],
+    buckets=_STATEMENT_BUCKETS,
+)
+REQUEST_POOL_WAIT = metrics.Histogram(
+    "http_request_pool_wait_seconds", "Bir isteğin havuzdan bağlantı beklerken geçirdiği toplam süre.", ["method", "route"],
+)
+STATEMENT_DURATION = metrics.Histogram("db_statement_duration_seconds", "Tek bir SQL ifadesinin süresi.")
+SLOW_QUERIES = metrics.Counter("db_slow_queries_total", "Yavaş sorgu eşiğini aşan SQL ifadesi sayısı.", ["route"])
+PROFILES_SAVED = metrics.Counter("http_request_profiles_saved_total", "Kaydedilen istek profili sayısı.", ["route"])
+
+
+class RequestStats:
+    """Tek bir isteğin ölçümleri; istek boyunca bağlam değişkeninde taşınır."""
+    __slots__ = ("method", "route", "db_time", "statements", "pool_wait")
+
+    def __init__(self, method, route):
+        self.method = method
+        self.route = route
+        self.db_time = 0.0
+        self.statements = 0
+        self.pool_wait = 0.0
+
+
+current_request = contextvars.ContextVar("current_request", default=None)
+
+
+def _route_label(request: Request):
+    # Yol şablonu (/jobs/{job_id}) kullanılır; gerçek yol etiket sayısını sınırsız büyütür.
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def http_middleware(request: Request, call_next):
+    stats = RequestStats(request.method, "unmatched")
+    token = current_request.set(stats)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        current_request.reset(token)
+        route = _route_label(request)
+        labels = {"method": request.method, "route": route}
+        REQUEST_DURATION.observe(elapsed, **labels)
+        REQUESTS.inc(status=status_code, **labels)
+        REQUEST_DB_TIME.observe(stats.db_time, **labels)
+        REQUEST_STATEMENTS.observe(stats.statements, **labels)
+        REQUEST_POOL_WAIT.observe(stats.pool_wait, **labels)
+
+
+def record_pool_wait(seconds):
+    """`database.TimedQueuePool` tarafından çağrılır; bekleme süresini o anki isteğe ekler."""
+    stats = current_request.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+
+# --- SQL ifadesi ölçümü ve yavaş sorgu günlüğü ---
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """Değişmezleri ve IN listelerinin uzunluğunu atarak aynı biçimdeki sorguları tek satırda toplar."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def instrument_engine(engine):
+    """Motora ifade süresi ölçen before/after_cursor_execute olaylarını bağlar."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        STATEMENT_DURATION.observe(elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.db_time += elapsed
+            stats.statements += 1
+        if elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+            route = stats.route if stats is not None else "background"
+            SLOW_QUERIES.inc(route=route)
+            slow_query_log.warning(json.dumps({
+                "duration_ms": round(elapsed * 1000, 2),
+                "method": stats.method if stats is not None else None,
+                "route": route,
+                "executemany": executemany,
+                "sql": normalize_sql(statement),
+            }, ensure_ascii=False))
+
+
+# --- Profil örnekleme ---
+
+def _should_profile():
+    return Profiler is not None and PROFILE_THRESHOLD_MS is not None and random.random() < PROFILE_SAMPLE_RATE
+
+def _save_profile(profiler, route, elapsed):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = "%d-%s-%dms.pyisession" % (time.time() * 1000, re.sub(r"[^\w]+", "_", route).strip("_"), elapsed * 1000)
+    try:
+        profiler.last_session.save(os.path.join(PROFILE_DIR, name))
+        PROFILES_SAVED.inc(route=route)
+    except Exception:
+        logger.exception("İstek profili kaydedilemedi.")
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Rota etiketini isteğin ölçümlerine yazan ve seçilen istekleri profilleyen APIRoute.
+    pyinstrument yalnızca başlatıldığı thread'i izlediği için profil, senkron endpoint'lerin
+    çalıştığı thread havuzunda endpoint fonksiyonunun etrafında başlatılır.
+    """
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if getattr(call, "__instrumented__", False):
+            return super().get_route_handler()
+        route = self.path
+        threshold = PROFILE_THRESHOLD_MS / 1000 if PROFILE_THRESHOLD_MS is not None else None
+
+        def _finish(profiler, start):
+            profiler.stop()
+            elapsed = time.perf_counter() - start
+            if elapsed >= threshold:
+                _save_profile(profiler, route, elapsed)
+
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def wrapped(*args, **kwargs):
+                _set_route(route)
+                if not _should_profile():
+                    return await call(*args, **kwargs)
+                profiler, start = Profiler(async_mode="enabled"), time.perf_counter()
+                profiler.start()
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    _finish(profiler, start)
+        else:
+            @functools.wraps(call)
+            def wrapped(*args, **kwargs):
+                _set_route(route)
+                if not _should_profile():
+                    return call(*args, **kwargs)
+                profiler, start = Profiler(), time.perf_counter()
+                profiler.start()
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    _finish(profiler, start)
+
+        wrapped.__instrumented__ = True
+        self.dependant.call = wrapped
+        return super().get_route_handler()
+
+
+def _set_route(route):
+    stats = current_request.get()
+    if stats is not None:
+        stats.route = route
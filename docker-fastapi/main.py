@@ -1,12 +1,26 @@
 # main.py
 
-from fastapi import FastAPI, Depends, HTTPException, status
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Union
 
 # Proje içindeki diğer modüllerden gerekli bileşenleri import et
-from . import crud, models, schemas
-from .database import engine, get_db
+from . import audit, audit_archive, bulk, crud, events, export, instrumentation, matching, metrics, models, ratings, schemas, search, security, seo, serialization, transitions
+from .database import (
+    REPLICA_STICKY_SECONDS, SessionLocal, async_engine, engine, get_db, get_read_db, read_engine,
+    read_from_primary, replicas,
+)
+from .reference_cache import check_job_references, reference_cache
 
 # FastAPI uygulamasını başlatmadan önce, SQLAlchemy modellerine bakarak
 # veritabanında eksik olan tüm tabloları oluştur.
@@ -14,11 +28,188 @@ from .database import engine, get_db
 # Geliştirme ortamı için hızlı bir başlangıç sağlar.
 models.Base.metadata.create_all(bind=engine)
 
+def _rebuild_search_index():
+    db = SessionLocal()
+    try:
+        return search.index.rebuild(db)
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Referans tablolarını (kategori, hizmet, şehir, ilçe) ilk istekten önce önbelleğe al.
+    await run_in_threadpool(reference_cache.preload)
+    # Arama indeksini aç; boşsa (ilk kurulum) açılışı bekletmeden arka planda oluştur.
+    if await run_in_threadpool(search.open_index) is not None and search.index.is_empty():
+        threading.Thread(target=_rebuild_search_index, daemon=True).start()
+    search.indexer.start()
+    audit.writer.start()
+    seo.refresher.start()
+    events.broker.start()
+    if replicas is not None:
+        replicas.start()
+    yield
+    # Kapanışta arka plan kaynaklarını serbest bırak; bekleyen SEO ve arama indeksi güncellemeleri
+    # uygulanır ve kuyruktaki denetim kayıtları yazılır.
+    if replicas is not None:
+        replicas.stop()
+    events.broker.stop()
+    await run_in_threadpool(seo.refresher.stop)
+    await run_in_threadpool(search.indexer.stop)
+    await run_in_threadpool(audit.writer.stop)
+    security.shutdown()
+    # aiosqlite bağlantıları kendi (daemon olmayan) thread'lerinde çalışır; kapatılmazlarsa süreç çıkamaz.
+    if async_engine is not None:
+        await async_engine.dispose()
+
 app = FastAPI(
     title="Gelişmiş Hizmet Platformu API",
     description="Kullanıcılar ve hizmet sağlayıcılar için bir platform.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+# Tüm rotalar istek ölçümlerine rota etiketini yazan ve örneklenen istekleri profilleyen
+# rota sınıfıyla oluşturulur (rota tanımlarından önce ayarlanmalıdır).
+app.router.route_class = instrumentation.InstrumentedRoute
+
+@app.exception_handler(security.HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: security.HashingBusyError):
+    # Şifre işleme havuzu doluysa istek kuyrukta bekletilmez; istemci kısa süre sonra tekrar dener.
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Sunucu şu anda yoğun, lütfen tekrar deneyin."},
+        headers={"Retry-After": "1"},
+    )
+
+@app.middleware("http")
+async def audit_user_middleware(request: Request, call_next):
+    # Denetim kayıtlarında işlemi yapan kullanıcı. Geçici olarak X-User-Id başlığından okunur;
+    # kimlik doğrulama eklendiğinde JWT'deki kullanıcı ID'si buraya atanmalıdır.
+    user_id = request.headers.get("X-User-Id")
+    token = audit.current_user_id.set(int(user_id) if user_id and user_id.isdigit() else None)
+    try:
+        return await call_next(request)
+    finally:
+        audit.current_user_id.reset(token)
+
+# Okuma replikaları için okuma-yazma tutarlılığı (read-your-writes). Başarılı bir yazma isteğinin
+# cevabına, REPLICA_STICKY_SECONDS sonrasının zaman damgasını taşıyan bir çerez eklenir; bu çerezi
+# gönderen istemcinin okumaları süre dolana kadar birincilden yapılır. Çerez istemcide tutulduğundan
+# istemcinin hangi worker'a düştüğünden bağımsız çalışır.
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+@app.middleware("http")
+async def read_routing_middleware(request: Request, call_next):
+    if replicas is None:
+        return await call_next(request)
+    try:
+        sticky = float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        sticky = False
+    token = read_from_primary.set(sticky)
+    try:
+        response = await call_next(request)
+    finally:
+        read_from_primary.reset(token)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, str(int(time.time() + REPLICA_STICKY_SECONDS) + 1),
+            max_age=int(REPLICA_STICKY_SECONDS) + 1, httponly=True, samesite="lax",
+        )
+    return response
+
+# İstek süresi, veritabanı süresi ve ifade sayısı ölçümü. En son eklendiği için en dıştaki
+# middleware'dir ve diğer middleware'lerin süresini de kapsar.
+app.middleware("http")(instrumentation.http_middleware)
+
+@app.exception_handler(transitions.TransitionConflictError)
+async def transition_conflict_handler(request: Request, exc: transitions.TransitionConflictError):
+    # Kaydın durumu başka bir işlem tarafından değiştirilmiş (ör. iş zaten atanmış).
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
+
+# İsteğe bağlı asenkron rotalar (ASYNC_DATABASE_URL tanımlıysa /async altında).
+if async_engine is not None:
+    from .async_api import router as async_router
+    app.include_router(async_router)
+
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    # Tek satırlık yazmalar benzersizlik ve ilişki kontrollerini veritabanına bırakır;
+    # kısıt ihlalleri burada istemci hatasına (400) çevrilir.
+    if "email" in str(exc.orig):
+        detail = "Bu e-posta adresi zaten kayıtlı."
+    else:
+        detail = "Kayıt, bir benzersizlik veya ilişki kısıtını ihlal ediyor."
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": detail})
+
+
+# --- Toplu içe aktarma yardımcısı ---
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors())
+
+async def _bulk_ingest(request: Request, schema, write_chunk, db: Session):
+    """
+    İstek gövdesini akış halinde okuyup her kaydı `schema` ile doğrular ve BULK_CHUNK_SIZE'lık
+    gruplar halinde `write_chunk(db, grup)` ile yazar. Her grup kendi işleminde (transaction)
+    yazılır; hatalı satırlar sıra numaralarıyla birlikte raporlanır.
+    """
+    result = schemas.BulkResult()
+    chunk = []
+
+    async def flush():
+        inserted, errors = await run_in_threadpool(write_chunk, db, chunk)
+        result.inserted += inserted
+        result.errors.extend(errors)
+        chunk.clear()
+
+    index = 0
+    try:
+        async for index, record in bulk.iter_records(request.stream()):
+            if isinstance(record, bulk.RecordError):
+                result.errors.append(schemas.BulkRowError(index=index, detail=record.detail))
+                continue
+            try:
+                chunk.append((index, schema.model_validate(record)))
+            except ValidationError as exc:
+                result.errors.append(schemas.BulkRowError(index=index, detail=_validation_detail(exc)))
+                continue
+            if len(chunk) >= bulk.BULK_CHUNK_SIZE:
+                await flush()
+    except ValueError as exc:
+        # Gövdenin geri kalanı okunamıyor: istek reddedilir. Daha önce kendi işlemlerinde yazılmış
+        # gruplar geri alınamadığından sayıları hata mesajında bildirilir; bekleyen grup yazılmaz.
+        raise HTTPException(
+            status_code=400,
+            detail=f"Kayıt {index + 1} civarında gövde okunamadı: {exc} (yazılan kayıt: {result.inserted})",
+        ) from exc
+    if chunk:
+        await flush()
+    result.errors.sort(key=lambda error: error.index)
+    return result
+
+
+# --- Referans veri yardımcıları ---
+
+def _cached_json(request: Request, payload: bytes, etag: str) -> Response:
+    """Önceden kodlanmış JSON gövdesini ETag ile döndürür; istemcideki kopya güncelse 304 döner."""
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+def _write_jobs_chunk(db: Session, chunk, customer_id: int):
+    errors, valid = [], []
+    for index, job in chunk:
+        detail = check_job_references(job)
+        if detail:
+            errors.append(schemas.BulkRowError(index=index, detail=detail))
+        else:
+            valid.append((index, job))
+    inserted, insert_errors = crud.bulk_create_customer_jobs(db, valid, customer_id=customer_id)
+    return inserted, errors + insert_errors
+
 
 # --- API Rotaları (Endpoints) ---
 
@@ -26,6 +217,11 @@ app = FastAPI(
 def read_root():
     return {"message": "Hizmet Platformu API'sine Hoş Geldiniz!"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Bağlantı havuzu gibi çalışma zamanı metriklerini Prometheus metin formatında döndürür."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # --- Kullanıcı Endpoint'leri ---
 
 @app.post("/users/", response_model=schemas.User, status_code=status.HTTP_201_CREATED, tags=["Users"])
@@ -34,21 +230,48 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     Yeni bir kullanıcı oluşturur.
     - E-posta adresi sistemde zaten kayıtlıysa `400 Bad Request` hatası döner.
     """
-    db_user = crud.get_user_by_email(db, email=user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Bu e-posta adresi zaten kayıtlı.")
+    # E-posta kontrolü ayrı bir SELECT ile yapılmaz; unique indeks ihlali
+    # `integrity_error_handler` tarafından 400'e çevrilir.
     return crud.create_user(db=db, user=user)
 
-@app.get("/users/", response_model=List[schemas.User], tags=["Users"])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@app.post("/users/bulk", response_model=schemas.BulkResult, tags=["Users"])
+async def create_users_bulk(request: Request, db: Session = Depends(get_db)):
+    """
+    Kullanıcıları toplu olarak oluşturur. Gövde NDJSON veya `UserCreate` nesnelerinden oluşan
+    bir JSON dizisi olabilir; akış halinde okunur ve gruplar halinde yazılır.
+    - Kayıtlı veya gövdede tekrar eden e-postalar satır bazında hata olarak raporlanır.
+    """
+    return await _bulk_ingest(request, schemas.UserCreate, crud.bulk_create_users, db)
+
+@app.get("/users/", response_model=Union[List[schemas.User], schemas.UserPage], tags=["Users"])
+def read_users(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
     """
     Sistemdeki kullanıcıların bir listesini döndürür.
+    - `cursor` verilirse keyset sayfalama kullanılır ve `{items, next_cursor}` döner.
+      İlk sayfa için `cursor=` (boş) gönderilir, sonraki sayfalar için dönen `next_cursor`.
+    - `cursor` verilmezse eski `skip`/`limit` davranışı korunur.
+    - FAST_SERIALIZATION açıksa yanıt ORM/Pydantic nesnesi oluşturulmadan, seçilen kolonlardan
+      doğrudan JSON'a kodlanır (aynı alanlar, aynı sıra).
     """
+    if serialization.FAST_SERIALIZATION:
+        if cursor is not None:
+            try:
+                rows, next_cursor = crud.get_column_rows_page(db, models.User, serialization.USER_COLUMNS, cursor=cursor, limit=limit)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+            return serialization.page_response(rows, next_cursor)
+        return serialization.list_response(crud.get_column_rows(db, serialization.USER_COLUMNS, skip=skip, limit=limit))
+    if cursor is not None:
+        try:
+            users, next_cursor = crud.get_users_page(db, cursor=cursor, limit=limit)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return schemas.UserPage(items=users, next_cursor=next_cursor)
     users = crud.get_users(db, skip=skip, limit=limit)
     return users
 
 @app.get("/users/{user_id}", response_model=schemas.User, tags=["Users"])
-def read_user(user_id: int, db: Session = Depends(get_db)):
+def read_user(user_id: int, db: Session = Depends(get_read_db)):
     """
     Belirtilen ID'ye sahip kullanıcıyı döndürür.
     - Kullanıcı bulunamazsa `404 Not Found` hatası döner.
@@ -69,19 +292,67 @@ def create_job(job: schemas.JobCreate, customer_id: int, db: Session = Depends(g
       authentication (JWT token) işleminden alınmalıdır.)
     """
     # Gerçek uygulamada customer_id'nin var olup olmadığı kontrol edilmelidir.
+    detail = check_job_references(job)
+    if detail:
+        raise HTTPException(status_code=400, detail=detail)
     return crud.create_customer_job(db=db, job=job, customer_id=customer_id)
 
 
-@app.get("/jobs/", response_model=List[schemas.Job], tags=["Jobs"])
-def read_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@app.post("/jobs/bulk", response_model=schemas.BulkResult, tags=["Jobs"])
+async def create_jobs_bulk(request: Request, customer_id: int, db: Session = Depends(get_db)):
+    """
+    Bir müşteri için iş ilanlarını toplu olarak oluşturur. Gövde NDJSON veya `JobCreate`
+    nesnelerinden oluşan bir JSON dizisi olabilir.
+    """
+    return await _bulk_ingest(
+        request,
+        schemas.JobCreate,
+        lambda db, chunk: _write_jobs_chunk(db, chunk, customer_id=customer_id),
+        db,
+    )
+
+@app.get("/jobs/", response_model=Union[List[schemas.Job], schemas.JobPage], tags=["Jobs"])
+def read_jobs(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
     """
     Sistemdeki iş ilanlarının bir listesini döndürür.
+    - `cursor` verilirse keyset sayfalama kullanılır ve `{items, next_cursor}` döner.
+      İlk sayfa için `cursor=` (boş) gönderilir, sonraki sayfalar için dönen `next_cursor`.
+    - `cursor` verilmezse eski `skip`/`limit` davranışı korunur.
+    - FAST_SERIALIZATION açıksa yanıt ORM/Pydantic nesnesi oluşturulmadan, seçilen kolonlardan
+      doğrudan JSON'a kodlanır (aynı alanlar, aynı sıra).
     """
+    if serialization.FAST_SERIALIZATION:
+        if cursor is not None:
+            try:
+                rows, next_cursor = crud.get_column_rows_page(db, models.Job, serialization.JOB_COLUMNS, cursor=cursor, limit=limit)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+            return serialization.page_response(rows, next_cursor)
+        return serialization.list_response(crud.get_column_rows(db, serialization.JOB_COLUMNS, skip=skip, limit=limit))
+    if cursor is not None:
+        try:
+            jobs, next_cursor = crud.get_jobs_page(db, cursor=cursor, limit=limit)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return schemas.JobPage(items=jobs, next_cursor=next_cursor)
     jobs = crud.get_jobs(db, skip=skip, limit=limit)
     return jobs
 
+@app.get("/jobs/open", response_model=schemas.JobPage, tags=["Jobs"])
+def read_open_jobs(provider_id: int, cursor: Optional[str] = None, limit: int = 100, db: Session = Depends(get_read_db)):
+    """
+    Sağlayıcının hizmet verdiği hizmet/ilçe çiftlerine uyan açık iş ilanlarını en yeniden eskiye döndürür.
+    - `provider_id`: Sağlayıcının ID'si. (Gerçek bir uygulamada bu bilgi JWT'den alınmalıdır.)
+    - Sonraki sayfa için dönen `next_cursor` değeri `cursor` olarak gönderilir.
+    """
+    try:
+        jobs, next_cursor = crud.get_open_jobs_for_provider(db, provider_id=provider_id, cursor=cursor, limit=limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return schemas.JobPage(items=jobs, next_cursor=next_cursor)
+
 @app.get("/jobs/{job_id}", response_model=schemas.JobWithOffers, tags=["Jobs"])
-def read_job_details(job_id: int, db: Session = Depends(get_db)):
+def read_job_details(job_id: int, db: Session = Depends(get_read_db)):
     """
     Belirtilen ID'ye sahip iş ilanını, teklifleriyle birlikte döndürür.
     - İş ilanı bulunamazsa `404 Not Found` hatası döner.
@@ -91,4 +362,345 @@ def read_job_details(job_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="İş ilanı bulunamadı.")
     return db_job
 
+
+# --- Teklif (Offer) Endpoint'leri ---
+
+@app.post("/offers/", response_model=schemas.Offer, status_code=status.HTTP_201_CREATED, tags=["Offers"])
+def create_offer(offer: schemas.OfferCreate, provider_id: int, db: Session = Depends(get_db)):
+    """
+    Bir iş ilanına yeni bir teklif oluşturur.
+    - `provider_id`: Teklifi veren sağlayıcının ID'si. (Gerçek bir uygulamada bu bilgi
+      authentication (JWT token) işleminden alınmalıdır.)
+    """
+    return crud.create_provider_offer(db=db, offer=offer, provider_id=provider_id)
+
+@app.post("/offers/bulk", response_model=schemas.BulkResult, tags=["Offers"])
+async def create_offers_bulk(request: Request, provider_id: int, db: Session = Depends(get_db)):
+    """
+    Bir sağlayıcı için teklifleri toplu olarak oluşturur. Gövde NDJSON veya `OfferCreate`
+    nesnelerinden oluşan bir JSON dizisi olabilir.
+    """
+    return await _bulk_ingest(
+        request,
+        schemas.OfferCreate,
+        lambda db, chunk: crud.bulk_create_provider_offers(db, chunk, provider_id=provider_id),
+        db,
+    )
+
+@app.get("/offers/{offer_id}", response_model=schemas.OfferDetails, tags=["Offers"])
+def read_offer_details(offer_id: int, db: Session = Depends(get_read_db)):
+    """
+    Belirtilen ID'ye sahip teklifi, iş ilanı ve sağlayıcı bilgisiyle birlikte döndürür.
+    - Teklif bulunamazsa `404 Not Found` hatası döner.
+    """
+    db_offer = crud.get_offer(db, offer_id=offer_id)
+    if db_offer is None:
+        raise HTTPException(status_code=404, detail="Teklif bulunamadı.")
+    return db_offer
+
+@app.patch("/offers/{offer_id}/accept", response_model=schemas.Offer, tags=["Offers"])
+def accept_offer(offer_id: int, db: Session = Depends(get_db)):
+    """
+    Teklifi kabul eder; iş ilanı 'assigned' olur ve işin bekleyen diğer teklifleri reddedilir.
+    - Teklif bulunamazsa `404 Not Found` hatası döner.
+    - İş ilanı artık açık değilse veya teklif beklemede değilse `409 Conflict` hatası döner.
+    """
+    db_offer = crud.accept_offer(db, offer_id=offer_id)
+    if db_offer is None:
+        raise HTTPException(status_code=404, detail="Teklif bulunamadı.")
+    return db_offer
+
+
+# --- Anlık Bildirimler (WebSocket) ---
+# İstemciler işi veya bölgeyi yoklamak yerine abone olur; olaylar commit sonrasında JSON metni
+# olarak gönderilir (bkz. events.py). Bağlantı açıkken veritabanına gidilmez. İstemciden gelen
+# mesajlar yok sayılır. Kuyruğu taşan (yetişemeyen) istemcinin bağlantısı 1013 koduyla kapatılır;
+# istemci yeniden bağlanıp güncel durumu bir kez GET ile okumalıdır.
+
+async def _push_events(websocket: WebSocket, topics):
+    await websocket.accept()
+    subscription = events.broker.subscribe(topics)
+    receive = asyncio.ensure_future(websocket.receive())
+    get = asyncio.ensure_future(subscription.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait({receive, get}, return_when=asyncio.FIRST_COMPLETED)
+            if get in done:
+                payload = get.result()
+                if payload is None:
+                    await websocket.close(code=1013)
+                    return
+                await websocket.send_text(payload)
+                get = asyncio.ensure_future(subscription.get())
+            if receive in done:
+                if receive.result()["type"] == "websocket.disconnect":
+                    return
+                receive = asyncio.ensure_future(websocket.receive())
+    finally:
+        events.broker.unsubscribe(subscription)
+        receive.cancel()
+        get.cancel()
+
+@app.websocket("/ws/jobs/{job_id}")
+async def watch_job(websocket: WebSocket, job_id: int):
+    """İşe gelen teklifler (`offer.created`) ve teklifin kabulü (`offer.accepted`)."""
+    await _push_events(websocket, [events.job_topic(job_id)])
+
+@app.websocket("/ws/areas/{service_id}/{district_id}")
+async def watch_area(websocket: WebSocket, service_id: int, district_id: int):
+    """Hizmet/ilçe çiftinde açılan (`job.created`) ve atanan (`job.assigned`) işler."""
+    await _push_events(websocket, [events.area_topic(service_id, district_id)])
+
+def _provider_area_topics(provider_id: int):
+    db = SessionLocal()
+    try:
+        return [events.area_topic(s, d) for s, d in matching.provider_areas.get(db, provider_id)]
+    finally:
+        db.close()
+
+@app.websocket("/ws/providers/{provider_id}/jobs")
+async def watch_provider_jobs(websocket: WebSocket, provider_id: int):
+    """
+    Sağlayıcının tüm hizmet bölgelerindeki iş olayları; GET /jobs/open yoklamasının yerine geçer.
+    Bölgeler bağlantı açılırken bir kez okunur; bölgeler değişirse istemci yeniden bağlanmalıdır.
+    """
+    await _push_events(websocket, await run_in_threadpool(_provider_area_topics, provider_id))
+
+
+# --- Katalog (Referans Veri) Endpoint'leri ---
+# Bu endpoint'ler veritabanına gitmez; reference_cache'teki önceden kodlanmış gövdeleri
+# ETag ile döndürür.
+
+@app.get("/categories/", response_model=List[schemas.Category], tags=["Catalog"])
+def read_categories(request: Request):
+    """Tüm kategorileri döndürür."""
+    snapshot = reference_cache.get("categories")
+    return _cached_json(request, snapshot.payload, snapshot.etag)
+
+@app.get("/services/", response_model=List[schemas.Service], tags=["Catalog"])
+def read_services(request: Request, category_id: Optional[int] = None):
+    """Hizmetleri döndürür; `category_id` verilirse o kategoriye ait olanlarla sınırlar."""
+    snapshot = reference_cache.get("services")
+    if category_id is None:
+        return _cached_json(request, snapshot.payload, snapshot.etag)
+    rows = [row.model_dump(mode="json") for row in snapshot.rows if row.category_id == category_id]
+    payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _cached_json(request, payload, '"%s-%d"' % (snapshot.etag.strip('"'), category_id))
+
+@app.get("/locations/", tags=["Catalog"])
+def read_locations(request: Request):
+    """Şehirleri ve ilçeleri `{cities, districts}` biçiminde döndürür."""
+    cities = reference_cache.get("cities")
+    districts = reference_cache.get("districts")
+    payload = b'{"cities":' + cities.payload + b',"districts":' + districts.payload + b"}"
+    etag = '"%s-%s"' % (cities.etag.strip('"'), districts.etag.strip('"'))
+    return _cached_json(request, payload, etag)
+
+@app.post("/admin/categories/", response_model=schemas.Category, status_code=status.HTTP_201_CREATED, tags=["Admin"])
+def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)):
+    """Yeni bir kategori oluşturur ve kategori önbelleğini geçersiz kılar."""
+    db_category = crud.create_category(db=db, category=category)
+    reference_cache.invalidate("categories")
+    return db_category
+
+@app.post("/admin/services/", response_model=schemas.Service, status_code=status.HTTP_201_CREATED, tags=["Admin"])
+def create_service(service: schemas.ServiceCreate, db: Session = Depends(get_db)):
+    """Yeni bir hizmet oluşturur ve hizmet önbelleğini geçersiz kılar."""
+    db_service = crud.create_service(db=db, service=service)
+    reference_cache.invalidate("services")
+    return db_service
+
+
+# --- Arama Endpoint'leri ---
+
+@app.get("/search", response_model=List[schemas.SearchHit], tags=["Search"])
+def search_documents(
+    q: str,
+    kind: Optional[str] = None,
+    city_id: Optional[int] = None,
+    district_id: Optional[int] = None,
+    service_id: Optional[int] = None,
+    limit: int = 20,
+    offset: int = 0,
+):
+    """
+    İş ilanlarında ve sağlayıcılarda tam metin arama yapar ("ankara boyacı" gibi).
+    - Türkçe karakterler katlanır: "boyaci" ve "BOYACI" aynı sonuçları getirir.
+    - `kind`: `job` veya `provider` ile sonuçlar tek türe sınırlanır.
+    - `city_id`, `district_id`, `service_id` ile filtrelenir; sonuçlar BM25'e göre sıralanır.
+    """
+    if search.index is None:
+        raise HTTPException(status_code=503, detail="Arama indeksi yapılandırılmamış.")
+    if kind not in (None, search.KIND_JOB, search.KIND_PROVIDER):
+        raise HTTPException(status_code=400, detail="Geçersiz tür (kind).")
+    hits = search.index.search(
+        q, kind=kind, city_id=city_id, district_id=district_id, service_id=service_id,
+        limit=min(limit, 100), offset=offset,
+    )
+    return [schemas.SearchHit(kind=k, id=i, title=t, score=sc) for k, i, t, sc in hits]
+
+@app.post("/admin/search/rebuild", tags=["Admin"])
+def rebuild_search_index():
+    """Arama indeksini veritabanından baştan oluşturur (ORM dışı toplu yazmalardan sonra)."""
+    if search.index is None:
+        raise HTTPException(status_code=503, detail="Arama indeksi yapılandırılmamış.")
+    return {"documents": _rebuild_search_index()}
+
+
+# --- SEO Sayfaları ---
+# Sayfalar ve site haritaları yalnızca önceden hesaplanmış özet tablolarını okur (bkz. seo.py);
+# slug'lar reference_cache üzerinden çözülür.
+
+def _seo_page(db: Session, city_slug: str, service_slug: str, district_slug: Optional[str] = None):
+    service = reference_cache.get_by_slug("services", service_slug)
+    city = reference_cache.get_by_slug("cities", city_slug)
+    district = None
+    if city is not None and district_slug is not None:
+        district = reference_cache.get_by_slug("districts", (city.id, district_slug))
+        if district is None:
+            raise HTTPException(status_code=404, detail="Sayfa bulunamadı.")
+    if service is None or not service.is_active or city is None:
+        raise HTTPException(status_code=404, detail="Sayfa bulunamadı.")
+    page = seo.get_page(db, service.id, city.id, district.id if district else None)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Sayfa bulunamadı.")
+    return {
+        "service": service,
+        "city": city,
+        "district": district,
+        "provider_count": page.provider_count,
+        "review_count": page.review_count,
+        "rating_avg": page.rating_avg,
+        "open_job_count": page.open_job_count,
+        "top_providers": page.top_providers,
+        "recent_jobs": page.recent_jobs,
+        "updated_at": page.updated_at,
+    }
+
+@app.get("/seo/{city_slug}/{service_slug}", response_model=schemas.SeoPage, tags=["SEO"])
+def read_seo_city_page(city_slug: str, service_slug: str, db: Session = Depends(get_read_db)):
+    """Bir şehirdeki hizmet sayfasının içeriğini döndürür ("izmir/avukat")."""
+    return _seo_page(db, city_slug, service_slug)
+
+@app.get("/seo/{city_slug}/{district_slug}/{service_slug}", response_model=schemas.SeoPage, tags=["SEO"])
+def read_seo_district_page(city_slug: str, district_slug: str, service_slug: str, db: Session = Depends(get_read_db)):
+    """Bir ilçedeki hizmet sayfasının içeriğini döndürür ("izmir/karsiyaka/avukat")."""
+    return _seo_page(db, city_slug, service_slug, district_slug)
+
+@app.get("/sitemaps/seo.xml", tags=["SEO"])
+def read_seo_sitemap_index():
+    """Hizmet başına site haritası parçalarını listeleyen site haritası dizini."""
+    return StreamingResponse(seo.stream_sitemap_index(), media_type="application/xml")
+
+@app.get("/sitemaps/seo/{service_slug}.xml", tags=["SEO"])
+def read_seo_sitemap(service_slug: str):
+    """Bir hizmetin tüm şehir ve ilçe sayfalarını içeren site haritası parçası."""
+    service = reference_cache.get_by_slug("services", service_slug)
+    if service is None or not service.is_active:
+        raise HTTPException(status_code=404, detail="Site haritası bulunamadı.")
+    return StreamingResponse(seo.stream_sitemap(service), media_type="application/xml")
+
+@app.post("/admin/seo/rebuild", tags=["Admin"])
+def rebuild_seo_pages():
+    """
+    SEO sayfa özetlerini baştan hesaplar. API süreci içinde sırayla çalışır; büyük veri setlerinde
+    paralel oluşturma için `python -m app seo build --workers N` kullanılmalıdır.
+    """
+    return {"pages": seo.build(workers=1)}
+
+
+# --- Sağlayıcı (Provider) Endpoint'leri ---
+
+@app.get("/providers/", response_model=List[schemas.ProviderWithRating], tags=["Providers"])
+def read_top_rated_providers(limit: int = 100, min_reviews: int = 1, db: Session = Depends(get_read_db)):
+    """
+    Sağlayıcıları ortalama puana göre azalan sırada, puan özetleriyle birlikte döndürür.
+    - `min_reviews`: Listeye girmek için gereken en az yorum sayısı.
+    """
+    return crud.get_top_rated_providers(db, limit=limit, min_reviews=min_reviews)
+
+
+# --- Yorum (Review) Endpoint'leri ---
+
+@app.post("/reviews/", response_model=schemas.Review, status_code=status.HTTP_201_CREATED, tags=["Reviews"])
+def create_review(review: schemas.ReviewCreate, customer_id: int, db: Session = Depends(get_db)):
+    """
+    Yeni bir yorum oluşturur ve sağlayıcının puan özetini günceller.
+    - `customer_id`: Yorumu yapan müşterinin ID'si. (Gerçek bir uygulamada bu bilgi JWT'den alınmalıdır.)
+    - Aynı işe ikinci bir yorum yapılırsa `400 Bad Request` hatası döner.
+    """
+    return crud.create_review(db=db, review=review, customer_id=customer_id)
+
+@app.delete("/reviews/{review_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Reviews"])
+def delete_review(review_id: int, db: Session = Depends(get_db)):
+    """
+    Yorumu pasife çeker (soft delete) ve puan özetinden düşer.
+    - Yorum bulunamazsa veya zaten pasifse `404 Not Found` hatası döner.
+    """
+    if not crud.soft_delete_review(db, review_id=review_id):
+        raise HTTPException(status_code=404, detail="Yorum bulunamadı.")
+
+
+# --- Yönetim (Admin) Endpoint'leri ---
+
+@app.post("/admin/ratings/rebuild", tags=["Admin"])
+def rebuild_ratings(db: Session = Depends(get_db)):
+    """Sağlayıcı puan özetlerini yorumlardan toplu olarak yeniden hesaplar (uzlaştırma işi)."""
+    return {"providers": ratings.rebuild_rating_summaries(db)}
+
+@app.get("/admin/audit-logs", response_model=schemas.AuditLogPage, tags=["Admin"])
+def read_audit_logs(
+    table_name: Optional[str] = None,
+    record_id: Optional[str] = None,
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Denetim kayıtlarını en yeniden eskiye keyset sayfalamayla döndürür; saklama süresini aşıp
+    arşive taşınmış kayıtlar da (`archived: true`) aynı sıralamada gelir.
+    - `table_name` + `record_id`: bir kaydın geçmişi; `user_id`: bir kullanıcının işlemleri.
+    - Sonraki sayfa için dönen `next_cursor` gönderilir.
+    """
+    try:
+        items, next_cursor = audit_archive.history(
+            db, table_name=table_name, record_id=record_id, user_id=user_id, cursor=cursor, limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/export/{table_name}", tags=["Admin"])
+def export_table(
+    table_name: str,
+    format: str = "ndjson",
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    after_id: Optional[int] = None,
+):
+    """
+    jobs, offers veya audit_logs tablosunu NDJSON ya da CSV olarak akış halinde döker.
+    - `since`/`until`: Zaman aralığı (`since` dahil, `until` hariç).
+    - `status`: İş/teklif durumu veya denetim kaydı işlem türü.
+    - `after_id`: Yarıda kalan bir dökümü, alınan son satırın id'sinden sonra sürdürür.
+    - `gzip=true`: Çıktı akış sırasında gzip ile sıkıştırılır.
+    """
+    # Akış, endpoint döndükten sonra sürdüğü için istek oturumu (get_db) kullanılmaz;
+    # export modülü kendi bağlantısını açar (replika varsa replikadan).
+    try:
+        chunks = export.stream_export(
+            table_name, format, gzip, since=since, until=until, status=status_filter, after_id=after_id,
+            bind=read_engine(),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip" if gzip else export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export.filename(table_name, format, gzip)}"'},
+    )
+
 # Diğer endpoint'ler (Teklif oluşturma, Kategori listeleme vb.) buraya eklenebilir.
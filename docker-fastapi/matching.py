@@ -0,0 +1,91 @@
+# matching.py
+
+# Sağlayıcıların hizmet bölgelerini (service_id, district_id) bellekte tutan önbellek.
+# GET /jobs/open her panel yenilemesinde sağlayıcının bölgelerine uyan açık işleri arar; bölgeler
+# nadiren değiştiği için her istekte provider_service_areas tablosuyla join yapmak yerine
+# sağlayıcı başına bir (service_id, district_id) kümesi önbellekten okunur.
+#
+# Geçersiz kılma (invalidation): ORM üzerinden ProviderServiceArea eklendiğinde, güncellendiğinde
+# veya silindiğinde ilgili sağlayıcının girdisi commit sonrasında silinir. ORM dışından yapılan
+# yazmalar (ör. toplu Core UPDATE) ve diğer worker süreçlerindeki değişiklikler için girdiler
+# PROVIDER_AREA_CACHE_TTL saniye sonra kendiliğinden yenilenir.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from . import models
+
+PROVIDER_AREA_CACHE_TTL = float(os.getenv("PROVIDER_AREA_CACHE_TTL", "300"))
+PROVIDER_AREA_CACHE_SIZE = int(os.getenv("PROVIDER_AREA_CACHE_SIZE", "50000"))
+
+
+class ProviderAreaCache:
+    """Sağlayıcı ID'si -> aktif (service_id, district_id) çiftleri; boyutu sınırlı LRU önbellek."""
+
+    def __init__(self, ttl: float = PROVIDER_AREA_CACHE_TTL, max_size: int = PROVIDER_AREA_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, provider_id: int) -> frozenset:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(provider_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(provider_id)
+                return entry[1]
+
+        pairs = frozenset(db.execute(
+            select(models.ProviderServiceArea.service_id, models.ProviderServiceArea.district_id)
+            .where(
+                models.ProviderServiceArea.provider_id == provider_id,
+                models.ProviderServiceArea.is_active.is_(True),
+            )
+        ).tuples())
+
+        with self._lock:
+            self._entries[provider_id] = (now + self.ttl, pairs)
+            self._entries.move_to_end(provider_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return pairs
+
+    def invalidate(self, provider_id: int):
+        with self._lock:
+            self._entries.pop(provider_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+provider_areas = ProviderAreaCache()
+
+
+# --- ORM olaylarıyla geçersiz kılma ---
+# Girdiler flush anında değil commit sonrasında silinir; aksi halde başka bir istek commit
+# edilmemiş durumu görmeden eski veriyi yeniden önbelleğe alabilir.
+
+_PENDING_KEY = "matching_dirty_providers"
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_areas(session, flush_context):
+    changed = [
+        obj for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, models.ProviderServiceArea)
+    ]
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(obj.provider_id for obj in changed)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_areas(session):
+    for provider_id in session.info.pop(_PENDING_KEY, ()):
+        provider_areas.invalidate(provider_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_areas(session):
+    session.info.pop(_PENDING_KEY, None)
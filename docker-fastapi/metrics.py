@@ -0,0 +1,167 @@
+# metrics.py
+
+# Prometheus metin formatında metrik üreten küçük, bağımlılıksız bir kayıt defteri.
+# Uygulama içindeki sayaçlar/histogramlar burada tanımlanır ve `/metrics` endpoint'i
+# `render()` çıktısını döndürür.
+
+import threading
+from sqlalchemy import event
+
+_lock = threading.Lock()
+REGISTRY = []
+
+# Saniye cinsinden varsayılan histogram aralıkları (1 ms - 10 sn).
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    """Yalnızca artan sayaç."""
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Etiketsiz sayaçlar hiç artmamış olsalar bile 0 değeriyle raporlanır.
+        self._values = {} if self.labelnames else {(): 0}
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(n, "") for n in self.labelnames), 0)
+
+    def collect(self):
+        with _lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name + _format_labels(self.labelnames, key), value
+
+
+class Gauge:
+    """Değeri okunduğu anda bir fonksiyondan hesaplanan ölçüm."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        REGISTRY.append(self)
+
+    def collect(self):
+        value = self.function()
+        if value is not None:
+            yield self.name, value
+
+
+class Histogram:
+    """Kümülatif aralıklı (bucket) histogram."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {} if self.labelnames else {(): [[0] * len(self.buckets), 0, 0.0]}
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += 1
+            state[2] += value
+
+    def collect(self):
+        with _lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, count, total) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield self.name + "_bucket" + _format_labels(self.labelnames, key, ("le", bound)), bucket_count
+            yield self.name + "_bucket" + _format_labels(self.labelnames, key, ("le", "+Inf")), count
+            yield self.name + "_count" + _format_labels(self.labelnames, key), count
+            yield self.name + "_sum" + _format_labels(self.labelnames, key), total
+
+
+def render():
+    """Kayıtlı tüm metrikleri Prometheus metin formatında döndürür."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append("# HELP %s %s" % (metric.name, metric.documentation))
+        lines.append("# TYPE %s %s" % (metric.name, metric.kind))
+        for sample_name, value in metric.collect():
+            lines.append("%s %s" % (sample_name, value))
+    return "\n".join(lines) + "\n"
+
+
+# --- Bağlantı havuzu metrikleri ---
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Havuzdan bağlantı alınırken geçen bekleme süresi.",
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "pool_timeout süresi içinde bağlantı alınamayan istek sayısı.",
+)
+POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Havuzdan alınan bağlantı sayısı.")
+POOL_CONNECTIONS_OPENED = Counter("db_pool_connections_opened_total", "Veritabanına açılan yeni bağlantı sayısı.")
+POOL_CONNECTIONS_CLOSED = Counter("db_pool_connections_closed_total", "Kapatılan veritabanı bağlantısı sayısı.")
+POOL_CONNECTIONS_INVALIDATED = Counter(
+    "db_pool_connections_invalidated_total",
+    "Geçersiz sayılıp atılan bağlantı sayısı (ör. pre-ping ile yakalanan kopuk bağlantılar).",
+)
+
+
+def _pool_stat(pool, name):
+    method = getattr(pool, name, None)
+    return method() if method else None
+
+
+def instrument_pool(engine):
+    """
+    Verilen motorun havuzuna SQLAlchemy pool olaylarını bağlar ve anlık havuz durumunu
+    (kullanımdaki bağlantı, overflow, boyut) gauge olarak kaydeder.
+    Bekleme süresi histogramı `database.TimedQueuePool` tarafından doldurulur.
+    """
+    pool = engine.pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_OPENED.inc()
+
+    @event.listens_for(pool, "close")
+    def _on_close(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_CLOSED.inc()
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_CONNECTIONS_INVALIDATED.inc()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.inc()
+
+    Gauge("db_pool_checked_out", "Şu anda kullanımda olan bağlantı sayısı.", lambda: _pool_stat(pool, "checkedout"))
+    Gauge("db_pool_overflow", "pool_size üzerinde açılmış (overflow) bağlantı sayısı.", lambda: _pool_stat(pool, "overflow"))
+    Gauge("db_pool_size", "Yapılandırılmış havuz boyutu.", lambda: _pool_stat(pool, "size"))
+
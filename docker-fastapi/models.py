@@ -3,12 +3,25 @@
 import enum
 from sqlalchemy import (
     Boolean, Column, ForeignKey, Integer, String, DateTime, Text,
-    Enum, DECIMAL, JSON, BigInteger, SmallInteger, UniqueConstraint
+    Enum, DECIMAL, JSON, BigInteger, SmallInteger, UniqueConstraint, Index
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 
+# SQLite yalnızca "INTEGER PRIMARY KEY" kolonlarını otomatik artırır; BIGINT birincil
+# anahtarlar SQLite üzerinde INTEGER olarak oluşturulur, MySQL'de BIGINT kalır.
+BigIntegerPK = BigInteger().with_variant(Integer, "sqlite")
+
+# SQLite'ta CURRENT_TIMESTAMP 'YYYY-MM-DD HH:MM:SS' metni üretir. Python tarafından yazılan ve
+# sorgularda karşılaştırılan değerlerin aynı biçimde saklanması için SQLite'a özel depolama
+# biçimi kullanılır; aksi halde (created_at, id) gibi metin karşılaştırmaları yanlış sonuç verir.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 # SQL'deki ENUM tipleri için Python Enum sınıfları oluşturuluyor.
 # Bu, kodda string yerine daha güvenli ve tutarlı olan enumları kullanmamızı sağlar.
 class RoleNameEnum(enum.Enum):
@@ -44,7 +57,7 @@ class Role(Base):
 
 class User(Base):
     __tablename__ = "users"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False)
     email = Column(String(255), nullable=False, unique=True, index=True)
     password_hash = Column(String(255), nullable=False)
@@ -52,13 +65,17 @@ class User(Base):
     last_name = Column(String(100), nullable=False)
     phone_number = Column(String(20), unique=True)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     role = relationship("Role")
     provider_profile = relationship("Provider", back_populates="user", uselist=False, cascade="all, delete-orphan")
     jobs = relationship("Job", back_populates="customer")
     reviews = relationship("Review", back_populates="customer")
+    # Keyset (cursor) sayfalamanın sıralama ve aralık taraması için kullandığı indeks.
+    __table_args__ = (Index('ix_users_created_at_id', 'created_at', 'id'),)
+    # INSERT sonrası id/created_at gibi sunucu değerlerini hemen getir (RETURNING varsa aynı ifadede).
+    __mapper_args__ = {"eager_defaults": True}
 
 class Category(Base):
     __tablename__ = "categories"
@@ -67,8 +84,8 @@ class Category(Base):
     slug = Column(String(150), nullable=False, unique=True)
     description = Column(Text)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     services = relationship("Service", back_populates="category")
 
@@ -80,8 +97,8 @@ class Service(Base):
     slug = Column(String(150), nullable=False)
     description = Column(Text)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     category = relationship("Category", back_populates="services")
     __table_args__ = (UniqueConstraint('category_id', 'name', name='uk_service_category_name'),)
@@ -107,31 +124,32 @@ class District(Base):
 
 class Provider(Base):
     __tablename__ = "providers"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True)
     company_name = Column(String(255))
     profile_bio = Column(Text)
     profile_picture_url = Column(String(512))
     is_verified = Column(Boolean, nullable=False, default=False)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="provider_profile")
     service_areas = relationship("ProviderServiceArea", back_populates="provider")
     offers = relationship("Offer", back_populates="provider")
     reviews = relationship("Review", back_populates="provider")
     portfolio_items = relationship("PortfolioItem", back_populates="provider")
+    rating_summary = relationship("ProviderRatingSummary", back_populates="provider", uselist=False)
 
 class ProviderServiceArea(Base):
     __tablename__ = "provider_service_areas"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     provider_id = Column(BigInteger, ForeignKey("providers.id"), nullable=False)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
     district_id = Column(Integer, ForeignKey("districts.id"), nullable=False)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     provider = relationship("Provider", back_populates="service_areas")
     service = relationship("Service")
@@ -140,7 +158,7 @@ class ProviderServiceArea(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     customer_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
     district_id = Column(Integer, ForeignKey("districts.id"), nullable=False)
@@ -148,65 +166,132 @@ class Job(Base):
     description = Column(Text, nullable=False)
     status = Column(Enum(JobStatusEnum), nullable=False, default=JobStatusEnum.open)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     customer = relationship("User", back_populates="jobs")
     service = relationship("Service")
     district = relationship("District")
     offers = relationship("Offer", back_populates="job")
     review = relationship("Review", back_populates="job", uselist=False)
+    # Keyset (cursor) sayfalamanın sıralama ve aralık taraması için kullandığı indeks.
+    __table_args__ = (
+        Index('ix_jobs_created_at_id', 'created_at', 'id'),
+        # GET /jobs/open: sağlayıcının bölgelerine uyan açık işlerin eşleştirme indeksi.
+        Index('ix_jobs_matching', 'status', 'service_id', 'district_id', 'created_at'),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
 class Offer(Base):
     __tablename__ = "offers"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     job_id = Column(BigInteger, ForeignKey("jobs.id"), nullable=False)
     provider_id = Column(BigInteger, ForeignKey("providers.id"), nullable=False)
     offer_price = Column(DECIMAL(10, 2), nullable=False)
     message = Column(Text)
     status = Column(Enum(OfferStatusEnum), nullable=False, default=OfferStatusEnum.pending)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     job = relationship("Job", back_populates="offers")
     provider = relationship("Provider", back_populates="offers")
+    __mapper_args__ = {"eager_defaults": True}
 
 class Review(Base):
     __tablename__ = "reviews"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     job_id = Column(BigInteger, ForeignKey("jobs.id"), nullable=False, unique=True)
     provider_id = Column(BigInteger, ForeignKey("providers.id"), nullable=False)
     customer_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     rating = Column(SmallInteger, nullable=False) # CHECK (1-5) Pydantic tarafında kontrol edilecek.
     comment = Column(Text)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
     job = relationship("Job", back_populates="review")
     provider = relationship("Provider", back_populates="reviews")
     customer = relationship("User", back_populates="reviews")
 
+class ProviderRatingSummary(Base):
+    # Sağlayıcı başına puan özetleri. reviews tablosundan her istekte AVG/COUNT hesaplamak yerine
+    # yorum eklenirken/pasife çekilirken aynı işlem (transaction) içinde artımlı olarak güncellenir.
+    # Tutarsızlık şüphesinde `ratings.rebuild_rating_summaries` ile toplu olarak yeniden hesaplanır.
+    __tablename__ = "provider_rating_summaries"
+    provider_id = Column(BigInteger, ForeignKey("providers.id"), primary_key=True, autoincrement=False)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_avg = Column(DECIMAL(3, 2), nullable=False, default=0)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
+
+    provider = relationship("Provider", back_populates="rating_summary")
+    # Sağlayıcıları puana göre sıralamak için.
+    __table_args__ = (Index('ix_provider_rating_avg', 'rating_avg', 'review_count'),)
+
+class SeoDistrictPage(Base):
+    # Programatik SEO sayfaları için (hizmet, ilçe) başına önceden hesaplanmış özet. Sayfa her
+    # görüntülendiğinde provider_service_areas, puan özetleri ve işler join'lenmek yerine bu satır
+    # okunur. `seo` modülü tarafından tam olarak veya değişen çiftler için artımlı olarak yazılır.
+    __tablename__ = "seo_district_pages"
+    service_id = Column(Integer, ForeignKey("services.id"), primary_key=True, autoincrement=False)
+    district_id = Column(Integer, ForeignKey("districts.id"), primary_key=True, autoincrement=False)
+    provider_count = Column(Integer, nullable=False, default=0)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_avg = Column(DECIMAL(3, 2), nullable=False, default=0)
+    open_job_count = Column(Integer, nullable=False, default=0)
+    top_providers = Column(JSON, nullable=False)
+    recent_jobs = Column(JSON, nullable=False)
+    last_job_at = Column(Timestamp)
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
+
+class SeoCityPage(Base):
+    # (hizmet, şehir) başına özet; şehrin ilçelerindeki sağlayıcılar tekilleştirilerek sayılır.
+    __tablename__ = "seo_city_pages"
+    service_id = Column(Integer, ForeignKey("services.id"), primary_key=True, autoincrement=False)
+    city_id = Column(Integer, ForeignKey("cities.id"), primary_key=True, autoincrement=False)
+    provider_count = Column(Integer, nullable=False, default=0)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_avg = Column(DECIMAL(3, 2), nullable=False, default=0)
+    open_job_count = Column(Integer, nullable=False, default=0)
+    top_providers = Column(JSON, nullable=False)
+    recent_jobs = Column(JSON, nullable=False)
+    last_job_at = Column(Timestamp)
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
+
 class PortfolioItem(Base):
     __tablename__ = "portfolio_items"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     provider_id = Column(BigInteger, ForeignKey("providers.id"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     image_url = Column(String(512), nullable=False)
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
     provider = relationship("Provider", back_populates="portfolio_items")
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger)
     action = Column(Enum(AuditActionEnum), nullable=False)
     table_name = Column(String(100), nullable=False)
     record_id = Column(String(100), nullable=False)
     old_values = Column(JSON)
     new_values = Column(JSON)
-    action_timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    action_timestamp = Column(Timestamp, nullable=False, server_default=func.now())
+    # MySQL'de tablo proje.sql'deki gibi aylık bölümlenir ve birincil anahtar (id, action_timestamp)
+    # olur; SQLite'ta otomatik artan id için tek kolonlu birincil anahtar korunur. Arşivleme
+    # (audit_archive.py) id'lerin yeniden kullanılmamasına dayanır: MySQL AUTO_INCREMENT bunu
+    # zaten sağlar, SQLite'ta ise AUTOINCREMENT olmadan silinen en büyük id yeniden verilir.
+    __table_args__ = (
+        Index('ix_audit_logs_record', 'table_name', 'record_id', 'action_timestamp'),
+        Index('ix_audit_logs_user', 'user_id', 'action_timestamp'),
+        {'sqlite_autoincrement': True},
+    )
@@ -0,0 +1,95 @@
+# ratings.py
+
+# Sağlayıcı puan özetlerinin (provider_rating_summaries) bakımı.
+# Özetler, yorumu yazan/pasife çeken işlemin içinde tek bir koşulsuz UPDATE ile artımlı olarak
+# güncellenir; okuma tarafında AVG/COUNT hesaplanmaz. `rebuild_rating_summaries`, özetleri
+# reviews tablosundan tek bir gruplu sorguyla baştan üretir (uzlaştırma işi).
+
+from sqlalchemy import case, cast, delete, func, insert, select, update, DECIMAL
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from . import models, seo
+
+Summary = models.ProviderRatingSummary
+
+
+def _average(rating_sum, review_count):
+    """review_count sıfırsa 0, aksi halde iki basamaklı ortalama."""
+    return case(
+        (review_count > 0, cast(rating_sum * 1.0 / review_count, DECIMAL(3, 2))),
+        else_=0,
+    )
+
+
+def apply_review(db: Session, provider_id: int, rating: int, delta: int):
+    """
+    Sağlayıcının özetine bir yorumu ekler (`delta=1`) veya çıkarır (`delta=-1`).
+    Commit etmez; çağıranın işlemi içinde çalışır. Sağlayıcının SEO sayfaları commit sonrasında güncellenir.
+    """
+    seo.mark_providers_changed(db, [provider_id])
+    histogram_column = getattr(Summary, f"rating_{rating}")
+    # SET sırası önemlidir: MySQL, tek tablolu UPDATE'te sonraki atamalarda önceki kolonların
+    # yeni değerlerini kullanır. Ortalama bu yüzden eski değerlerden ve ilk sırada hesaplanır.
+    stmt = (
+        update(Summary)
+        .where(Summary.provider_id == provider_id)
+        .ordered_values(
+            (Summary.rating_avg, _average(Summary.rating_sum + delta * rating, Summary.review_count + delta)),
+            (Summary.review_count, Summary.review_count + delta),
+            (Summary.rating_sum, Summary.rating_sum + delta * rating),
+            (histogram_column, histogram_column + delta),
+            (Summary.updated_at, func.now()),
+        )
+    )
+    if db.execute(stmt).rowcount or delta < 0:
+        return
+
+    # Sağlayıcının ilk yorumu: özet satırını oluştur. Aynı anda başka bir işlem satırı
+    # oluşturduysa birincil anahtar çakışır; bu durumda UPDATE tekrar denenir.
+    try:
+        with db.begin_nested():
+            db.execute(insert(Summary).values(
+                provider_id=provider_id,
+                review_count=1,
+                rating_sum=rating,
+                rating_avg=rating,
+                **{f"rating_{rating}": 1},
+            ))
+    except IntegrityError:
+        db.execute(stmt)
+
+
+def rebuild_rating_summaries(db: Session):
+    """
+    Tüm özetleri aktif yorumlardan tek bir gruplu sorguyla yeniden üretir ve commit eder.
+    Artımlı güncellemeler ORM dışından yapılan değişikliklerle kaydığında uzlaştırma için çalıştırılır.
+    Etkilenen sağlayıcıların SEO sayfaları commit sonrasında kirli olarak işaretlenir.
+    Geriye özeti üretilen sağlayıcı sayısını döner.
+    """
+    Review = models.Review
+    review_count = func.count(Review.id)
+    rating_sum = func.sum(Review.rating)
+    source = (
+        select(
+            Review.provider_id,
+            review_count,
+            rating_sum,
+            _average(rating_sum, review_count),
+            *(func.sum(case((Review.rating == star, 1), else_=0)) for star in range(1, 6)),
+        )
+        .where(Review.is_active.is_(True))
+        .group_by(Review.provider_id)
+    )
+    columns = [
+        "provider_id", "review_count", "rating_sum", "rating_avg",
+        "rating_1", "rating_2", "rating_3", "rating_4", "rating_5",
+    ]
+    # Özeti değişebilecek sağlayıcılar: eski özeti olanlar ve yeni özeti oluşanlar. SEO sayfalarındaki
+    # puan istatistikleri commit sonrasında bu sağlayıcıların bölgeleri için yeniden hesaplanır.
+    changed = set(db.execute(select(Summary.provider_id)).scalars())
+    db.execute(delete(Summary))
+    result = db.execute(insert(Summary).from_select(columns, source))
+    changed.update(db.execute(select(Summary.provider_id)).scalars())
+    seo.mark_providers_changed(db, changed)
+    db.commit()
+    return result.rowcount
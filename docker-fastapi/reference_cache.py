@@ -0,0 +1,175 @@
+# reference_cache.py
+
+# Referans verileri (kategoriler, hizmetler, şehirler, ilçeler) için süreç içi okuma önbelleği.
+# Bu tablolar küçüktür ve nadiren değişir, ancak neredeyse her istekte okunur (JobCreate'teki
+# service_id/district_id doğrulaması, SEO lokasyon sayfaları, açılır listeler). Her tablo
+# başlangıçta bir kez yüklenir ve id -> satır, slug -> satır sözlükleri olarak tutulur.
+#
+# Tazelik:
+# - REFERENCE_CACHE_TTL saniye sonra tablo yeniden yüklenir.
+# - Admin yazmaları `invalidate()` çağırarak tabloyu hemen geçersiz kılar.
+# - REFERENCE_CACHE_SHARED_DIR tanımlıysa geçersiz kılmalar bu dizindeki sürüm dosyaları
+#   üzerinden aynı makinedeki tüm uvicorn worker'larına yayılır; her okuma yalnızca birkaç
+#   baytlık bir dosya okuması ekler.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from . import metrics, models, schemas
+from .database import SessionLocal
+
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "600"))
+REFERENCE_CACHE_SHARED_DIR = os.getenv("REFERENCE_CACHE_SHARED_DIR")
+
+CACHE_HITS = metrics.Counter("reference_cache_hits_total", "Önbellekten karşılanan referans veri okumaları.", ["table"])
+CACHE_MISSES = metrics.Counter("reference_cache_misses_total", "Veritabanından yeniden yüklenen referans tablolar.", ["table"])
+
+
+class LocalVersionBackend:
+    """Sürüm sayaçlarını yalnızca bu süreçte tutar (tek worker)."""
+
+    def __init__(self):
+        self._versions = {}
+
+    def version(self, name):
+        return self._versions.get(name, 0)
+
+    def bump(self, name):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class FileVersionBackend:
+    """
+    Sürümleri paylaşılan bir dizindeki dosyaların içeriği olarak tutar.
+    Bir worker `bump` ettiğinde diğerleri bir sonraki okumada farkı görüp tabloyu yeniden yükler.
+    Dosyanın değişiklik zamanı kullanılmaz: dosya sisteminin zaman çözünürlüğü kaba olabilir ve
+    art arda iki `bump` aynı zamanı bırakabilir. İçerik, yazan sürecin pid'i ile birlikte
+    nanosaniye cinsinden zamandır ve dosya atomik olarak değiştirilir (yarım yazılmış içerik okunmaz).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.version")
+
+    def version(self, name):
+        try:
+            with open(self._path(name)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return 0
+
+    def bump(self, name):
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f"{time.time_ns()}-{os.getpid()}")
+        os.replace(tmp_path, path)
+
+
+class Snapshot:
+    """Bir referans tablosunun yüklenmiş hali."""
+
+    def __init__(self, rows, slug_key, version, expires_at):
+        self.rows = rows
+        self.by_id = {row.id: row for row in rows}
+        self.by_slug = {}
+        for row in rows:
+            self.by_slug.setdefault(slug_key(row), row)
+        self.version = version
+        self.expires_at = expires_at
+        # Katalog endpoint'leri için önceden kodlanmış gövde ve içerik tabanlı ETag;
+        # içerik aynı olduğu sürece tüm worker'lar aynı ETag'i üretir.
+        self.payload = json.dumps(
+            [row.model_dump(mode="json") for row in rows], ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = '"%s"' % hashlib.sha1(self.payload).hexdigest()
+
+
+# tablo adı -> (ORM modeli, Pydantic şeması, slug anahtarı)
+TABLES = {
+    "categories": (models.Category, schemas.Category, lambda row: row.slug),
+    "services": (models.Service, schemas.Service, lambda row: row.slug),
+    "cities": (models.City, schemas.City, lambda row: row.slug),
+    # İlçe adları şehir içinde benzersizdir.
+    "districts": (models.District, schemas.District, lambda row: (row.city_id, row.slug)),
+}
+
+
+class ReferenceCache:
+    def __init__(self, ttl=REFERENCE_CACHE_TTL, backend=None, session_factory=SessionLocal):
+        self.ttl = ttl
+        self.backend = backend or LocalVersionBackend()
+        self.session_factory = session_factory
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def _load(self, name):
+        model, schema, slug_key = TABLES[name]
+        version = self.backend.version(name)
+        db = self.session_factory()
+        try:
+            rows = [schema.model_validate(obj) for obj in db.query(model).order_by(model.id).all()]
+        finally:
+            db.close()
+        CACHE_MISSES.inc(table=name)
+        return Snapshot(rows, slug_key, version, time.monotonic() + self.ttl)
+
+    def get(self, name) -> Snapshot:
+        """Tablonun güncel anlık görüntüsünü döndürür; süresi dolmuş veya geçersizse yeniden yükler."""
+        snapshot = self._snapshots.get(name)
+        if (
+            snapshot is not None
+            and snapshot.expires_at > time.monotonic()
+            and snapshot.version == self.backend.version(name)
+        ):
+            CACHE_HITS.inc(table=name)
+            return snapshot
+        with self._lock:
+            # Kilidi beklerken başka bir thread yüklemiş olabilir.
+            current = self._snapshots.get(name)
+            if current is not snapshot and current is not None:
+                CACHE_HITS.inc(table=name)
+                return current
+            snapshot = self._snapshots[name] = self._load(name)
+            return snapshot
+
+    def get_by_id(self, name, record_id):
+        return self.get(name).by_id.get(record_id)
+
+    def get_by_slug(self, name, slug):
+        return self.get(name).by_slug.get(slug)
+
+    def preload(self):
+        """Tüm referans tablolarını yükler (uygulama başlangıcında)."""
+        for name in TABLES:
+            with self._lock:
+                self._snapshots[name] = self._load(name)
+
+    def invalidate(self, name):
+        """Tabloyu geçersiz kılar; paylaşılan arka uç varsa diğer worker'lar da yeniden yükler."""
+        self.backend.bump(name)
+        with self._lock:
+            self._snapshots.pop(name, None)
+
+
+reference_cache = ReferenceCache(
+    backend=FileVersionBackend(REFERENCE_CACHE_SHARED_DIR) if REFERENCE_CACHE_SHARED_DIR else None
+)
+
+
+def check_job_references(job: schemas.JobCreate):
+    """
+    İş ilanının hizmet ve ilçe referanslarını önbellekten doğrular; hata varsa mesajını döner.
+    Senkron ve asenkron (/async) iş oluşturma rotaları aynı doğrulamayı kullanır.
+    """
+    service = reference_cache.get_by_id("services", job.service_id)
+    if service is None or not service.is_active:
+        return "Geçersiz veya pasif hizmet (service_id)."
+    if reference_cache.get_by_id("districts", job.district_id) is None:
+        return "Geçersiz ilçe (district_id)."
+    return None
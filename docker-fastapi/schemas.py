@@ -32,6 +32,48 @@ class User(UserBase, OrmConfig):
     created_at: datetime
     role_id: int
 
+# Keyset (cursor) sayfalamalı liste cevabı. `next_cursor` son sayfada None döner.
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = None
+
+# --- Referans Veri Şemaları (Kategori, Hizmet, Şehir, İlçe) ---
+class CategoryBase(BaseModel):
+    name: str = Field(..., max_length=150)
+    slug: str = Field(..., max_length=150)
+    description: Optional[str] = None
+
+class CategoryCreate(CategoryBase):
+    pass
+
+class Category(CategoryBase, OrmConfig):
+    id: int
+    is_active: bool
+
+class ServiceBase(BaseModel):
+    category_id: int
+    name: str = Field(..., max_length=150)
+    slug: str = Field(..., max_length=150)
+    description: Optional[str] = None
+
+class ServiceCreate(ServiceBase):
+    pass
+
+class Service(ServiceBase, OrmConfig):
+    id: int
+    is_active: bool
+
+class City(OrmConfig):
+    id: int
+    name: str
+    slug: str
+
+class District(OrmConfig):
+    id: int
+    city_id: int
+    name: str
+    slug: str
+
 # --- Provider Şemaları ---
 class ProviderBase(BaseModel):
     company_name: Optional[str] = None
@@ -47,6 +89,19 @@ class Provider(ProviderBase, OrmConfig):
     is_verified: bool
     is_active: bool
 
+# Sağlayıcı puan özeti (1-5 yıldız dağılımıyla birlikte)
+class ProviderRatingSummary(OrmConfig):
+    review_count: int
+    rating_avg: Decimal
+    rating_1: int
+    rating_2: int
+    rating_3: int
+    rating_4: int
+    rating_5: int
+
+class ProviderWithRating(Provider):
+    rating_summary: Optional[ProviderRatingSummary] = None
+
 # Detaylı kullanıcı bilgisi (profiliyle birlikte)
 class UserWithProviderProfile(User):
     provider_profile: Optional[Provider] = None
@@ -69,6 +124,10 @@ class Job(JobBase, OrmConfig):
     is_active: bool
     created_at: datetime
 
+class JobPage(BaseModel):
+    items: List[Job]
+    next_cursor: Optional[str] = None
+
 
 # --- Offer Şemaları ---
 class OfferBase(BaseModel):
@@ -111,5 +170,64 @@ class Review(ReviewBase, OrmConfig):
     customer_id: int
     created_at: datetime
 
+# --- Arama Şemaları ---
+class SearchHit(BaseModel):
+    kind: str  # "job" | "provider"
+    id: int
+    title: str
+    score: float
+
+# --- SEO Sayfası Şemaları ---
+class SeoProvider(BaseModel):
+    id: int
+    company_name: Optional[str] = None
+    rating_avg: float
+    review_count: int
+
+class SeoJob(BaseModel):
+    id: int
+    title: str
+    status: str
+    created_at: datetime
+
+# "İzmir avukat" gibi bir (hizmet, şehir) veya (hizmet, ilçe) sayfasının içeriği.
+# `district` yalnızca ilçe sayfalarında doludur.
+class SeoPage(BaseModel):
+    service: Service
+    city: City
+    district: Optional[District] = None
+    provider_count: int
+    review_count: int
+    rating_avg: Decimal
+    open_job_count: int
+    top_providers: List[SeoProvider]
+    recent_jobs: List[SeoJob]
+    updated_at: Optional[datetime] = None
+
+# --- Denetim Kaydı Şemaları ---
+class AuditLogEntry(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    action: str
+    table_name: str
+    record_id: str
+    old_values: Optional[dict] = None
+    new_values: Optional[dict] = None
+    action_timestamp: datetime
+    archived: bool = False  # Kayıt sıcak tablodan değil arşiv dosyasından geldiyse True
+
+class AuditLogPage(BaseModel):
+    items: List[AuditLogEntry]
+    next_cursor: Optional[str] = None
+
+# --- Toplu İçe Aktarma (Bulk) Şemaları ---
+class BulkRowError(BaseModel):
+    index: int  # Kaydın istek gövdesindeki sıra numarası (0'dan başlar)
+    detail: str
+
+class BulkResult(BaseModel):
+    inserted: int = 0
+    errors: List[BulkRowError] = []
+
 # Diğer modeller için de benzer şekilde Base, Create ve Read (ana model) şemaları oluşturulabilir.
 # Örnek: Category, Service, City, District, PortfolioItem
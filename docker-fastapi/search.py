@@ -0,0 +1,354 @@
+# search.py
+
+# İş ilanı ve sağlayıcı araması ("Ankara boyacı" gibi) için gömülü, diskte tutulan ters indeks.
+# Arka uç olarak SQLite FTS5 kullanılır: ayrı bir dosyada durur, BM25 sıralamasını kendisi yapar
+# ve ana veritabanında `LIKE '%...%'` ile TEXT kolonlarını taramaya gerek bırakmaz.
+#
+# Belgeler:
+# - İş ilanı: başlık, açıklama ve yer metni (hizmet, ilçe, şehir adları).
+# - Sağlayıcı: firma adı, biyografi ve hizmet bölgelerinin yer metni.
+# Şehir/ilçe/hizmet filtreleri, her belgeye eklenen `facets` kolonundaki `svc12 dst34 cty6`
+# gibi belirteçlerle uygulanır; bu kolonun sıralamaya etkisi yoktur.
+#
+# Türkçe normalizasyon: metin ve sorgu aynı şekilde küçük harfe çevrilip katlanır
+# (İ/I/ı -> i, ş -> s, ğ -> g, ç -> c, ö -> o, ü -> u); "boyacı" ile "BOYACI" ve "boyaci" eşleşir.
+#
+# Güncelleme: ORM üzerinden yapılan Job/Provider/ProviderServiceArea yazmalarının id'leri commit
+# sonrasında `indexer` kuyruğuna eklenir; istek yolu indekse dokunmaz. Arka plandaki bir thread
+# kuyruğu SEARCH_REFRESH_INTERVAL saniyede bir boşaltır, değişen satırları birincilden okuyup
+# indekse yazar (sık değişen bir kayıt aralık başına bir kez yazılır). ORM dışı toplu yazmalar için
+# `rebuild()` (POST /admin/search/rebuild) çalıştırılmalıdır.
+#
+# İndeks dosyası import anında değil, uygulama açılışında `open_index()` ile açılır.
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, selectinload
+from . import metrics, models
+from .database import SessionLocal
+from .reference_cache import reference_cache
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "./search_index.db")
+SEARCH_REFRESH_INTERVAL = float(os.getenv("SEARCH_REFRESH_INTERVAL", "1"))
+
+REINDEX_FAILURES = metrics.Counter("search_reindex_failures_total", "Başarısız artımlı arama indeksi güncellemesi sayısı.")
+
+_FOLD = str.maketrans({
+    "ı": "i", "ş": "s", "ğ": "g", "ç": "c", "ö": "o", "ü": "u", "â": "a", "î": "i", "û": "u",
+})
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def normalize(text: str) -> str:
+    """Türkçe'ye duyarlı küçük harfe çevirme ve aksan katlama."""
+    if not text:
+        return ""
+    # str.lower() 'I' harfini 'i' yapar ve 'İ' harfini 'i̇' (nokta birleştiricisiyle) üretir;
+    # önce Türkçe büyük harfler elle çevrilir.
+    text = text.replace("İ", "i").replace("I", "ı").lower()
+    return text.translate(_FOLD)
+
+def tokenize(text: str):
+    return _TOKEN.findall(normalize(text))
+
+
+# Belge türü satır kimliğine (rowid) kodlanır: iş = 2*id, sağlayıcı = 2*id + 1.
+KIND_JOB = "job"
+KIND_PROVIDER = "provider"
+
+def _rowid(kind, ref_id):
+    return ref_id * 2 + (1 if kind == KIND_PROVIDER else 0)
+
+def _decode_rowid(rowid):
+    return (KIND_PROVIDER if rowid % 2 else KIND_JOB), rowid // 2
+
+
+def _place_text(pairs):
+    """(service_id, district_id) çiftlerinden yer metni ve filtre belirteçleri üretir."""
+    names, facets = [], set()
+    for service_id, district_id in pairs:
+        service = reference_cache.get_by_id("services", service_id)
+        district = reference_cache.get_by_id("districts", district_id)
+        city = reference_cache.get_by_id("cities", district.city_id) if district else None
+        names.extend(x.name for x in (service, district, city) if x is not None)
+        facets.update((f"svc{service_id}", f"dst{district_id}"))
+        if city is not None:
+            facets.add(f"cty{city.id}")
+    return " ".join(dict.fromkeys(names)), " ".join(sorted(facets))
+
+def job_document(job):
+    place, facets = _place_text([(job.service_id, job.district_id)])
+    return _rowid(KIND_JOB, job.id), job.title, job.description, place, facets
+
+def provider_document(provider, pairs):
+    place, facets = _place_text(pairs)
+    return _rowid(KIND_PROVIDER, provider.id), provider.company_name or "", provider.profile_bio or "", place, facets
+
+def _is_indexable_job(job):
+    return job.is_active and job.status == models.JobStatusEnum.open
+
+
+class SearchIndex:
+    """SQLite FTS5 üzerinde ters indeks."""
+
+    # bm25 kolon ağırlıkları: title, body, place, facets, label
+    WEIGHTS = (10.0, 3.0, 6.0, 0.0, 0.0)
+
+    def __init__(self, path=SEARCH_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5("
+            "title, body, place, facets, label UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM docs LIMIT 1").fetchone() is None
+
+    def _write(self, docs, delete_rowids=()):
+        # `label`, sonuç listesinde gösterilmek üzere başlığın normalize edilmemiş halidir.
+        rows = [
+            (rowid, normalize(title), normalize(body), normalize(place), facets, title)
+            for rowid, title, body, place, facets in docs
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM docs WHERE rowid = ?",
+                    [(r[0],) for r in rows] + [(rowid,) for rowid in delete_rowids],
+                )
+                self._conn.executemany(
+                    "INSERT INTO docs (rowid, title, body, place, facets, label) VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def reindex_jobs(self, db: Session, job_ids):
+        jobs = db.execute(select(models.Job).where(models.Job.id.in_(job_ids))).scalars().all()
+        docs = [job_document(job) for job in jobs if _is_indexable_job(job)]
+        indexed = {doc[0] for doc in docs}
+        self._write(docs, [r for r in (_rowid(KIND_JOB, i) for i in job_ids) if r not in indexed])
+
+    def reindex_providers(self, db: Session, provider_ids):
+        providers = db.execute(
+            select(models.Provider)
+            .options(selectinload(models.Provider.service_areas))
+            .where(models.Provider.id.in_(provider_ids))
+        ).scalars().all()
+        docs = [
+            provider_document(p, [(a.service_id, a.district_id) for a in p.service_areas if a.is_active])
+            for p in providers if p.is_active
+        ]
+        indexed = {doc[0] for doc in docs}
+        self._write(docs, [r for r in (_rowid(KIND_PROVIDER, i) for i in provider_ids) if r not in indexed])
+
+    def rebuild(self, db: Session, batch_size: int = 5000):
+        """İndeksi ORM modellerinden baştan, gruplar halinde oluşturur. Geriye belge sayısını döner."""
+        with self._lock:
+            self._conn.execute("DELETE FROM docs")
+        total = 0
+        batch = []
+        jobs = db.execute(
+            select(models.Job).where(
+                models.Job.is_active.is_(True), models.Job.status == models.JobStatusEnum.open
+            ).execution_options(yield_per=batch_size)
+        ).scalars()
+        for job in jobs:
+            batch.append(job_document(job))
+            if len(batch) >= batch_size:
+                self._write(batch)
+                total += len(batch)
+                batch = []
+        db.expunge_all()
+
+        # Sağlayıcı bölgeleri sağlayıcı sırasıyla okunur; ardışık satırlar tek belgede toplanır.
+        areas = db.execute(
+            select(
+                models.Provider.id, models.Provider.company_name, models.Provider.profile_bio,
+                models.ProviderServiceArea.service_id, models.ProviderServiceArea.district_id,
+            )
+            .outerjoin(models.ProviderServiceArea, (models.ProviderServiceArea.provider_id == models.Provider.id)
+                       & models.ProviderServiceArea.is_active.is_(True))
+            .where(models.Provider.is_active.is_(True))
+            .order_by(models.Provider.id)
+            .execution_options(yield_per=batch_size)
+        )
+        current, pairs = None, []
+        for row in areas:
+            if current is not None and current.id != row.id:
+                batch.append(provider_document(current, pairs))
+                pairs = []
+            current = row
+            if row.service_id is not None:
+                pairs.append((row.service_id, row.district_id))
+            if len(batch) >= batch_size:
+                self._write(batch)
+                total += len(batch)
+                batch = []
+        if current is not None:
+            batch.append(provider_document(current, pairs))
+        self._write(batch)
+        with self._lock:
+            self._conn.execute("INSERT INTO docs(docs) VALUES ('optimize')")
+        return total + len(batch)
+
+    def search(self, q: str, kind=None, city_id=None, district_id=None, service_id=None, limit=20, offset=0):
+        """
+        BM25'e göre sıralanmış sonuçları [(tür, id, başlık, skor)] olarak döndürür.
+        Son sorgu kelimesi önek (prefix) olarak eşleşir; diğer kelimelerin hepsi bulunmalıdır.
+        """
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        terms = ['"%s"' % t for t in tokens[:-1]] + ['"%s"*' % tokens[-1]]
+        expression = "{title body place} : (%s)" % " AND ".join(terms)
+        facets = []
+        if city_id is not None:
+            facets.append(f"cty{int(city_id)}")
+        if district_id is not None:
+            facets.append(f"dst{int(district_id)}")
+        if service_id is not None:
+            facets.append(f"svc{int(service_id)}")
+        if facets:
+            expression += " AND facets : (%s)" % " AND ".join(facets)
+
+        sql = "SELECT rowid, label, bm25(docs, %s) AS score FROM docs WHERE docs MATCH ?" % ", ".join(map(str, self.WEIGHTS))
+        params = [expression]
+        if kind is not None:
+            sql += " AND (rowid % 2) = ?"
+            params.append(1 if kind == KIND_PROVIDER else 0)
+        sql += " ORDER BY score LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        # bm25() daha iyi eşleşmeler için daha küçük (negatif) değer üretir.
+        return [(*_decode_rowid(rowid), label, -score) for rowid, label, score in rows]
+
+
+# Uygulama açılışında `open_index()` ile atanır; SEARCH_INDEX_PATH boşsa arama devre dışıdır.
+index = None
+
+def open_index(path=SEARCH_INDEX_PATH):
+    """İndeks dosyasını açar (yoksa oluşturur) ve döndürür; yol tanımlı değilse None."""
+    global index
+    if index is None and path:
+        index = SearchIndex(path)
+    return index
+
+
+# --- Artımlı güncelleme ---
+
+class Indexer:
+    """Değişen iş ve sağlayıcı id'lerini biriktirip arka planda indekse yazan thread."""
+
+    def __init__(self, interval=SEARCH_REFRESH_INTERVAL):
+        self.interval = interval
+        self._job_ids, self._provider_ids = set(), set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        metrics.Gauge(
+            "search_pending_documents", "İndekse yazılmayı bekleyen iş ve sağlayıcı sayısı.",
+            lambda: len(self._job_ids) + len(self._provider_ids),
+        )
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="search-indexer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Thread'i durdurur ve bekleyen değişiklikleri uygular."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+        self.flush()
+
+    def _add(self, job_ids, provider_ids):
+        with self._lock:
+            self._job_ids.update(job_ids)
+            self._provider_ids.update(provider_ids)
+
+    def mark(self, job_ids=(), provider_ids=()):
+        """İşleri ve sağlayıcıları bir sonraki güncellemede yeniden indekslenmek üzere kuyruğa ekler."""
+        self._add(job_ids, provider_ids)
+        if self._thread is None:
+            self.start()
+
+    def flush(self):
+        """Biriken değişiklikleri hemen indekse yazar. Geriye yeniden indekslenen kayıt sayısını döner."""
+        with self._lock:
+            job_ids, provider_ids = self._job_ids, self._provider_ids
+            self._job_ids, self._provider_ids = set(), set()
+        if index is None or not (job_ids or provider_ids):
+            return 0
+        db = SessionLocal()
+        try:
+            if job_ids:
+                index.reindex_jobs(db, job_ids)
+            if provider_ids:
+                index.reindex_providers(db, provider_ids)
+        except Exception:
+            REINDEX_FAILURES.inc()
+            logger.exception("Arama indeksi güncellenemedi; bir sonraki aralıkta yeniden denenecek.")
+            self._add(job_ids, provider_ids)
+            return 0
+        finally:
+            db.close()
+        return len(job_ids) + len(provider_ids)
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.flush()
+
+
+indexer = Indexer()
+
+
+# --- ORM olaylarıyla değişiklik toplama ---
+
+_PENDING_KEY = "search_pending"
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    if not SEARCH_INDEX_PATH:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, (set(), set()))
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, models.Job):
+            pending[0].add(obj.id)
+        elif isinstance(obj, models.Provider):
+            pending[1].add(obj.id)
+        elif isinstance(obj, models.ProviderServiceArea):
+            pending[1].add(obj.provider_id)
+
+def mark_jobs_changed(session, job_ids):
+    """ORM dışı (Core) yazmalarla değişen işleri, oturumun işlemi commit edilince yeniden indeksler."""
+    if SEARCH_INDEX_PATH:
+        session.info.setdefault(_PENDING_KEY, (set(), set()))[0].update(job_ids)
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    # Yalnızca id'ler kuyruğa eklenir; indeksleme istek yolunda (veya olay döngüsünde) yapılmaz.
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and (pending[0] or pending[1]):
+        indexer.mark(*pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
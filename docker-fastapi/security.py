@@ -0,0 +1,124 @@
+# security.py
+
+# Şifre hash'leme ve doğrulama işlemleri.
+# bcrypt her çağrıda 100-300 ms CPU harcar ve bu süre boyunca GIL'i tutar. İstek thread'lerinde
+# çalıştırıldığında kayıt (sign-up) patlamaları diğer tüm endpoint'leri aç bırakır. Bu yüzden
+# hash'leme ayrı süreçlerden oluşan, boyutu sınırlı bir havuzda yapılır ve kuyruk dolduğunda
+# istek bekletilmek yerine `HashingBusyError` ile reddedilir (API katmanında 503).
+#
+# Ortam değişkenleri:
+# - BCRYPT_ROUNDS: bcrypt maliyet faktörü. Değiştirildiğinde eski hash'ler, kullanıcı bir
+#   sonraki girişinde doğrulanırken yeni maliyetle yeniden hash'lenir.
+# - HASH_POOL_WORKERS: hash süreç sayısı. 0 verilirse işlem çağıran thread'de yapılır
+#   (geliştirme ve testler için).
+# - HASH_QUEUE_LIMIT: aynı anda havuzda bekleyebilecek/çalışabilecek en fazla iş.
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", "2"))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "32"))
+
+
+class HashingBusyError(Exception):
+    """Hash havuzunun kuyruğu dolu olduğunda fırlatılır."""
+
+
+_contexts = {}
+
+def _get_context(rounds: int) -> CryptContext:
+    # min/max rounds, yapılandırılan maliyete eşitlenir; böylece farklı maliyetle üretilmiş
+    # hash'ler `verify_and_update` tarafından yeniden hash'lenmesi gereken olarak işaretlenir.
+    context = _contexts.get(rounds)
+    if context is None:
+        context = _contexts[rounds] = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+    return context
+
+# Hash süreçlerinde çalışan fonksiyonlar (pickle edilebilmeleri için modül seviyesinde).
+def _hash(password: str, rounds: int) -> str:
+    return _get_context(rounds).hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str, rounds: int):
+    return _get_context(rounds).verify_and_update(plain_password, hashed_password)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=HASH_POOL_WORKERS)
+    return _executor
+
+def _submit(fn, *args, block: bool = False) -> Future:
+    """
+    İşi hash havuzuna gönderir. Kuyruk doluysa `block=False` iken beklemeden
+    `HashingBusyError` fırlatır, `block=True` iken yer açılmasını bekler.
+    """
+    if HASH_POOL_WORKERS <= 0:
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+    if not _slots.acquire(blocking=block):
+        raise HashingBusyError("Şifre işleme kuyruğu dolu.")
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+def shutdown():
+    """Uygulama kapanırken hash süreçlerini sonlandırır."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def hash_password(password: str) -> str:
+    """Verilen şifreyi hash havuzunda hash'ler."""
+    return _submit(_hash, password, BCRYPT_ROUNDS).result()
+
+async def hash_password_async(password: str) -> str:
+    """`hash_password`'ün olay döngüsünü bloklamayan karşılığı."""
+    return await asyncio.wrap_future(_submit(_hash, password, BCRYPT_ROUNDS))
+
+def hash_passwords(passwords):
+    """
+    Toplu içe aktarma için şifreleri sırayla hash'ler. Havuza aynı anda en fazla işçi sayısı
+    kadar iş gönderilir; böylece eşzamanlı kayıt istekleri toplu işin arkasında uzun süre
+    beklemez. Kuyruk doluysa reddetmek yerine yer açılmasını bekler.
+    """
+    window = max(HASH_POOL_WORKERS, 1)
+    hashes = []
+    for start in range(0, len(passwords), window):
+        futures = [_submit(_hash, p, BCRYPT_ROUNDS, block=True) for p in passwords[start:start + window]]
+        hashes.extend(future.result() for future in futures)
+    return hashes
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Şifreyi doğrular. Geriye (doğru_mu, yeni_hash) döner; hash mevcut BCRYPT_ROUNDS ile
+    üretilmemişse `yeni_hash` yeni maliyetle üretilmiş hash'tir, aksi halde None'dır.
+    """
+    return _submit(_verify_and_update, plain_password, hashed_password, BCRYPT_ROUNDS).result()
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verilen düz metin şifre ile hash'lenmiş şifreyi karşılaştırır."""
+    return verify_and_update_password(plain_password, hashed_password)[0]
@@ -0,0 +1,494 @@
+# seo.py
+
+# Programatik SEO sayfaları ("İzmir avukat", "Kadıköy boyacı") için önceden hesaplanmış özetler.
+# Bir sayfa hizmeti, şehri/ilçeyi, o bölgede hizmet veren sağlayıcıları (provider_service_areas),
+# puan istatistiklerini ve son işleri gösterir. Bunları her görüntülemede birkaç join ile toplamak
+# yerine her aktif (hizmet, ilçe) ve (hizmet, şehir) çifti için tek bir özet satırı tutulur
+# (seo_district_pages, seo_city_pages); sayfa endpoint'leri yalnızca bu satırı okur.
+# Aktif çift: en az bir aktif sağlayıcının hizmet verdiği veya açık işi bulunan çift.
+#
+# Güncelleme:
+# - Tam oluşturma (`build`): hizmetler SEO_BUILD_WORKERS süreç arasında paylaştırılır, her
+#   hizmetin satırları kendi işleminde değiştirilir; tablolar boşaltılmadığından sayfalar
+#   oluşturma sırasında da sunulur.
+# - Artımlı: ORM üzerinden değişen iş, sağlayıcı ve hizmet bölgeleri ile puan özeti güncellenen
+#   sağlayıcılar commit sonrasında "kirli" olarak işaretlenir. Arka plandaki bir thread bunları
+#   SEO_REFRESH_INTERVAL saniyede bir toplar ve yalnızca etkilenen ilçe/şehir satırlarını yeniden
+#   hesaplar; sık değişen bir çift aralık başına bir kez hesaplanır. İşaretler süreç belleğinde
+#   tutulduğundan ORM dışı yazmalar ve çökmeler için tam oluşturma periyodik çalıştırılmalıdır.
+#
+# Site haritaları hizmet başına parçalara (shard) bölünür; bir parça en fazla şehir + ilçe sayısı
+# kadar URL içerdiğinden 50.000 sınırının altında kalır. Parçalar özet tablolarından akış halinde
+# okunup yazılır.
+#
+# Komut satırından kullanım:
+#   python -m app seo build --workers 8
+#   python -m app seo sitemaps ./public/sitemaps
+
+import argparse
+import decimal
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+from sqlalchemy import case, delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+from . import metrics, models
+from .database import engine
+from .reference_cache import reference_cache
+
+logger = logging.getLogger(__name__)
+
+SEO_BUILD_WORKERS = int(os.getenv("SEO_BUILD_WORKERS", str(os.cpu_count() or 1)))
+SEO_REFRESH_INTERVAL = float(os.getenv("SEO_REFRESH_INTERVAL", "5"))
+SEO_TOP_PROVIDERS = int(os.getenv("SEO_TOP_PROVIDERS", "10"))
+SEO_RECENT_JOBS = int(os.getenv("SEO_RECENT_JOBS", "5"))
+# Site haritasındaki sayfa adresleri ön yüzün (Next.js) adresiyle üretilir.
+SEO_BASE_URL = os.getenv("SEO_BASE_URL", "http://localhost:3000").rstrip("/")
+SITEMAP_BATCH_SIZE = int(os.getenv("SITEMAP_BATCH_SIZE", "2000"))
+
+Area = models.ProviderServiceArea
+DistrictPage = models.SeoDistrictPage
+CityPage = models.SeoCityPage
+Job = models.Job
+
+# Sayfalarda listelenen işler; iptal edilenler gösterilmez.
+LISTED_JOB_STATUSES = (models.JobStatusEnum.open, models.JobStatusEnum.assigned, models.JobStatusEnum.completed)
+
+PAGES_WRITTEN = metrics.Counter("seo_pages_written_total", "Yeniden hesaplanıp yazılan SEO sayfa özeti sayısı.", ["mode"])
+REFRESH_FAILURES = metrics.Counter("seo_refresh_failures_total", "Başarısız artımlı SEO güncellemesi sayısı.")
+
+
+# --- Özet hesaplama ---
+
+def _districts_by_city():
+    """(ilçe id -> şehir id, şehir id -> ilçe id listesi)"""
+    city_of, by_city = {}, {}
+    for district in reference_cache.get("districts").rows:
+        city_of[district.id] = district.city_id
+        by_city.setdefault(district.city_id, []).append(district.id)
+    return city_of, by_city
+
+
+def _page_values(providers, open_job_count, last_job_at, jobs):
+    """
+    Bir sayfanın kolon değerleri. `providers`: {sağlayıcı id: (firma adı, ortalama, yorum sayısı,
+    puan toplamı)}, `jobs`: [(id, başlık, durum, oluşturulma)]. Çift aktif değilse None döner.
+    """
+    if not providers and not open_job_count:
+        return None
+    review_count = sum(p[2] for p in providers.values())
+    rating_sum = sum(p[3] for p in providers.values())
+    rating_avg = (decimal.Decimal(rating_sum) / review_count).quantize(decimal.Decimal("0.01")) if review_count else 0
+    top = sorted(providers.items(), key=lambda item: (-item[1][1], -item[1][2], item[0]))[:SEO_TOP_PROVIDERS]
+    recent = sorted(jobs, key=lambda job: (job[3], job[0]), reverse=True)[:SEO_RECENT_JOBS]
+    return {
+        "provider_count": len(providers),
+        "review_count": review_count,
+        "rating_avg": rating_avg,
+        "open_job_count": open_job_count,
+        "top_providers": [
+            {"id": provider_id, "company_name": name, "rating_avg": float(avg), "review_count": count}
+            for provider_id, (name, avg, count, _) in top
+        ],
+        "recent_jobs": [
+            {"id": job_id, "title": title, "status": status.value, "created_at": created_at.isoformat()}
+            for job_id, title, status, created_at in recent
+        ],
+        "last_job_at": last_job_at,
+    }
+
+
+def _compute(conn, service_id, city_of, district_ids=None):
+    """
+    Bir hizmetin ilçe ve şehir sayfalarını üç sorguyla hesaplar (sağlayıcılar, iş sayıları, son
+    işler). `district_ids` verilirse yalnızca o ilçeler okunur; şehir satırlarının eksiksiz olması
+    için şehirlerin tüm ilçeleri verilmelidir. Geriye (ilçe satırları, şehir satırları) döner.
+    """
+    area_filter = [Area.service_id == service_id, Area.is_active.is_(True), models.Provider.is_active.is_(True)]
+    job_filter = [Job.service_id == service_id, Job.is_active.is_(True), Job.status.in_(LISTED_JOB_STATUSES)]
+    if district_ids is not None:
+        area_filter.append(Area.district_id.in_(district_ids))
+        job_filter.append(Job.district_id.in_(district_ids))
+
+    Summary = models.ProviderRatingSummary
+    providers = {}
+    for district_id, provider_id, *values in conn.execute(
+        select(
+            Area.district_id, models.Provider.id, models.Provider.company_name,
+            func.coalesce(Summary.rating_avg, 0), func.coalesce(Summary.review_count, 0),
+            func.coalesce(Summary.rating_sum, 0),
+        )
+        .join(models.Provider, models.Provider.id == Area.provider_id)
+        .outerjoin(Summary, Summary.provider_id == models.Provider.id)
+        .where(*area_filter)
+    ):
+        providers.setdefault(district_id, {})[provider_id] = tuple(values)
+
+    job_stats = {
+        district_id: (open_count or 0, last_job_at)
+        for district_id, open_count, last_job_at in conn.execute(
+            select(
+                Job.district_id,
+                func.sum(case((Job.status == models.JobStatusEnum.open, 1), else_=0)),
+                func.max(Job.created_at),
+            )
+            .where(*job_filter)
+            .group_by(Job.district_id)
+        )
+    }
+
+    # İlçe başına en yeni SEO_RECENT_JOBS iş; bir şehrin en yenileri ilçelerinkinin birleşiminden seçilir.
+    rank = func.row_number().over(partition_by=Job.district_id, order_by=(Job.created_at.desc(), Job.id.desc()))
+    ranked = select(Job.id, Job.district_id, Job.title, Job.status, Job.created_at, rank.label("rank")).where(*job_filter).subquery()
+    recent_jobs = {}
+    for row in conn.execute(
+        select(ranked.c.id, ranked.c.district_id, ranked.c.title, ranked.c.status, ranked.c.created_at)
+        .where(ranked.c.rank <= SEO_RECENT_JOBS)
+    ):
+        recent_jobs.setdefault(row.district_id, []).append((row.id, row.title, row.status, row.created_at))
+
+    district_rows, city_parts = [], {}
+    for district_id in providers.keys() | job_stats.keys():
+        city_id = city_of.get(district_id)
+        if city_id is None:
+            continue
+        part = (providers.get(district_id, {}), *job_stats.get(district_id, (0, None)), recent_jobs.get(district_id, []))
+        values = _page_values(*part)
+        if values is not None:
+            district_rows.append({"service_id": service_id, "district_id": district_id, **values})
+        city_parts.setdefault(city_id, []).append(part)
+
+    city_rows = []
+    for city_id, parts in city_parts.items():
+        # Birden çok ilçede hizmet veren sağlayıcı şehir sayfasında bir kez sayılır.
+        city_providers = {}
+        for part in parts:
+            city_providers.update(part[0])
+        values = _page_values(
+            city_providers,
+            sum(part[1] for part in parts),
+            max((part[2] for part in parts if part[2] is not None), default=None),
+            [job for part in parts for job in part[3]],
+        )
+        if values is not None:
+            city_rows.append({"service_id": service_id, "city_id": city_id, **values})
+    return district_rows, city_rows
+
+
+def refresh_service(service_id, district_ids=None):
+    """
+    Bir hizmetin sayfalarını yeniden hesaplar ve tek işlemde yazar. `district_ids` verilirse
+    yalnızca bu ilçelerin ve bağlı oldukları şehirlerin satırları değişir; verilmezse hizmetin
+    tüm satırları değiştirilir. Geriye yazılan satır sayısını döner.
+    """
+    city_of, by_city = _districts_by_city()
+    city_ids = None
+    if district_ids is not None:
+        city_ids = {city_of[d] for d in district_ids if d in city_of}
+        district_ids = [d for city_id in city_ids for d in by_city[city_id]]
+        if not district_ids:
+            return 0
+    with engine.connect() as conn:
+        district_rows, city_rows = _compute(conn, service_id, city_of, district_ids)
+
+    stale_districts = delete(DistrictPage).where(DistrictPage.service_id == service_id)
+    stale_cities = delete(CityPage).where(CityPage.service_id == service_id)
+    if district_ids is not None:
+        stale_districts = stale_districts.where(DistrictPage.district_id.in_(district_ids))
+        stale_cities = stale_cities.where(CityPage.city_id.in_(city_ids))
+    with engine.begin() as conn:
+        conn.execute(stale_districts)
+        conn.execute(stale_cities)
+        if district_rows:
+            conn.execute(insert(DistrictPage), district_rows)
+        if city_rows:
+            conn.execute(insert(CityPage), city_rows)
+    return len(district_rows) + len(city_rows)
+
+
+def _init_worker():
+    # fork ile oluşturulan süreç, üst sürecin havuzdaki bağlantılarını kullanmamalıdır.
+    engine.dispose(close=False)
+
+def _build_service(service_id):
+    return refresh_service(service_id)
+
+def build(workers=SEO_BUILD_WORKERS):
+    """
+    Tüm sayfa özetlerini baştan hesaplar; aktif hizmetler `workers` süreç arasında paylaştırılır.
+    Pasif veya silinmiş hizmetlerin sayfaları kaldırılır. Geriye yazılan satır sayısını döner.
+    """
+    with engine.connect() as conn:
+        service_ids = conn.execute(
+            select(models.Service.id).where(models.Service.is_active.is_(True)).order_by(models.Service.id)
+        ).scalars().all()
+    with engine.begin() as conn:
+        conn.execute(delete(DistrictPage).where(DistrictPage.service_id.not_in(service_ids)))
+        conn.execute(delete(CityPage).where(CityPage.service_id.not_in(service_ids)))
+
+    if workers <= 1 or len(service_ids) <= 1:
+        total = sum(map(_build_service, service_ids))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            total = sum(executor.map(_build_service, service_ids, chunksize=max(1, len(service_ids) // (workers * 4))))
+    PAGES_WRITTEN.inc(total, mode="full")
+    return total
+
+
+def get_page(db: Session, service_id: int, city_id: int, district_id: int = None):
+    """Şehir (district_id verilmezse) veya ilçe sayfasının özet satırı; sayfa yoksa None."""
+    if district_id is None:
+        return db.get(CityPage, (service_id, city_id))
+    return db.get(DistrictPage, (service_id, district_id))
+
+
+# --- Artımlı güncelleme ---
+
+def _resolve_pairs(provider_ids, job_ids):
+    """Değişen sağlayıcı ve işlerin etkilediği (service_id, district_id) çiftleri."""
+    pairs = set()
+    with engine.connect() as conn:
+        if provider_ids:
+            # Pasif bölgeler de dahildir: pasife çekilen bölge veya sağlayıcı sayfadan düşmelidir.
+            pairs.update(conn.execute(
+                select(Area.service_id, Area.district_id).where(Area.provider_id.in_(provider_ids))
+            ).tuples())
+        if job_ids:
+            pairs.update(conn.execute(select(Job.service_id, Job.district_id).where(Job.id.in_(job_ids))).tuples())
+    return pairs
+
+
+class Refresher:
+    """Kirli çiftleri biriktirip arka planda toplu olarak yeniden hesaplayan thread."""
+
+    def __init__(self, interval=SEO_REFRESH_INTERVAL):
+        self.interval = interval
+        self._pairs, self._provider_ids, self._job_ids = set(), set(), set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        metrics.Gauge(
+            "seo_dirty_pairs", "Yeniden hesaplanmayı bekleyen (hizmet, ilçe) çifti sayısı.", lambda: len(self._pairs)
+        )
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="seo-refresher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Thread'i durdurur ve bekleyen değişiklikleri uygular."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+        self.flush()
+
+    def _add(self, pairs, provider_ids, job_ids):
+        with self._lock:
+            self._pairs.update(pairs)
+            self._provider_ids.update(provider_ids)
+            self._job_ids.update(job_ids)
+
+    def mark(self, pairs=(), provider_ids=(), job_ids=()):
+        """Çiftleri, sağlayıcıları veya işleri bir sonraki güncelleme için kirli olarak işaretler."""
+        self._add(pairs, provider_ids, job_ids)
+        if self._thread is None:
+            self.start()
+
+    def flush(self):
+        """Biriken değişiklikleri hemen uygular. Geriye yazılan satır sayısını döner."""
+        with self._lock:
+            pairs, provider_ids, job_ids = self._pairs, self._provider_ids, self._job_ids
+            self._pairs, self._provider_ids, self._job_ids = set(), set(), set()
+        if not (pairs or provider_ids or job_ids):
+            return 0
+        try:
+            by_service = {}
+            for service_id, district_id in pairs | _resolve_pairs(provider_ids, job_ids):
+                by_service.setdefault(service_id, set()).add(district_id)
+            written = sum(refresh_service(service_id, district_ids) for service_id, district_ids in by_service.items())
+        except Exception:
+            # Eşzamanlı bir güncellemeyle çakışma (kilitlenme, yinelenen anahtar) veya bağlantı
+            # hatası: değişiklikler bir sonraki aralıkta yeniden denenir.
+            REFRESH_FAILURES.inc()
+            logger.exception("SEO sayfaları güncellenemedi; bir sonraki aralıkta yeniden denenecek.")
+            self._add(pairs, provider_ids, job_ids)
+            return 0
+        PAGES_WRITTEN.inc(written, mode="incremental")
+        return written
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.flush()
+
+
+refresher = Refresher()
+
+
+# --- ORM olaylarıyla kirli işaretleme ---
+
+_PENDING_KEY = "seo_pending"
+
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, (set(), set(), set()))
+
+def _changed_pairs(obj):
+    """
+    Nesnenin (service_id, district_id) çifti; hizmet veya ilçe bu flush'ta değiştiyse önceki
+    çift de döner (ilan/bölge eski sayfadan da çıkmalıdır). after_flush'ta öznitelik geçmişi
+    henüz sıfırlanmamıştır.
+    """
+    pairs = {(obj.service_id, obj.district_id)}
+    attrs = inspect(obj).attrs
+    service, district = attrs.service_id.history, attrs.district_id.history
+    if service.deleted or district.deleted:
+        pairs.add((
+            service.deleted[0] if service.deleted else obj.service_id,
+            district.deleted[0] if district.deleted else obj.district_id,
+        ))
+    return pairs
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (models.Job, models.ProviderServiceArea)):
+            _pending(session)[0].update(_changed_pairs(obj))
+        elif isinstance(obj, models.Provider):
+            _pending(session)[1].add(obj.id)
+
+def mark_providers_changed(session, provider_ids):
+    """ORM dışı yazmalarla (ör. puan özeti) değişen sağlayıcıların sayfalarını commit sonrasında günceller."""
+    _pending(session)[1].update(provider_ids)
+
+def mark_jobs_changed(session, job_ids):
+    """ORM dışı yazmalarla (ör. durum geçişleri) değişen işlerin sayfalarını commit sonrasında günceller."""
+    _pending(session)[2].update(job_ids)
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and any(pending):
+        refresher.mark(*pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# --- Site haritaları ---
+
+_URLSET_OPEN = b'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_CLOSE = b"</urlset>\n"
+_INDEX_OPEN = b'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_INDEX_CLOSE = b"</sitemapindex>\n"
+
+
+def page_path(service, city, district=None):
+    """Sayfanın ön yüzdeki yolu: /izmir/avukat veya /izmir/karsiyaka/avukat."""
+    return "/" + "/".join([city.slug, *([district.slug] if district else []), service.slug])
+
+def sitemap_path(service):
+    return f"/sitemaps/seo/{service.slug}.xml"
+
+def _entry(tag, loc, lastmod):
+    body = "<loc>%s</loc>" % escape(SEO_BASE_URL + loc)
+    if lastmod is not None:
+        body += "<lastmod>%s</lastmod>" % lastmod.date().isoformat()
+    return f"<{tag}>{body}</{tag}>\n"
+
+
+def stream_sitemap_index(batch_size=SITEMAP_BATCH_SIZE):
+    """Sayfası olan her hizmetin site haritası parçasını listeleyen dizini bayt parçaları halinde üretir."""
+    services = reference_cache.get("services").by_id
+
+    def chunks():
+        yield _INDEX_OPEN
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+                select(CityPage.service_id, func.max(CityPage.last_job_at))
+                .group_by(CityPage.service_id)
+                .order_by(CityPage.service_id)
+            )
+            for rows in result.partitions():
+                yield "".join(
+                    _entry("sitemap", sitemap_path(services[service_id]), lastmod)
+                    for service_id, lastmod in rows if service_id in services
+                ).encode("utf-8")
+        yield _INDEX_CLOSE
+
+    return chunks()
+
+
+def stream_sitemap(service, batch_size=SITEMAP_BATCH_SIZE):
+    """Bir hizmetin şehir ve ilçe sayfalarını içeren site haritası parçasını bayt parçaları halinde üretir."""
+    cities = reference_cache.get("cities").by_id
+    districts = reference_cache.get("districts").by_id
+
+    def city_entries(rows):
+        for city_id, lastmod in rows:
+            if city_id in cities:
+                yield _entry("url", page_path(service, cities[city_id]), lastmod)
+
+    def district_entries(rows):
+        for district_id, lastmod in rows:
+            district = districts.get(district_id)
+            if district is not None and district.city_id in cities:
+                yield _entry("url", page_path(service, cities[district.city_id], district), lastmod)
+
+    def chunks():
+        yield _URLSET_OPEN
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, yield_per=batch_size)
+            for key, entries in ((CityPage.city_id, city_entries), (DistrictPage.district_id, district_entries)):
+                table = key.class_
+                result = conn.execute(
+                    select(key, table.last_job_at).where(table.service_id == service.id).order_by(key)
+                )
+                for rows in result.partitions():
+                    yield "".join(entries(rows)).encode("utf-8")
+        yield _URLSET_CLOSE
+
+    return chunks()
+
+
+def write_sitemaps(directory):
+    """Dizini (`seo.xml`) ve hizmet parçalarını (`seo/<hizmet>.xml`) `directory` altına yazar. Geriye parça sayısını döner."""
+    os.makedirs(os.path.join(directory, "seo"), exist_ok=True)
+    with open(os.path.join(directory, "seo.xml"), "wb") as f:
+        f.writelines(stream_sitemap_index())
+    with engine.connect() as conn:
+        service_ids = conn.execute(select(CityPage.service_id).distinct()).scalars().all()
+    shards = 0
+    for service_id in service_ids:
+        service = reference_cache.get_by_id("services", service_id)
+        if service is None:
+            continue
+        with open(os.path.join(directory, "seo", f"{service.slug}.xml"), "wb") as f:
+            f.writelines(stream_sitemap(service))
+        shards += 1
+    return shards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Programatik SEO sayfa özetlerini ve site haritalarını üretir.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Tüm sayfa özetlerini baştan hesaplar.")
+    build_parser.add_argument("--workers", type=int, default=SEO_BUILD_WORKERS)
+    sitemaps_parser = commands.add_parser("sitemaps", help="Site haritalarını bir dizine yazar.")
+    sitemaps_parser.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        print(f"{build(workers=args.workers)} sayfa yazıldı.")
+    else:
+        print(f"{write_sitemaps(args.directory)} site haritası parçası yazıldı.")
+
+
+if __name__ == "__main__":
+    main()
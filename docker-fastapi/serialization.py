@@ -0,0 +1,40 @@
+# serialization.py
+
+# Liste endpoint'leri için hızlı yanıt kodlama yolu (FAST_SERIALIZATION=1 ile açılır).
+# Varsayılan yolda her satır önce ORM nesnesine dönüşür, ardından `response_model` için
+# `from_attributes` ile alan alan Pydantic modeline doğrulanır ve en son JSON'a kodlanır.
+# Hızlı yolda yalnızca şemanın alanlarına karşılık gelen kolonlar tuple olarak seçilir ve
+# satırlar orjson ile doğrudan bayta kodlanır; endpoint hazır bir `Response` döndürür.
+#
+# Çıktı, varsayılan yolla aynı alanları aynı sırada içerir. Kolon listesi Pydantic şemasının
+# alanlarından türetildiği için şemaya eklenen bir alan otomatik olarak seçilir.
+
+import os
+import orjson
+from fastapi.responses import Response
+from . import models, schemas
+
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+# Pydantic, UTC saat dilimli tarihleri "Z" ile yazar; orjson'ın da aynısını yapması sağlanır.
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def columns_for(model, schema):
+    """Şemanın alan sırasıyla, modelin karşılık gelen kolonları."""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+USER_COLUMNS = columns_for(models.User, schemas.User)
+JOB_COLUMNS = columns_for(models.Job, schemas.Job)
+
+
+def _items(rows):
+    # orjson tarih ve Enum değerlerini kendisi kodlar (Enum için `.value`).
+    return [row._asdict() for row in rows]
+
+def list_response(rows) -> Response:
+    return Response(content=orjson.dumps(_items(rows), option=_ORJSON_OPTIONS), media_type="application/json")
+
+def page_response(rows, next_cursor) -> Response:
+    body = {"items": _items(rows), "next_cursor": next_cursor}
+    return Response(content=orjson.dumps(body, option=_ORJSON_OPTIONS), media_type="application/json")
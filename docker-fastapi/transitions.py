@@ -0,0 +1,108 @@
+# transitions.py
+
+# İş ilanı ve teklif durum geçişleri.
+# Durum, önce okunup Python'da kontrol edildikten sonra yazılırsa (read-modify-write) aynı işe
+# gelen eşzamanlı iki kabulün ikisi de 'open' görür ve iş iki kez atanır; bunu önlemek için satırı
+# SELECT ... FOR UPDATE ile kilitlemek ise kilidi tüm istek boyunca tutar. Burada her geçiş tek bir
+# koşullu UPDATE'tir:
+#
+#   UPDATE jobs SET status='assigned' WHERE id=:id AND status='open' AND is_active
+#
+# Etkilenen satır sayısı 0 ise başka bir işlem durumu zaten değiştirmiştir ve
+# `TransitionConflictError` fırlatılır (API katmanında 409). Kilit yalnızca bu UPDATE'ten
+# commit'e kadar tutulur.
+#
+# Geçişler Core UPDATE olduğundan ORM olaylarını tetiklemez; denetim kayıtları, arama indeksi ve
+# SEO sayfası güncellemeleri aynı oturuma iliştirilir ve yalnızca işlem commit edilirse uygulanır.
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from . import audit, models, search, seo
+
+JobStatus = models.JobStatusEnum
+OfferStatus = models.OfferStatusEnum
+
+# model -> {mevcut durum: izin verilen hedef durumlar}
+ALLOWED = {
+    models.Job: {
+        JobStatus.open: {JobStatus.assigned, JobStatus.cancelled},
+        JobStatus.assigned: {JobStatus.completed, JobStatus.cancelled},
+    },
+    models.Offer: {
+        OfferStatus.pending: {OfferStatus.accepted, OfferStatus.rejected, OfferStatus.withdrawn},
+    },
+}
+
+
+class TransitionConflictError(Exception):
+    """Kaydın durumu beklenen durum olmadığı için geçiş uygulanamadığında fırlatılır."""
+
+
+def _check_allowed(model, from_status, to_status):
+    if to_status not in ALLOWED[model].get(from_status, ()):
+        raise ValueError(f"{model.__tablename__}: {from_status.value} -> {to_status.value} geçişi tanımlı değil.")
+
+
+def _base_criteria(model, from_status):
+    """Her geçişte geçerli koşullar: kayıt `from_status` durumunda ve aktif olmalıdır."""
+    return (model.status == from_status, model.is_active.is_(True))
+
+
+def _after_update(db: Session, model, record_ids, from_status, to_status):
+    for record_id in record_ids:
+        audit.record_in_session(
+            db, models.AuditActionEnum.UPDATE, model.__tablename__, record_id,
+            {"status": from_status.value}, {"status": to_status.value},
+        )
+    if model is models.Job:
+        search.mark_jobs_changed(db, record_ids)
+        seo.mark_jobs_changed(db, record_ids)
+
+
+def transition(db: Session, model, record_id: int, from_status, to_status, *criteria):
+    """
+    Tek bir kaydı `from_status` durumundan `to_status` durumuna geçirir. Commit etmez.
+    `criteria` ile ek koşullar verilebilir (ör. teklifin belirli bir işe ait olması).
+    Kayıt bulunamazsa, pasifse veya durumu farklıysa `TransitionConflictError` fırlatır.
+    """
+    _check_allowed(model, from_status, to_status)
+    result = db.execute(
+        update(model)
+        .where(model.id == record_id, *_base_criteria(model, from_status), *criteria)
+        .values(status=to_status)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise TransitionConflictError(
+            f"{model.__tablename__} #{record_id} '{from_status.value}' durumunda değil."
+        )
+    _after_update(db, model, [record_id], from_status, to_status)
+
+
+def transition_all(db: Session, model, from_status, to_status, *criteria) -> list:
+    """
+    `criteria` koşullarına uyan, `from_status` durumunda ve aktif olan tüm kayıtları tek bir set tabanlı
+    UPDATE ile `to_status` durumuna geçirir. Commit etmez; geçirilen kayıtların id'lerini döndürür.
+    Denetim kayıtları yalnızca gerçekten değişen satırlar için yazılır: id'ler UPDATE ... RETURNING
+    ile alınır. RETURNING desteklemeyen sürücülerde (MySQL) satırlar önce SELECT ... FOR UPDATE ile
+    kilitlenir; kilitli satırlar UPDATE'e kadar değişemeyeceğinden okunan id'lerin hepsi geçirilir.
+    """
+    _check_allowed(model, from_status, to_status)
+    criteria = (*_base_criteria(model, from_status), *criteria)
+    stmt = (
+        update(model)
+        .where(*criteria)
+        .values(status=to_status)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        record_ids = db.execute(stmt.returning(model.id)).scalars().all()
+    else:
+        record_ids = db.execute(
+            select(model.id).where(*criteria).with_for_update()
+        ).scalars().all()
+        if record_ids:
+            db.execute(stmt.where(model.id.in_(record_ids)))
+    if record_ids:
+        _after_update(db, model, record_ids, from_status, to_status)
+    return record_ids
@@ -47,6 +47,7 @@ CREATE TABLE `users` (
     `is_active` BOOLEAN NOT NULL DEFAULT TRUE,
     `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY `ix_users_created_at_id` (`created_at`, `id`), -- Keyset (cursor) sayfalama için
     FOREIGN KEY (`role_id`) REFERENCES `roles`(`id`)
 );
 
@@ -131,6 +132,8 @@ CREATE TABLE `jobs` (
     `is_active` BOOLEAN NOT NULL DEFAULT TRUE,
     `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY `ix_jobs_created_at_id` (`created_at`, `id`), -- Keyset (cursor) sayfalama için
+    KEY `ix_jobs_matching` (`status`, `service_id`, `district_id`, `created_at`), -- Açık iş eşleştirme (GET /jobs/open)
     FOREIGN KEY (`customer_id`) REFERENCES `users`(`id`),
     FOREIGN KEY (`service_id`) REFERENCES `services`(`id`),
     FOREIGN KEY (`district_id`) REFERENCES `districts`(`id`)
@@ -164,6 +167,59 @@ CREATE TABLE `reviews` (
     FOREIGN KEY (`customer_id`) REFERENCES `users`(`id`)
 );
 
+-- Sağlayıcı başına puan özetleri. Yorum eklenirken/pasife çekilirken uygulama tarafından
+-- aynı işlem içinde artımlı olarak güncellenir; sıralama için (rating_avg, review_count) indekslidir.
+CREATE TABLE `provider_rating_summaries` (
+    `provider_id` BIGINT PRIMARY KEY,
+    `review_count` INT NOT NULL DEFAULT 0,
+    `rating_sum` INT NOT NULL DEFAULT 0,
+    `rating_avg` DECIMAL(3, 2) NOT NULL DEFAULT 0,
+    `rating_1` INT NOT NULL DEFAULT 0,
+    `rating_2` INT NOT NULL DEFAULT 0,
+    `rating_3` INT NOT NULL DEFAULT 0,
+    `rating_4` INT NOT NULL DEFAULT 0,
+    `rating_5` INT NOT NULL DEFAULT 0,
+    `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY `ix_provider_rating_avg` (`rating_avg`, `review_count`),
+    FOREIGN KEY (`provider_id`) REFERENCES `providers`(`id`)
+);
+
+-- Programatik SEO sayfaları ("İzmir avukat") için (hizmet, ilçe) ve (hizmet, şehir) başına
+-- önceden hesaplanmış özetler. Uygulama (docker-fastapi/seo.py) tarafından tam olarak veya
+-- değişen çiftler için artımlı olarak yazılır; sayfa ve site haritası istekleri yalnızca bu
+-- tabloları okur.
+CREATE TABLE `seo_district_pages` (
+    `service_id` INT NOT NULL,
+    `district_id` INT NOT NULL,
+    `provider_count` INT NOT NULL DEFAULT 0,
+    `review_count` INT NOT NULL DEFAULT 0,
+    `rating_avg` DECIMAL(3, 2) NOT NULL DEFAULT 0,
+    `open_job_count` INT NOT NULL DEFAULT 0,
+    `top_providers` JSON NOT NULL,
+    `recent_jobs` JSON NOT NULL,
+    `last_job_at` TIMESTAMP NULL,
+    `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`service_id`, `district_id`),
+    FOREIGN KEY (`service_id`) REFERENCES `services`(`id`),
+    FOREIGN KEY (`district_id`) REFERENCES `districts`(`id`)
+);
+
+CREATE TABLE `seo_city_pages` (
+    `service_id` INT NOT NULL,
+    `city_id` INT NOT NULL,
+    `provider_count` INT NOT NULL DEFAULT 0,
+    `review_count` INT NOT NULL DEFAULT 0,
+    `rating_avg` DECIMAL(3, 2) NOT NULL DEFAULT 0,
+    `open_job_count` INT NOT NULL DEFAULT 0,
+    `top_providers` JSON NOT NULL,
+    `recent_jobs` JSON NOT NULL,
+    `last_job_at` TIMESTAMP NULL,
+    `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`service_id`, `city_id`),
+    FOREIGN KEY (`service_id`) REFERENCES `services`(`id`),
+    FOREIGN KEY (`city_id`) REFERENCES `cities`(`id`)
+);
+
 CREATE TABLE `portfolio_items` (
     `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
     `provider_id` BIGINT NOT NULL,
@@ -178,84 +234,55 @@ CREATE TABLE `portfolio_items` (
 
 
 -- =============================================================================
--- DENETİM KAYDI (AUDIT LOG) TABLOSU VE TRIGGER'LARI
+-- DENETİM KAYDI (AUDIT LOG) TABLOSU
 -- =============================================================================
 
+-- Tablo yalnızca eklemeyle büyür; aylık RANGE bölümlerine (partition) ayrılır. Eski aylar
+-- docker-fastapi/audit_archive.py ile sıkıştırılmış NDJSON dosyalarına taşınır ve bölümü
+-- DROP PARTITION ile (satır satır DELETE olmadan) silinir; gelecek aylar için bölümler aynı
+-- komutla `pmax`'tan ayrılarak açılır. MySQL'de bölümleme kolonu her benzersiz anahtarda yer
+-- almalıdır, bu yüzden birincil anahtar (id, action_timestamp) olur.
+-- Bölüm sınırları UNIX_TIMESTAMP ile oturumun saat dilimine göre hesaplanır; uygulama oturumları
+-- UTC kullandığından (bkz. docker-fastapi/database.py) tablo da UTC oturumunda oluşturulur.
+SET time_zone = '+00:00';
 CREATE TABLE `audit_logs` (
-    `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
+    `id` BIGINT AUTO_INCREMENT,
     `user_id` BIGINT,
     `action` ENUM('INSERT', 'UPDATE', 'SOFT_DELETE') NOT NULL,
     `table_name` VARCHAR(100) NOT NULL,
     `record_id` VARCHAR(100) NOT NULL,
     `old_values` JSON,
     `new_values` JSON,
-    `action_timestamp` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    `action_timestamp` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`id`, `action_timestamp`),
+    -- Bir kaydın geçmişi ("X kaydında ne değişti") ve bir kullanıcının işlemleri, en yeniden eskiye
+    INDEX `ix_audit_logs_record` (`table_name`, `record_id`, `action_timestamp`),
+    INDEX `ix_audit_logs_user` (`user_id`, `action_timestamp`)
+)
+-- old_values/new_values JSON metinleri sayfa düzeyinde sıkıştırılır.
+ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8
+PARTITION BY RANGE (UNIX_TIMESTAMP(`action_timestamp`)) (
+    PARTITION `p202601` VALUES LESS THAN (UNIX_TIMESTAMP('2026-02-01 00:00:00')),
+    PARTITION `p202602` VALUES LESS THAN (UNIX_TIMESTAMP('2026-03-01 00:00:00')),
+    PARTITION `p202603` VALUES LESS THAN (UNIX_TIMESTAMP('2026-04-01 00:00:00')),
+    PARTITION `p202604` VALUES LESS THAN (UNIX_TIMESTAMP('2026-05-01 00:00:00')),
+    PARTITION `p202605` VALUES LESS THAN (UNIX_TIMESTAMP('2026-06-01 00:00:00')),
+    PARTITION `p202606` VALUES LESS THAN (UNIX_TIMESTAMP('2026-07-01 00:00:00')),
+    PARTITION `p202607` VALUES LESS THAN (UNIX_TIMESTAMP('2026-08-01 00:00:00')),
+    PARTITION `p202608` VALUES LESS THAN (UNIX_TIMESTAMP('2026-09-01 00:00:00')),
+    PARTITION `p202609` VALUES LESS THAN (UNIX_TIMESTAMP('2026-10-01 00:00:00')),
+    PARTITION `p202610` VALUES LESS THAN (UNIX_TIMESTAMP('2026-11-01 00:00:00')),
+    PARTITION `p202611` VALUES LESS THAN (UNIX_TIMESTAMP('2026-12-01 00:00:00')),
+    PARTITION `p202612` VALUES LESS THAN (UNIX_TIMESTAMP('2027-01-01 00:00:00')),
+    PARTITION `p202701` VALUES LESS THAN (UNIX_TIMESTAMP('2027-02-01 00:00:00')),
+    PARTITION `p202702` VALUES LESS THAN (UNIX_TIMESTAMP('2027-03-01 00:00:00')),
+    PARTITION `p202703` VALUES LESS THAN (UNIX_TIMESTAMP('2027-04-01 00:00:00')),
+    PARTITION `pmax` VALUES LESS THAN MAXVALUE
 );
 
 
--- Örnek: 'providers' tablosu için denetim trigger'ları
--- DİKKAT: Diğer önemli tablolar (users, services vb.) için de benzer trigger'lar oluşturulmalıdır.
--- Backend tarafında her işlemden önce SET @current_user_id = [yapan_kullanicinin_idsi]; komutu çalıştırılmalıdır.
-
-DELIMITER $$
-
-CREATE TRIGGER `tr_audit_providers_insert`
-AFTER INSERT ON `providers`
-FOR EACH ROW
-BEGIN
-    INSERT INTO `audit_logs` (`user_id`, `action`, `table_name`, `record_id`, `new_values`)
-    VALUES (
-        @current_user_id,
-        'INSERT',
-        'providers',
-        NEW.id,
-        JSON_OBJECT(
-            'user_id', NEW.user_id,
-            'company_name', NEW.company_name,
-            'profile_bio', NEW.profile_bio,
-            'is_verified', NEW.is_verified,
-            'is_active', NEW.is_active
-        )
-    );
-END$$
-
-CREATE TRIGGER `tr_audit_providers_update`
-AFTER UPDATE ON `providers`
-FOR EACH ROW
-BEGIN
-    DECLARE v_action ENUM('INSERT', 'UPDATE', 'SOFT_DELETE') DEFAULT 'UPDATE';
-
-    -- Soft delete durumunu yakala
-    IF OLD.is_active = TRUE AND NEW.is_active = FALSE THEN
-        SET v_action = 'SOFT_DELETE';
-    END IF;
-
-    -- Sadece gerçekten bir değişiklik varsa logla
-    IF NOT (OLD.company_name <=> NEW.company_name AND
-            OLD.profile_bio <=> NEW.profile_bio AND
-            OLD.is_verified <=> NEW.is_verified AND
-            OLD.is_active <=> NEW.is_active)
-    THEN
-        INSERT INTO `audit_logs` (`user_id`, `action`, `table_name`, `record_id`, `old_values`, `new_values`)
-        VALUES (
-            @current_user_id,
-            v_action,
-            'providers',
-            OLD.id,
-            JSON_OBJECT(
-                'company_name', OLD.company_name,
-                'profile_bio', OLD.profile_bio,
-                'is_verified', OLD.is_verified,
-                'is_active', OLD.is_active
-            ),
-            JSON_OBJECT(
-                'company_name', NEW.company_name,
-                'profile_bio', NEW.profile_bio,
-                'is_verified', NEW.is_verified,
-                'is_active', NEW.is_active
-            )
-        );
-    END IF;
-END$$
-
-DELIMITER ;
+-- Denetim kayıtları trigger'larla değil uygulama tarafında üretilir (docker-fastapi/audit.py):
+-- ORM oturum olaylarıyla yalnızca değişen kolonlar yakalanır, commit sonrasında bir kuyruğa
+-- eklenir ve arka planda toplu (çok satırlı) INSERT'lerle bu tabloya yazılır. Böylece her
+-- yazma işlemine eşzamanlı bir JSON_OBJECT + INSERT eklenmez. İşlemi yapan kullanıcı istek
+-- bağlamından alınır; @current_user_id oturum değişkenine gerek yoktur.
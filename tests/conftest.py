@@ -0,0 +1,109 @@
+# conftest.py
+
+# Testler uygulamayı tek bir `app` paketi olarak (docker-fastapi/ ve depo kökündeki crud.py,
+# crud_async.py), geçici bir dizindeki SQLite veritabanına karşı süreç içinde çalıştırır; test
+# modülleri `from app import models` ile import eder. Ayarlar modüller import anında okuduğundan
+# ortam değişkenleri uygulama yüklenmeden önce, bu dosyanın import edilmesiyle atanır.
+#
+#   pip install -r docker-fastapi/requirements.txt -r tests/requirements.txt
+#   python -m pytest -q
+
+import os
+import sys
+import tempfile
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix="hizmetpinari-tests-")
+DATABASE_PATH = os.path.join(TEST_DIR, "primary.db")
+
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + DATABASE_PATH,
+    "ASYNC_DATABASE_URL": "sqlite+aiosqlite:///" + DATABASE_PATH,
+    "SEARCH_INDEX_PATH": os.path.join(TEST_DIR, "search_index.db"),
+    "AUDIT_ARCHIVE_DIR": os.path.join(TEST_DIR, "audit_archive"),
+    # bcrypt en düşük maliyetle ve istek thread'inde çalışır.
+    "BCRYPT_ROUNDS": "4",
+    "HASH_POOL_WORKERS": "0",
+})
+os.environ.pop("READ_REPLICA_URLS", None)
+os.environ.pop("EVENTS_REDIS_URL", None)
+
+app_package = types.ModuleType("app")
+app_package.__path__ = [os.path.join(ROOT, "docker-fastapi"), ROOT]
+sys.modules["app"] = app_package
+
+
+@pytest.fixture(scope="session")
+def seed():
+    """Roller, bir hizmet, bir ilçe, bir müşteri ve hizmet bölgesi tanımlı bir sağlayıcı."""
+    from app import database, main, models  # noqa: F401 (main tabloları oluşturur)
+    db = database.SessionLocal()
+    try:
+        db.add_all([
+            models.Role(id=1, role_name=models.RoleNameEnum.admin),
+            models.Role(id=2, role_name=models.RoleNameEnum.provider),
+            models.Role(id=3, role_name=models.RoleNameEnum.customer),
+        ])
+        category = models.Category(name="Tadilat", slug="tadilat")
+        city = models.City(name="Ankara", slug="ankara")
+        db.add_all([category, city])
+        db.flush()
+        service = models.Service(category_id=category.id, name="Boyacı", slug="boyaci")
+        district = models.District(city_id=city.id, name="Çankaya", slug="cankaya")
+        customer = models.User(email="musteri@example.com", password_hash="-", first_name="Ayşe",
+                               last_name="Yılmaz", role_id=3)
+        provider_user = models.User(email="usta@example.com", password_hash="-", first_name="Mehmet",
+                                    last_name="Demir", role_id=2)
+        db.add_all([service, district, customer, provider_user])
+        db.flush()
+        provider = models.Provider(user_id=provider_user.id, company_name="Demir Boya")
+        db.add(provider)
+        db.flush()
+        db.add(models.ProviderServiceArea(provider_id=provider.id, service_id=service.id, district_id=district.id))
+        db.commit()
+        return types.SimpleNamespace(
+            category_id=category.id, service_id=service.id, city_id=city.id, district_id=district.id,
+            customer_id=customer.id, provider_id=provider.id,
+        )
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def client(seed):
+    """Açılış/kapanış (lifespan) olaylarıyla birlikte çalışan test istemcisi."""
+    from fastapi.testclient import TestClient
+    from app import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_job(client, seed):
+    """API üzerinden açık bir iş ilanı oluşturup yanıt gövdesini döndürür."""
+    def _make_job(**overrides):
+        body = {
+            "title": "Salon boyama", "description": "Üç odalı dairenin salonu boyanacak.",
+            "service_id": seed.service_id, "district_id": seed.district_id, **overrides,
+        }
+        response = client.post("/jobs/", params={"customer_id": seed.customer_id}, json=body)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return _make_job
+
+
+@pytest.fixture
+def make_offer(client, seed):
+    """API üzerinden bir teklif oluşturup yanıt gövdesini döndürür."""
+    def _make_offer(job_id, provider_id=None, price="1500.00"):
+        response = client.post(
+            "/offers/", params={"provider_id": provider_id or seed.provider_id},
+            json={"job_id": job_id, "offer_price": price, "message": "Hafta içi başlayabilirim."},
+        )
+        assert response.status_code == 201, response.text
+        return response.json()
+    return _make_offer
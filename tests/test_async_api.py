@@ -0,0 +1,27 @@
+# test_async_api.py
+
+# /async rotaları senkron karşılıklarıyla aynı doğrulamayı ve hata cevaplarını vermelidir.
+
+import pytest
+
+
+@pytest.mark.parametrize("field", ["service_id", "district_id"])
+def test_create_job_rejects_unknown_references_like_sync_path(client, seed, field):
+    body = {
+        "title": "Salon boyama", "description": "Üç odalı dairenin salonu boyanacak.",
+        "service_id": seed.service_id, "district_id": seed.district_id, field: 999_999,
+    }
+    sync = client.post("/jobs/", params={"customer_id": seed.customer_id}, json=body)
+    async_ = client.post("/async/jobs/", params={"customer_id": seed.customer_id}, json=body)
+    assert sync.status_code == async_.status_code == 400
+    assert sync.json() == async_.json()
+
+
+def test_create_job(client, seed):
+    body = {
+        "title": "Mutfak boyama", "description": "Mutfak dolapları ve duvarlar boyanacak.",
+        "service_id": seed.service_id, "district_id": seed.district_id,
+    }
+    response = client.post("/async/jobs/", params={"customer_id": seed.customer_id}, json=body)
+    assert response.status_code == 201, response.text
+    assert client.get(f"/jobs/{response.json()['id']}").json()["title"] == "Mutfak boyama"
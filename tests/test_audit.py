@@ -0,0 +1,55 @@
+# test_audit.py
+
+# Denetim kaydı yazıcısı: kuyruk doluyken olay döngüsünden (AsyncSession commit'i) yapılan
+# eklemeler beklemez; sığmayan kayıtlar executor'da yazılır.
+
+import asyncio
+import datetime
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from app import audit, database, models
+
+
+def _entries(record_ids):
+    return [{
+        "user_id": None, "action": models.AuditActionEnum.UPDATE, "table_name": "kuyruk_test",
+        "record_id": str(record_id), "old_values": None, "new_values": {"n": record_id},
+        "action_timestamp": datetime.datetime.now(datetime.timezone.utc),
+    } for record_id in record_ids]
+
+
+def _written(record_ids):
+    with database.engine.connect() as conn:
+        return conn.execute(
+            select(func.count()).select_from(models.AuditLog)
+            .where(models.AuditLog.table_name == "kuyruk_test", models.AuditLog.record_id.in_(map(str, record_ids)))
+        ).scalar()
+
+
+def test_full_queue_does_not_block_event_loop(seed):
+    writer = audit.AuditWriter(maxsize=1, enqueue_timeout=5)
+    writer._thread = threading.current_thread()  # kuyruğu boşaltan thread yok; kuyruk dolu kalır
+
+    async def commit_from_loop():
+        started = time.perf_counter()
+        writer.enqueue(_entries([1, 2, 3]))
+        elapsed = time.perf_counter() - started
+        deadline = time.monotonic() + 5
+        while _written([2, 3]) < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        return elapsed
+
+    assert asyncio.run(commit_from_loop()) < 1
+    assert writer._queue.qsize() == 1
+    assert _written([2, 3]) == 2
+
+
+def test_full_queue_writes_inline_from_threads(seed):
+    writer = audit.AuditWriter(maxsize=1, enqueue_timeout=0.05)
+    writer._thread = threading.current_thread()
+    writer.enqueue(_entries([11, 12, 13]))
+    # Yalnızca ilk taşan kayıt beklenir; kalanlar tek bir INSERT ile hemen yazılır.
+    assert _written([12, 13]) == 2
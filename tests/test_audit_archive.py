@@ -0,0 +1,92 @@
+# test_audit_archive.py
+
+# Arşiv geçmiş sorguları, parça anahtar dosyalarına göre aranan kaydı içermeyen parçaları açmaz.
+
+import datetime
+
+import pytest
+
+from app import audit_archive, database, models
+
+
+def _insert_old_rows(rows):
+    with database.engine.begin() as conn:
+        conn.execute(models.AuditLog.__table__.insert(), [
+            {"user_id": user_id, "action": models.AuditActionEnum.UPDATE, "table_name": "arsiv_test",
+             "record_id": record_id, "new_values": {"n": i}, "action_timestamp": timestamp}
+            for i, (record_id, user_id, timestamp) in enumerate(rows)
+        ])
+
+
+def test_history_skips_parts_without_the_record(seed, tmp_path):
+    _insert_old_rows([
+        ("101", 7001, datetime.datetime(2020, 1, 10)),
+        ("101", 7001, datetime.datetime(2020, 1, 20)),
+        ("202", 7002, datetime.datetime(2020, 2, 10)),
+        ("303", 7003, datetime.datetime(2020, 3, 10)),
+    ])
+    parts = audit_archive.archive(1, directory=str(tmp_path), now=datetime.datetime(2020, 4, 1))
+    assert [part["rows"] for part in parts] == [2, 1, 1]
+    assert all((tmp_path / part["keys"]).exists() for part in parts)
+
+    db = database.SessionLocal()
+    try:
+        reads, skips = audit_archive.ARCHIVE_READS.value(), audit_archive.ARCHIVE_SKIPS.value()
+        entries, _ = audit_archive.history(db, table_name="arsiv_test", record_id="101", directory=str(tmp_path))
+        assert [entry["new_values"] for entry in entries] == [{"n": 1}, {"n": 0}]
+        assert audit_archive.ARCHIVE_READS.value() - reads == 1
+        assert audit_archive.ARCHIVE_SKIPS.value() - skips == 2
+
+        entries, _ = audit_archive.history(db, user_id=7002, directory=str(tmp_path))
+        assert [entry["record_id"] for entry in entries] == ["202"]
+        assert audit_archive.ARCHIVE_READS.value() - reads == 2
+    finally:
+        db.close()
+
+
+def test_index_parts_backfills_legacy_parts(seed, tmp_path):
+    _insert_old_rows([("404", 7004, datetime.datetime(2019, 5, 10))])
+    [part] = audit_archive.archive(1, directory=str(tmp_path), now=datetime.datetime(2019, 6, 1))
+    # Anahtar dosyası olmadan yazılmış eski bir parçayı taklit et.
+    manifest = audit_archive.load_manifest(str(tmp_path))
+    del manifest["months"]["2019-05"][0]["keys"]
+    audit_archive._write_json(str(tmp_path / audit_archive.MANIFEST), manifest)
+    (tmp_path / part["keys"]).unlink()
+
+    assert audit_archive.index_parts(str(tmp_path)) == 1
+    assert audit_archive.load_manifest(str(tmp_path))["months"]["2019-05"][0]["keys"] == part["keys"]
+    assert audit_archive.index_parts(str(tmp_path)) == 0
+
+
+def test_rerun_after_failed_delete_does_not_duplicate(seed, tmp_path, monkeypatch):
+    _insert_old_rows([("505", 7005, datetime.datetime(2018, 3, 10)), ("505", 7005, datetime.datetime(2018, 3, 11))])
+    now = datetime.datetime(2018, 4, 1)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("bağlantı koptu")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(audit_archive, "_delete_hot_rows", fail)
+        with pytest.raises(RuntimeError):
+            audit_archive.archive(1, directory=str(tmp_path), now=now)
+    # Parça yazıldı ama sıcak satırlar silinmedi; yeniden çalıştırma yeni parça açmaz, silmeyi tamamlar.
+    assert audit_archive.archive(1, directory=str(tmp_path), now=now) == []
+    assert len(audit_archive.load_manifest(str(tmp_path))["months"]["2018-03"]) == 1
+
+    db = database.SessionLocal()
+    try:
+        entries, _ = audit_archive.history(db, table_name="arsiv_test", record_id="505", directory=str(tmp_path))
+    finally:
+        db.close()
+    assert [(entry["new_values"], entry["archived"]) for entry in entries] == [({"n": 1}, True), ({"n": 0}, True)]
+
+
+def test_rows_added_after_archiving_go_to_a_new_part(seed, tmp_path):
+    now = datetime.datetime(2017, 7, 1)
+    _insert_old_rows([("606", 7006, datetime.datetime(2017, 6, 10))])
+    [first] = audit_archive.archive(1, directory=str(tmp_path), now=now)
+    _insert_old_rows([("606", 7006, datetime.datetime(2017, 6, 20))])
+    [second] = audit_archive.archive(1, directory=str(tmp_path), now=now)
+    assert (first["rows"], second["rows"]) == (1, 1)
+    assert second["file"] == "audit_logs-2017-06-2.ndjson.gz"
+    assert second["min_id"] > first["max_id"]
@@ -0,0 +1,163 @@
+# test_bulk.py
+
+# Toplu içe aktarma: satırlar Core INSERT ile yazılsa da tek satırlık yol gibi denetim kaydı
+# bırakmalı, arama/SEO için işaretlenmeli ve bildirilmelidir. Gövde ayrıştırıcısı parçalar
+# arasında bölünen kayıtları bekletir, gerçek sözdizimi hatalarında ise isteği reddeder.
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app import audit, bulk, crud, database, models, search, seo
+
+from test_events import watchers
+
+
+def audit_rows(table_name, record_ids):
+    # Kuyruktaki kayıtlar yazılır; yazıcı sonraki kayıtta kendiliğinden yeniden başlar.
+    audit.writer.stop()
+    with database.engine.connect() as conn:
+        return conn.execute(
+            select(models.AuditLog.record_id, models.AuditLog.action, models.AuditLog.new_values)
+            .where(models.AuditLog.table_name == table_name, models.AuditLog.record_id.in_(record_ids))
+        ).all()
+
+
+def test_bulk_users_are_audited(client):
+    users = [
+        {"email": f"toplu{i}@example.com", "password": "gizli-sifre", "first_name": "Toplu",
+         "last_name": f"Kullanıcı {i}", "role_id": 3}
+        for i in range(3)
+    ]
+    # Gövdede tekrar eden e-posta satır hatası olarak raporlanır ve denetim kaydı bırakmaz.
+    body = "\n".join(json.dumps(user) for user in [*users, users[0]])
+    response = client.post("/users/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 3
+
+    with database.engine.connect() as conn:
+        ids = conn.execute(
+            select(models.User.id).where(models.User.email.in_([user["email"] for user in users]))
+        ).scalars().all()
+    rows = audit_rows("users", [str(i) for i in ids])
+    assert sorted(int(record_id) for record_id, _, _ in rows) == sorted(ids)
+    assert {action for _, action, _ in rows} == {models.AuditActionEnum.INSERT}
+    assert all("password_hash" not in new_values for _, _, new_values in rows)
+
+
+def test_bulk_jobs_are_audited(client, seed):
+    jobs = [
+        {"title": f"Toplu ilan {i}", "description": "Toplu içe aktarılan iş ilanı.",
+         "service_id": seed.service_id, "district_id": seed.district_id}
+        for i in range(2)
+    ]
+    response = client.post(
+        "/jobs/bulk", params={"customer_id": seed.customer_id},
+        content="\n".join(json.dumps(job) for job in jobs), headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.json()["inserted"] == 2
+    with database.engine.connect() as conn:
+        ids = conn.execute(select(models.Job.id).where(models.Job.title.in_([job["title"] for job in jobs]))).scalars().all()
+    rows = audit_rows("jobs", [str(i) for i in ids])
+    assert sorted(new_values["title"] for _, _, new_values in rows) == ["Toplu ilan 0", "Toplu ilan 1"]
+
+
+def test_bulk_rows_retried_one_by_one_are_audited(client):
+    # Aynı telefon numarası unique indekse takılır; grup satır satır yeniden denenir.
+    users = [
+        {"email": f"telefon{i}@example.com", "password": "gizli-sifre", "first_name": "Telefon",
+         "last_name": "Çakışması", "phone_number": "05550000000", "role_id": 3}
+        for i in range(2)
+    ]
+    response = client.post(
+        "/users/bulk", content="\n".join(json.dumps(user) for user in users),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.json()["inserted"] == 1
+    assert [error["index"] for error in response.json()["errors"]] == [1]
+
+    with database.engine.connect() as conn:
+        user_id = conn.execute(select(models.User.id).where(models.User.phone_number == "05550000000")).scalar_one()
+    rows = audit_rows("users", [str(user_id)])
+    assert [new_values["email"] for _, _, new_values in rows] == ["telefon0@example.com"]
+
+
+def test_bulk_jobs_mark_and_publish_only_inserted_rows(client, seed, monkeypatch):
+    insert_many = crud._insert_many
+
+    def insert_many_failing(db, model, rows):
+        if any(row["title"] == "Hatalı ilan" for row in rows):
+            raise IntegrityError("INSERT INTO jobs", {}, Exception("kısıt ihlali"))
+        return insert_many(db, model, rows)
+
+    monkeypatch.setattr(crud, "_insert_many", insert_many_failing)
+    seo_marks, search_marks = [], []
+    monkeypatch.setattr(seo.refresher, "mark", lambda *args: seo_marks.append(args))
+    monkeypatch.setattr(search.indexer, "mark", lambda *args: search_marks.append(args))
+
+    titles = ["İşaretli ilan 0", "Hatalı ilan", "İşaretli ilan 1"]
+    body = "\n".join(
+        json.dumps({"title": title, "description": "Toplu içe aktarılan iş ilanı.",
+                    "service_id": seed.service_id, "district_id": seed.district_id})
+        for title in titles
+    )
+    with watchers(client, f"/ws/areas/{seed.service_id}/{seed.district_id}", 1) as [socket]:
+        response = client.post(
+            "/jobs/bulk", params={"customer_id": seed.customer_id},
+            content=body, headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.json()["inserted"] == 2
+        assert [error["index"] for error in response.json()["errors"]] == [1]
+        events = [json.loads(socket.receive_text()) for _ in range(2)]
+
+    with database.engine.connect() as conn:
+        ids = set(conn.execute(select(models.Job.id).where(models.Job.title.in_(titles))).scalars())
+    assert len(ids) == 2
+    assert {event["job"]["id"] for event in events} == ids
+    assert {event["type"] for event in events} == {"job.created"}
+    assert set().union(*(job_ids for _, _, job_ids in seo_marks)) == ids
+    assert set().union(*(job_ids for job_ids, _ in search_marks)) == ids
+
+
+async def _chunks(parts, then_fail=False):
+    for part in parts:
+        yield part.encode("utf-8")
+    if then_fail:
+        raise AssertionError("ayrıştırıcı hatayı görmeden sonraki parçayı bekledi")
+
+
+def _records(parts, then_fail=False):
+    async def collect():
+        return [record async for _, record in bulk.iter_records(_chunks(parts, then_fail))]
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("parts", [
+    ['[{"a": "bö', 'lünmüş"}]'],
+    ['[{"a": tr', 'ue}]'],
+    ['[{"a": 1.', '5e', '-3}]'],
+    ['[{"a": -Infin', 'ity}]'],
+])
+def test_array_records_split_across_chunks(parts):
+    [record] = _records(parts)
+    assert set(record) == {"a"}
+
+
+@pytest.mark.parametrize("first_part", ['[{"a": yanlis}', '[{"a": 1 "b": 2}'])
+def test_array_syntax_error_is_not_waited_on(first_part):
+    # Hata parçanın sonunda değil; gövdenin geri kalanı beklenmeden reddedilir.
+    with pytest.raises(ValueError, match="Geçersiz JSON dizisi"):
+        _records([first_part], then_fail=True)
+
+
+def test_oversized_record_is_rejected(client, seed, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_MAX_RECORD_BYTES", 64)
+    response = client.post(
+        "/jobs/bulk", params={"customer_id": seed.customer_id},
+        content='[{"title": "' + "x" * 200, headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 400
+    assert "baytı aşıyor" in response.json()["detail"]
@@ -0,0 +1,43 @@
+# test_cli.py
+
+# `python -m app` komutları paketteki modüllerin `main()`'ine yönlendirir.
+
+import os
+import subprocess
+import sys
+
+from app import __main__ as cli
+
+from conftest import ROOT
+
+
+def test_export_command(make_job, tmp_path):
+    job = make_job()
+    output = tmp_path / "jobs.csv"
+    cli.main(["export", "jobs", "--format", "csv", "-o", str(output)])
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("id,")
+    assert any(line.startswith(f"{job['id']},") for line in lines[1:])
+
+
+def test_unknown_command(capsys):
+    assert cli.main(["yok"]) == 2
+    assert "Kullanım" in capsys.readouterr().err
+
+
+def test_seo_build_command(seed, client, capsys):
+    cli.main(["seo", "build", "--workers", "1"])
+    assert "sayfa yazıldı" in capsys.readouterr().out
+    assert client.get("/seo/ankara/cankaya/boyaci").status_code == 200
+
+
+def test_runs_from_the_image_layout(tmp_path):
+    # İmajdaki gibi yalnızca docker-fastapi/ `app` adıyla bulunur; depo köküne ve bench'e erişim yoktur.
+    os.symlink(os.path.join(ROOT, "docker-fastapi"), tmp_path / "app")
+    env = dict(os.environ, DATABASE_URL="sqlite:///" + str(tmp_path / "cli.db"), PYTHONPATH="")
+    result = subprocess.run(
+        [sys.executable, "-m", "app", "export", "--help"],
+        cwd=tmp_path, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "audit_logs" in result.stdout
@@ -0,0 +1,73 @@
+# test_events.py
+
+# Yazmalar commit sonrasında abonelere bildirilir; bağlı izleyici sayısı istek yolundaki SQL
+# ifadesi sayısını değiştirmez. Senkron ve /async rotaları aynı olayları yayınlar.
+
+import contextlib
+import json
+import time
+
+import pytest
+
+from app import database, events
+
+
+def wait_for_subscriptions(count):
+    # Abonelikler sunucu tarafında bağlantı kabul edildikten sonra açılır ve kapandıktan sonra silinir.
+    deadline = time.monotonic() + 5
+    while events.broker.subscription_count() != count:
+        assert time.monotonic() < deadline, f"{events.broker.subscription_count()} abonelik var, {count} bekleniyordu"
+        time.sleep(0.01)
+
+
+@contextlib.contextmanager
+def watchers(client, path, count):
+    with contextlib.ExitStack() as stack:
+        sockets = [stack.enter_context(client.websocket_connect(path)) for _ in range(count)]
+        wait_for_subscriptions(count)
+        yield sockets
+    wait_for_subscriptions(0)
+
+
+def post_offer(client, seed, prefix, job_id):
+    with database.count_statements(request_only=True) as statements:
+        response = client.post(
+            f"{prefix}/offers/", params={"provider_id": seed.provider_id},
+            json={"job_id": job_id, "offer_price": "1500.00", "message": "Hafta içi başlayabilirim."},
+        )
+    assert response.status_code == 201, response.text
+    return response.json(), len(statements)
+
+
+@pytest.mark.parametrize("prefix", ["", "/async"])
+def test_offer_created_reaches_every_watcher(client, seed, make_job, prefix):
+    job = make_job()
+    with watchers(client, f"/ws/jobs/{job['id']}", 3) as sockets:
+        offer, _ = post_offer(client, seed, prefix, job["id"])
+        for socket in sockets:
+            event = json.loads(socket.receive_text())
+            assert (event["type"], event["offer"]["id"]) == ("offer.created", offer["id"])
+
+
+@pytest.mark.parametrize("prefix", ["", "/async"])
+def test_job_created_reaches_area_watchers(client, seed, prefix):
+    body = {"title": "Salon boyama", "description": "Üç odalı dairenin salonu boyanacak.",
+            "service_id": seed.service_id, "district_id": seed.district_id}
+    with watchers(client, f"/ws/areas/{seed.service_id}/{seed.district_id}", 2) as sockets:
+        response = client.post(f"{prefix}/jobs/", params={"customer_id": seed.customer_id}, json=body)
+        assert response.status_code == 201, response.text
+        for socket in sockets:
+            event = json.loads(socket.receive_text())
+            assert (event["type"], event["job"]["id"]) == ("job.created", response.json()["id"])
+
+
+def test_statement_count_does_not_grow_with_watchers(client, seed, make_job):
+    counts = []
+    for count in (0, 1, 20):
+        job = make_job()
+        with watchers(client, f"/ws/jobs/{job['id']}", count) as sockets:
+            _, statements = post_offer(client, seed, "", job["id"])
+            for socket in sockets:
+                assert json.loads(socket.receive_text())["type"] == "offer.created"
+        counts.append(statements)
+    assert counts == [1, 1, 1]
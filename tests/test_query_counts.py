@@ -0,0 +1,68 @@
+# test_query_counts.py
+
+# Endpoint başına SQL ifadesi sayıları. Bir ilişkinin lazy yüklemeye dönmesi (N+1) veya istek
+# yoluna yeni bir sorgu eklenmesi bu testleri kırar. Yalnızca istek içinde çalışan ifadeler
+# sayılır (bkz. database.count_statements).
+
+from app import database
+
+
+def count_requests(call):
+    with database.count_statements(request_only=True) as statements:
+        response = call()
+    assert response.status_code < 400, response.text
+    return len(statements)
+
+
+def test_job_details_loads_offers_in_one_query(client, make_job, make_offer):
+    job = make_job()
+    make_offer(job["id"])
+    # İş + teklifleri (selectinload ile tek bir IN sorgusu)
+    assert count_requests(lambda: client.get(f"/jobs/{job['id']}")) == 2
+
+
+def test_job_details_query_count_does_not_grow_with_offers(client, make_job, make_offer):
+    job = make_job()
+    for price in ("1000.00", "1200.00", "1400.00", "1600.00"):
+        make_offer(job["id"], price=price)
+    response = client.get(f"/jobs/{job['id']}")
+    assert len(response.json()["offers"]) == 4
+    assert count_requests(lambda: client.get(f"/jobs/{job['id']}")) == 2
+
+
+def test_offer_details_joins_job_and_provider(client, make_job, make_offer):
+    offer = make_offer(make_job()["id"])
+    assert count_requests(lambda: client.get(f"/offers/{offer['id']}")) == 1
+
+
+# --- Yazma yolu: tek INSERT ... RETURNING; ön kontrol SELECT'i veya refresh yok ---
+
+def test_create_user_is_one_statement(client):
+    body = {"email": "tek.ifade@example.com", "password": "gizli-parola-123", "first_name": "Ali",
+            "last_name": "Kaya", "role_id": 3}
+    assert count_requests(lambda: client.post("/users/", json=body)) == 1
+
+
+def test_duplicate_email_is_rejected_by_unique_index(client):
+    body = {"email": "musteri@example.com", "password": "gizli-parola-123", "first_name": "Ayşe",
+            "last_name": "Yılmaz", "role_id": 3}
+    with database.count_statements(request_only=True) as statements:
+        response = client.post("/users/", json=body)
+    assert response.status_code == 400
+    assert len(statements) == 1
+
+
+def test_create_job_is_one_statement(client, seed):
+    body = {"title": "Salon boyama", "description": "Üç odalı dairenin salonu boyanacak.",
+            "service_id": seed.service_id, "district_id": seed.district_id}
+    assert count_requests(
+        lambda: client.post("/jobs/", params={"customer_id": seed.customer_id}, json=body)
+    ) == 1
+
+
+def test_create_offer_is_one_statement(client, seed, make_job):
+    job = make_job()
+    body = {"job_id": job["id"], "offer_price": "1500.00", "message": "Hafta içi başlayabilirim."}
+    assert count_requests(
+        lambda: client.post("/offers/", params={"provider_id": seed.provider_id}, json=body)
+    ) == 1
@@ -0,0 +1,26 @@
+# test_ratings.py
+
+# Puan özetlerinin yeniden üretilmesi (uzlaştırma) SEO sayfalarına yansımalıdır.
+
+from sqlalchemy import insert
+
+from app import database, models, seo
+
+
+def test_rebuild_rating_summaries_refreshes_seo_pages(client, seed, make_job):
+    job = make_job(title="Balkon boyama")
+    # Bekleyen SEO güncellemeleri uygulanır; sayfa bundan sonra yalnızca yeniden üretimle değişmeli.
+    seo.refresher.flush()
+    before = client.get("/seo/ankara/cankaya/boyaci").json()
+
+    # Özet tablosunu atlayan (ORM dışı) bir yorum: artımlı güncelleme onu görmez.
+    with database.engine.begin() as conn:
+        conn.execute(insert(models.Review.__table__).values(
+            job_id=job["id"], provider_id=seed.provider_id, customer_id=seed.customer_id, rating=4,
+        ))
+    assert client.post("/admin/ratings/rebuild").status_code == 200
+    seo.refresher.flush()
+
+    page = client.get("/seo/ankara/cankaya/boyaci").json()
+    assert page["review_count"] == before["review_count"] + 1
+    assert page["top_providers"][0]["review_count"] == page["review_count"]
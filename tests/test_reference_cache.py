@@ -0,0 +1,27 @@
+# test_reference_cache.py
+
+# Paylaşılan dizindeki sürüm dosyaları, worker'lar arası geçersiz kılmayı taşır.
+
+from app import reference_cache
+
+
+def test_file_version_changes_on_every_bump(tmp_path):
+    writer = reference_cache.FileVersionBackend(str(tmp_path))
+    reader = reference_cache.FileVersionBackend(str(tmp_path))
+    assert reader.version("cities") == 0
+    seen = set()
+    for _ in range(20):
+        # Art arda bump'lar dosya sisteminin zaman çözünürlüğü içinde kalsa da sürüm değişir.
+        writer.bump("cities")
+        assert reader.version("cities") == writer.version("cities")
+        seen.add(reader.version("cities"))
+    assert len(seen) == 20
+
+
+def test_bump_from_another_worker_reloads_the_table(seed, tmp_path):
+    cache = reference_cache.ReferenceCache(ttl=3600, backend=reference_cache.FileVersionBackend(str(tmp_path)))
+    other_worker = reference_cache.FileVersionBackend(str(tmp_path))
+    first = cache.get("cities")
+    assert cache.get("cities") is first
+    other_worker.bump("cities")
+    assert cache.get("cities") is not first
@@ -0,0 +1,115 @@
+# test_replicas.py
+
+# Okuma replikası yönlendirmesi, iki SQLite dosyasıyla: replika birincilin bir kopyasıdır ve
+# müşterinin adı yalnızca replikada değiştirilir; böylece cevabın hangi veritabanından
+# okunduğu görülür.
+
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import update
+
+from app import database, main, models
+
+
+def _routed(route):
+    return database.READS_ROUTED.value(route=route)
+
+
+@pytest.fixture
+def replica(client, seed, tmp_path, monkeypatch):
+    path = str(tmp_path / "replica.db")
+    with sqlite3.connect(database.engine.url.database) as source, sqlite3.connect(path) as target:
+        source.backup(target)
+    replica_set = database.ReplicaSet(["sqlite:///" + path])
+    with replica_set.replicas[0].engine.begin() as conn:
+        conn.execute(update(models.User).where(models.User.id == seed.customer_id).values(first_name="Replika"))
+    monkeypatch.setattr(database, "replicas", replica_set)
+    monkeypatch.setattr(main, "replicas", replica_set)
+    client.cookies.clear()
+    yield replica_set.replicas[0]
+    client.cookies.clear()
+    replica_set.replicas[0].engine.dispose()
+
+
+def first_name(client, seed):
+    response = client.get(f"/users/{seed.customer_id}")
+    assert response.status_code == 200, response.text
+    return response.json()["first_name"]
+
+
+def test_reads_go_to_replica(client, seed, replica):
+    before = _routed("replica")
+    assert first_name(client, seed) == "Replika"
+    assert _routed("replica") == before + 1
+
+
+def test_writes_stay_on_primary_and_pin_reads_to_it(client, seed, replica):
+    response = client.post("/users/", json={
+        "email": "replika.yazma@example.com", "password": "gizli-parola-123", "first_name": "Can",
+        "last_name": "Öz", "role_id": 3,
+    })
+    assert response.status_code == 201, response.text
+    assert main.READ_PRIMARY_COOKIE in response.cookies
+    # Çerez süresince okumalar birincilden: kendi yazması hemen görünür.
+    assert first_name(client, seed) == "Ayşe"
+    assert client.get(f"/users/{response.json()['id']}").status_code == 200
+
+    client.cookies.clear()
+    assert first_name(client, seed) == "Replika"
+
+
+def test_unreachable_replica_falls_back_to_primary(client, seed, replica):
+    os.remove(replica.engine.url.database)
+    os.mkdir(replica.engine.url.database)  # dosya yerine dizin: bağlantı açılamaz
+    replica.engine.dispose()
+    before = _routed("primary_failover")
+    assert first_name(client, seed) == "Ayşe"
+    assert _routed("primary_failover") == before + 1
+    assert not replica.healthy
+    # Sonraki okumalar replikayı hiç denemez.
+    assert first_name(client, seed) == "Ayşe"
+    assert _routed("primary_failover") == before + 1
+
+
+def test_failed_health_check_routes_to_primary(client, seed, replica):
+    def refuse():
+        raise RuntimeError("bağlantı reddedildi")
+
+    replica.engine.connect = refuse
+    try:
+        database.replicas.check()
+    finally:
+        del replica.engine.connect
+    assert not replica.healthy
+    assert first_name(client, seed) == "Ayşe"
+    # Yoklama yeniden başarılı olunca replika devreye döner.
+    database.replicas.check()
+    assert replica.healthy
+    assert first_name(client, seed) == "Replika"
+
+
+def test_lagging_replica_is_marked_down(client, seed, replica, monkeypatch):
+    replica_set = database.replicas
+    monkeypatch.setattr(replica_set, "max_lag", 30)
+    # Gecikme ölçümü yalnızca MySQL'de yapılır; replikayı MySQL gibi gösterip 120 sn gecikme bildir.
+    monkeypatch.setattr(replica.engine.dialect, "name", "mysql")
+    monkeypatch.setattr(replica_set, "_lag", lambda conn: 120)
+    replica_set.check()
+    assert not replica.healthy
+    assert first_name(client, seed) == "Ayşe"
+
+
+def test_healthy_gauge_is_registered_once_and_follows_the_active_set(client, replica):
+    # Fikstürdeki ve burada kurulan ReplicaSet'ler ölçümü yeniden kaydetmez.
+    database.ReplicaSet([]).stop()
+
+    def gauge_lines():
+        text = client.get("/metrics").text
+        return [line for line in text.splitlines()
+                if line.startswith(("# TYPE db_replicas_healthy ", "db_replicas_healthy "))]
+
+    assert gauge_lines() == ["# TYPE db_replicas_healthy gauge", "db_replicas_healthy 1"]
+    replica.healthy = False
+    assert gauge_lines() == ["# TYPE db_replicas_healthy gauge", "db_replicas_healthy 0"]
@@ -0,0 +1,26 @@
+# test_search.py
+
+# Arama indeksi istek yolunda değil, arka plandaki `search.indexer` tarafından güncellenir.
+
+from app import search
+
+
+def test_created_job_is_indexed_in_background(client, make_job):
+    job = make_job(title="Balkon kaplama", description="Balkon zemini seramikle kaplanacak.")
+    search.indexer.flush()
+    hits = client.get("/search", params={"q": "seramik", "kind": search.KIND_JOB}).json()
+    assert job["id"] in [hit["id"] for hit in hits]
+
+
+def test_commit_only_queues_changes(client, make_job, monkeypatch):
+    # Thread'i uzun aralıkla yeniden başlat ki kuyruğu test sırasında boşaltmasın.
+    search.indexer.stop()
+    monkeypatch.setattr(search.indexer, "interval", 3600)
+    search.indexer.start()
+    job = make_job(title="Çatı onarımı", description="Çatıdaki kırık kiremitler değişecek.")
+    assert client.get("/search", params={"q": "kiremit"}).json() == []
+    assert job["id"] in search.indexer._job_ids
+    search.indexer.stop()
+    assert [hit["id"] for hit in client.get("/search", params={"q": "kiremit"}).json()] == [job["id"]]
+    monkeypatch.undo()
+    search.indexer.start()
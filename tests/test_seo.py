@@ -0,0 +1,39 @@
+# test_seo.py
+
+# ORM yazmaları, değişen ilanların ve hizmet bölgelerinin SEO sayfalarını commit sonrasında
+# güncellenmek üzere işaretler; hizmet veya ilçe değiştiyse eski sayfa da işaretlenir.
+
+from app import database, models, seo
+
+
+def marked_pairs(monkeypatch):
+    pairs = set()
+    monkeypatch.setattr(seo.refresher, "mark", lambda marked, *rest: pairs.update(marked))
+    return pairs
+
+
+def test_moving_a_job_marks_the_previous_pair(seed, make_job, monkeypatch):
+    job = make_job()
+    with database.SessionLocal() as db:
+        other = models.District(city_id=seed.city_id, name="Keçiören", slug="kecioren-ilan")
+        db.add(other)
+        db.commit()
+        pairs = marked_pairs(monkeypatch)
+        db.get(models.Job, job["id"]).district_id = other.id
+        db.commit()
+    assert pairs == {(seed.service_id, seed.district_id), (seed.service_id, other.id)}
+
+
+def test_moving_a_service_area_marks_the_previous_pair(seed, monkeypatch):
+    with database.SessionLocal() as db:
+        first = models.District(city_id=seed.city_id, name="Yenimahalle", slug="yenimahalle-bolge")
+        second = models.District(city_id=seed.city_id, name="Etimesgut", slug="etimesgut-bolge")
+        db.add_all([first, second])
+        db.flush()
+        area = models.ProviderServiceArea(provider_id=seed.provider_id, service_id=seed.service_id, district_id=first.id)
+        db.add(area)
+        db.commit()
+        pairs = marked_pairs(monkeypatch)
+        area.district_id = second.id
+        db.commit()
+    assert pairs == {(seed.service_id, first.id), (seed.service_id, second.id)}
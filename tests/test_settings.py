@@ -0,0 +1,43 @@
+# test_settings.py
+
+# docker-fastapi/.env.example'dan kopyalanan bir .env ile uygulama import edilebilmelidir: boş
+# bırakılan isteğe bağlı ayarlar (ör. `PROFILE_THRESHOLD_MS=`) "tanımsız" sayılır.
+
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+IMPORT_APP = f"""
+import sys, types
+package = types.ModuleType("app")
+package.__path__ = [{os.path.join(ROOT, "docker-fastapi")!r}, {ROOT!r}]
+sys.modules["app"] = package
+from app import instrumentation, main
+assert instrumentation.PROFILE_THRESHOLD_MS is None
+assert not instrumentation._should_profile()
+"""
+
+
+def _env_example():
+    values = {}
+    with open(os.path.join(ROOT, "docker-fastapi", ".env.example"), encoding="utf-8") as f:
+        for line in f:
+            key, sep, value = line.strip().partition("=")
+            if sep and not key.startswith("#"):
+                values[key] = value
+    return values
+
+
+def test_app_imports_with_env_example_values(tmp_path):
+    env = {**os.environ, **_env_example()}
+    # Bağlantı ve dosya yolları geçici dizine yönlendirilir; diğer değerler olduğu gibi kullanılır.
+    env.update(
+        DATABASE_URL="sqlite:///" + str(tmp_path / "app.db"),
+        SEARCH_INDEX_PATH=str(tmp_path / "search_index.db"),
+        AUDIT_ARCHIVE_DIR=str(tmp_path / "audit_archive"),
+        PROFILE_DIR=str(tmp_path / "profiles"),
+    )
+    result = subprocess.run([sys.executable, "-c", IMPORT_APP], env=env, cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
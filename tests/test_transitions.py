@@ -0,0 +1,68 @@
+# test_transitions.py
+
+# Teklif kabulü: bekleyen diğer aktif teklifler tek bir set tabanlı UPDATE ile reddedilir ve
+# yalnızca gerçekten değişen teklifler denetim kaydı bırakır.
+
+from sqlalchemy import select, update
+
+from app import audit, database, models
+
+
+def accept(client, offer_id):
+    with database.count_statements(request_only=True) as statements:
+        response = client.patch(f"/offers/{offer_id}/accept")
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+def status_audits(offer_ids):
+    audit.writer.stop()
+    with database.engine.connect() as conn:
+        return conn.execute(
+            select(models.AuditLog.record_id, models.AuditLog.new_values)
+            .where(models.AuditLog.table_name == "offers", models.AuditLog.record_id.in_(map(str, offer_ids)),
+                   models.AuditLog.action == models.AuditActionEnum.UPDATE)
+        ).all()
+
+
+def test_accept_rejects_pending_siblings(client, make_job, make_offer):
+    job = make_job()
+    offers = [make_offer(job["id"], price=price)["id"] for price in ("1000.00", "1200.00", "1400.00")]
+    accept(client, offers[0])
+
+    statuses = {offer["id"]: offer["status"] for offer in client.get(f"/jobs/{job['id']}").json()["offers"]}
+    assert statuses == {offers[0]: "accepted", offers[1]: "rejected", offers[2]: "rejected"}
+    assert sorted(status_audits(offers[1:]), key=lambda row: int(row[0])) == [
+        (str(i), {"status": "rejected"}) for i in offers[1:]
+    ]
+
+
+def test_accept_statement_count_does_not_grow_with_siblings(client, make_job, make_offer):
+    counts = []
+    for siblings in (0, 1, 5):
+        job = make_job()
+        offer = make_offer(job["id"])
+        for _ in range(siblings):
+            make_offer(job["id"])
+        counts.append(accept(client, offer["id"]))
+    assert counts[0] == counts[1] == counts[2]
+
+
+def test_second_accept_conflicts_without_extra_audits(client, make_job, make_offer):
+    job = make_job()
+    first, second = make_offer(job["id"])["id"], make_offer(job["id"])["id"]
+    accept(client, first)
+    assert client.patch(f"/offers/{second}/accept").status_code == 409
+    assert status_audits([second]) == [(str(second), {"status": "rejected"})]
+
+
+def test_inactive_siblings_are_left_alone(client, make_job, make_offer):
+    job = make_job()
+    offer, inactive = make_offer(job["id"])["id"], make_offer(job["id"])["id"]
+    with database.engine.begin() as conn:
+        conn.execute(update(models.Offer).where(models.Offer.id == inactive).values(is_active=False))
+    accept(client, offer)
+    with database.engine.connect() as conn:
+        status = conn.execute(select(models.Offer.status).where(models.Offer.id == inactive)).scalar_one()
+    assert status == models.OfferStatusEnum.pending
+    assert status_audits([inactive]) == []